@@ -3,11 +3,13 @@ from typing import NoReturn
 
 from PySide6.QtWidgets import QApplication
 
+from src.database import initialize_database
 from src.gui.main_window import MainWindow
 
 
 def run_app() -> NoReturn:
     version = '2.0.0'
+    initialize_database()  # create new tables and apply pending migrations
     app = QApplication([])
     window = MainWindow(version=version)  # Create the main window from main_window.py
     window.show()  # Show the window
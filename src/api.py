@@ -1,19 +1,30 @@
-from collections.abc import Callable
+import math
+from collections.abc import Callable, Iterator, Sequence
 from datetime import datetime
 from operator import attrgetter
 from typing import Any
 
-from sqlalchemy import asc, desc, select
+from sqlalchemy import asc, case, desc, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from .archive import load_archived_rmas
 from .database import (
     RMA,
+    RMA_IS_OPEN,
     Customer,
     PartNumber,
     Product,
+    RMAChange,
+    RMANotes,
+    RMANumberSequence,
+    RMAStatus,
     SessionLocal,
     User,
+    all_rmas,
+    archived_rmas,
+    split_notes,
 )
 
 RMA_ATTR_ACCESSORS: dict[str, Callable[[RMA], Any]] = {
@@ -26,16 +37,32 @@ RMA_ATTR_ACCESSORS: dict[str, Callable[[RMA], Any]] = {
     'Last Updated': attrgetter('last_updated'),
     'Part #': attrgetter('part_number.number'),
     'Product': attrgetter('part_number.product.name'),
-    'Reason for Return': attrgetter('reason_for_return'),
+    'Reason for Return': attrgetter('reason_summary'),
     'Resolution': attrgetter('resolution_notes'),
     'RMA #': attrgetter('rma_number'),
     'Serial #': attrgetter('serial_number'),
-    'Status': attrgetter('status'),
+    'Status': attrgetter('status.label'),
     'Warranty': lambda rma: 'Yes' if rma.is_warranty else 'No',
     'Warranty_io': attrgetter('is_warranty'),
     'WO #': attrgetter('work_order'),
 }
 
+RMA_STATUSES: tuple[str, ...] = tuple(status.label for status in RMAStatus)
+
+# Attributes overwrite_rma_record() accepts, in the order of its `entries`
+OVERWRITABLE_ATTRIBUTES: tuple[str, ...] = (
+    'reason_for_return',
+    'status',
+    'customer_po_number',
+    'work_order',
+    'incoming_inspection_notes',
+    'resolution_notes',
+    'shipped_back_on',
+    'is_warranty',
+)
+BULK_CHUNK_SIZE = 500  # stays well below SQLite's bound-parameter limit
+RMA_NUMBERS_PER_YEAR = 1000  # RMA numbers are the 2-digit year followed by 3 digits
+
 
 def add_customer(customer_name: str) -> bool:
     """
@@ -140,7 +167,7 @@ def add_part_number(product_id: int, part_number: str) -> bool:
 
 
 def add_rma(
-    rma_number: int,
+    rma_number: int | None,
     customer_id: int,
     part_number_id: int,
     serial_number: str,
@@ -148,9 +175,17 @@ def add_rma(
     issued_by_id: int,
     is_warranty: bool,
     customer_po_number: str | None = None,
-) -> bool:
+) -> int | None:
+    """
+    Inserts a new RMA and returns its number, or None if the insert failed.
+
+    With rma_number=None the next number of the current year is allocated in
+    the same transaction as the insert.
+    """
     with SessionLocal() as session:
         try:
+            if rma_number is None:
+                rma_number = allocate_rma_number(session)
             new_rma = RMA(
                 rma_number=rma_number,
                 customer_id=customer_id,
@@ -163,14 +198,15 @@ def add_rma(
             )
             session.add(new_rma)
             session.commit()
-            return True
+            return rma_number
         except Exception as e:
             print(e)
             session.rollback()
-            return False
+            return None
 
 
-def update_status(rma_number: str, new_status: str) -> bool:
+def update_status(rma_number: str, new_status: RMAStatus | str) -> bool:
+    new_status = RMAStatus.coerce(new_status)
     with SessionLocal() as session:
         rma = session.query(RMA).filter_by(rma_number=rma_number).first()
 
@@ -191,6 +227,329 @@ def update_status(rma_number: str, new_status: str) -> bool:
             return False
 
 
+def update_status_bulk(
+    rma_numbers: Sequence[int], new_status: RMAStatus | str
+) -> dict[int, str]:
+    """
+    Sets the status of many RMAs in a single transaction.
+
+    RMAs that need changing are updated with `UPDATE ... WHERE rma_number IN (...)`
+    rather than one query and commit per RMA.
+
+    Returns an outcome per RMA number: 'updated', 'unchanged' or 'not found'.
+    """
+    new_status = RMAStatus.coerce(new_status)
+    rma_numbers = list(dict.fromkeys(int(num) for num in rma_numbers))
+    outcomes: dict[int, str] = {}
+
+    with SessionLocal() as session:
+        current: dict[int, RMAStatus] = {}
+        for chunk in _chunked(rma_numbers):
+            current.update(
+                session.execute(
+                    select(RMA.rma_number, RMA.status).where(RMA.rma_number.in_(chunk))
+                ).all()
+            )
+
+        to_update: list[int] = []
+        for rma_number in rma_numbers:
+            if rma_number not in current:
+                outcomes[rma_number] = 'not found'
+            elif current[rma_number] == new_status:
+                outcomes[rma_number] = 'unchanged'
+            else:
+                outcomes[rma_number] = 'updated'
+                to_update.append(rma_number)
+
+        try:
+            for chunk in _chunked(to_update):
+                session.execute(
+                    update(RMA)
+                    .where(RMA.rma_number.in_(chunk))
+                    .values(status=new_status),
+                    execution_options={'synchronize_session': False},
+                )
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return {num: 'failed' for num in rma_numbers}
+
+    return outcomes
+
+
+def overwrite_rma_records_bulk(changes: dict[int, dict[str, Any]]) -> dict[int, str]:
+    """
+    Overwrites fields of many RMAs in a single transaction.
+
+    `changes` maps an RMA number to the new values for any of the attributes in
+    OVERWRITABLE_ATTRIBUTES. The rows are written with one executemany UPDATE per
+    table (rmas and rma_notes). RMAs whose notes alone change get their
+    last_updated set by a separate UPDATE, as the database clock would have.
+
+    Returns an outcome per RMA number: 'updated' or 'not found'.
+    """
+    for values in changes.values():
+        unknown = set(values) - set(OVERWRITABLE_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f'Cannot overwrite RMA attributes: {sorted(unknown)}')
+
+    rma_numbers = [int(num) for num in changes]
+    outcomes: dict[int, str] = {}
+
+    with SessionLocal() as session:
+        existing: set[int] = set()
+        for chunk in _chunked(rma_numbers):
+            existing.update(
+                session.scalars(select(RMA.rma_number).where(RMA.rma_number.in_(chunk)))
+            )
+
+        params: list[dict[str, Any]] = []
+        notes_params: list[dict[str, Any]] = []
+        notes_only: list[int] = []
+        for rma_number, values in changes.items():
+            rma_number = int(rma_number)
+            if rma_number not in existing:
+                outcomes[rma_number] = 'not found'
+                continue
+            row = dict(values)
+            if 'status' in row:
+                row['status'] = RMAStatus.coerce(row['status'])
+            if type(row.get('shipped_back_on')) is str:
+                row['shipped_back_on'] = datetime.strptime(
+                    row['shipped_back_on'], '%Y-%m-%d'
+                )
+            row['rma_number'] = rma_number
+            notes = split_notes(row)
+            if len(notes) > 1:
+                notes_params.append(notes)
+            if len(row) > 1:
+                params.append(row)  # last_updated is set by its onupdate
+            else:  # only the notes change, but it is still an edit
+                notes_only.append(rma_number)
+            outcomes[rma_number] = 'updated'
+
+        try:
+            if params:
+                session.execute(update(RMA), params)  # ORM bulk UPDATE by primary key
+            if notes_params:
+                session.execute(update(RMANotes), notes_params)
+            for chunk in _chunked(notes_only):
+                session.execute(
+                    update(RMA)
+                    .where(RMA.rma_number.in_(chunk))
+                    .values(last_updated=func.now())
+                )
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return {num: 'failed' for num in rma_numbers}
+
+    return outcomes
+
+
+def _chunked(values: Sequence[int]) -> Iterator[Sequence[int]]:
+    for start in range(0, len(values), BULK_CHUNK_SIZE):
+        yield values[start : start + BULK_CHUNK_SIZE]
+
+
+def latest_change_seq() -> int:
+    """Returns the sequence number of the newest journal entry, or 0 if empty."""
+    with SessionLocal() as session:
+        return session.execute(select(func.max(RMAChange.seq))).scalar() or 0
+
+
+def changes_since(seq: int, limit: int | None = None) -> list[RMAChange]:
+    """
+    Returns the journal entries written after sequence number `seq`, oldest first.
+
+    A consumer stores the `seq` of the last entry it processed and passes it back
+    on the next call, so each call costs O(changes) rather than a table rescan.
+    """
+    stmt = select(RMAChange).where(RMAChange.seq > seq).order_by(RMAChange.seq)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    with SessionLocal() as session:
+        return list(session.scalars(stmt))
+
+
+def rma_number_block(year: int | None = None) -> tuple[int, int]:
+    """Returns the first and last RMA number of a year's block, e.g. 26001-26999."""
+    if year is None:
+        year = int(datetime.now().strftime('%y'))
+    base = year * RMA_NUMBERS_PER_YEAR
+    return base + 1, base + RMA_NUMBERS_PER_YEAR - 1
+
+
+def _highest_rma_number_in(first: int, last: int):
+    # An integer range on the primary key: one index seek, not a scan
+    return (
+        select(func.max(RMA.rma_number))
+        .where(RMA.rma_number.between(first, last))
+        .scalar_subquery()
+    )
+
+
+def allocate_rma_number(session: Session) -> int:
+    """
+    Reserves the next RMA number of the current year inside `session`'s
+    transaction.
+
+    The UPDATE takes SQLite's write lock, which is held until the caller
+    commits or rolls back, so a concurrent allocation waits and then continues
+    from the committed value. RMAs numbered by hand (e.g. `cli add-rma
+    --rma-number`) are skipped over.
+    """
+    year = int(datetime.now().strftime('%y'))
+    first, last = rma_number_block(year)
+
+    session.execute(
+        sqlite_insert(RMANumberSequence)
+        .values(year=year, last_number=first - 1)
+        .on_conflict_do_nothing()
+    )
+    rma_number = session.execute(
+        update(RMANumberSequence)
+        .where(RMANumberSequence.year == year)
+        .values(
+            last_number=func.max(
+                RMANumberSequence.last_number,
+                func.coalesce(_highest_rma_number_in(first, last), first - 1),
+            )
+            + 1
+        )
+        .returning(RMANumberSequence.last_number)
+    ).scalar_one()
+    if rma_number > last:
+        raise ValueError(f'All RMA numbers from {first} to {last} are taken.')
+    return rma_number
+
+
+def generate_rma_number() -> int:
+    """
+    Returns the number the next new RMA will probably get, for display only.
+    The number is actually assigned by allocate_rma_number() when the RMA is
+    inserted.
+    """
+    year = int(datetime.now().strftime('%y'))
+    first, last = rma_number_block(year)
+    with SessionLocal() as session:
+        last_number = session.execute(
+            select(
+                func.max(
+                    func.coalesce(
+                        select(RMANumberSequence.last_number)
+                        .where(RMANumberSequence.year == year)
+                        .scalar_subquery(),
+                        first - 1,
+                    ),
+                    func.coalesce(_highest_rma_number_in(first, last), first - 1),
+                )
+            )
+        ).scalar_one()
+    return last_number + 1
+
+
+def get_status_counts() -> dict[str, int]:
+    with SessionLocal() as session:
+        rows = session.execute(
+            select(all_rmas.c.status, func.count())
+            .group_by(all_rmas.c.status)
+            .order_by(all_rmas.c.status)
+        ).all()
+    return {status.label: count for status, count in rows}
+
+
+def get_open_backlog_by_status() -> dict[str, int]:
+    with SessionLocal() as session:
+        rows = session.execute(
+            select(RMA.status, func.count())
+            .where(RMA_IS_OPEN)
+            .group_by(RMA.status)
+            .order_by(RMA.status)
+        ).all()
+    return {status.label: count for status, count in rows}
+
+
+def get_counts_by_customer() -> list[tuple[str, int]]:
+    stmt = (
+        select(Customer.name, func.count(all_rmas.c.rma_number))
+        .join(all_rmas, all_rmas.c.customer_id == Customer.id)
+        .group_by(Customer.id)
+        .order_by(func.count(all_rmas.c.rma_number).desc(), Customer.name)
+    )
+    with SessionLocal() as session:
+        return [(name, count) for name, count in session.execute(stmt)]
+
+
+def get_counts_by_product() -> list[tuple[str, int]]:
+    stmt = (
+        select(Product.name, func.count(all_rmas.c.rma_number))
+        .join(PartNumber, PartNumber.product_id == Product.id)
+        .join(all_rmas, all_rmas.c.part_number_id == PartNumber.id)
+        .group_by(Product.id)
+        .order_by(func.count(all_rmas.c.rma_number).desc(), Product.name)
+    )
+    with SessionLocal() as session:
+        return [(name, count) for name, count in session.execute(stmt)]
+
+
+def get_monthly_counts() -> list[tuple[str, int]]:
+    """Returns (YYYY-MM, number of RMAs issued that month), oldest month first."""
+    month = func.strftime('%Y-%m', all_rmas.c.issued_on)
+    with SessionLocal() as session:
+        rows = session.execute(
+            select(month, func.count()).group_by(month).order_by(month)
+        ).all()
+    return [(month_label, count) for month_label, count in rows]
+
+
+def get_warranty_ratio() -> float | None:
+    """Returns the fraction of RMAs that are warranty returns, or None if empty."""
+    with SessionLocal() as session:
+        total, warranty = session.execute(
+            select(func.count(), func.sum(case((all_rmas.c.is_warranty, 1), else_=0)))
+        ).one()
+    return (warranty or 0) / total if total else None
+
+
+def get_turnaround_stats(
+    percentiles: Sequence[int] = (50, 75, 90, 95),
+) -> dict[str, float]:
+    """
+    Summarizes the days from `issued_on` to `shipped_back_on` for shipped RMAs.
+
+    The day counts are computed by SQLite with julianday() and only the sorted
+    numbers are fetched. RMAs shipped back before they were issued are entry
+    errors and left out. Returns 'count', 'mean' and one 'p<N>' entry per
+    requested percentile (nearest-rank), or only 'count' if nothing has shipped.
+    """
+    days = func.julianday(all_rmas.c.shipped_back_on) - func.julianday(
+        all_rmas.c.issued_on
+    )
+    with SessionLocal() as session:
+        values: list[float] = list(
+            session.scalars(
+                select(days)
+                .where(
+                    all_rmas.c.shipped_back_on.is_not(None),
+                    all_rmas.c.issued_on.is_not(None),
+                    all_rmas.c.shipped_back_on >= all_rmas.c.issued_on,
+                )
+                .order_by(days)
+            )
+        )
+
+    stats: dict[str, float] = {'count': len(values)}
+    if not values:
+        return stats
+
+    stats['mean'] = sum(values) / len(values)
+    for pct in percentiles:
+        rank = max(math.ceil(pct / 100 * len(values)), 1)
+        stats[f'p{pct}'] = values[rank - 1]
+    return stats
+
+
 def get_newest_rma_num() -> int | None:
     with SessionLocal() as session:
         return session.execute(
@@ -206,17 +565,93 @@ def get_oldest_rma_num() -> int | None:
 
 
 def get_rma_by_rma_num(rma_number: int) -> RMA | None:
+    """Looks the RMA up in rma.db first and falls back to the archive."""
     with SessionLocal() as session:
-        return (
+        rma = (
             session.query(RMA)
             .options(
                 joinedload(RMA.part_number).joinedload(PartNumber.product),
                 joinedload(RMA.customer),
                 joinedload(RMA.issued_by),
+                selectinload(RMA.notes),
             )
             .filter_by(rma_number=rma_number)
             .first()
         )
+        if rma is not None:
+            return rma
+
+        archived = load_archived_rmas(
+            session, archived_rmas.c.rma_number == rma_number, limit=1
+        )
+        return archived[0] if archived else None
+
+
+def get_rma_window(rma_number: int, before: int, after: int) -> list[RMA]:
+    """
+    Returns up to `before` RMAs numbered below `rma_number`, the RMA itself if it
+    exists, and up to `after` RMAs above it, in RMA number order.
+
+    Both sides are range scans on the primary key, so the cost depends on the
+    window size rather than on the table. Archived RMAs are not included.
+    """
+    options = (
+        joinedload(RMA.part_number).joinedload(PartNumber.product),
+        joinedload(RMA.customer),
+        joinedload(RMA.issued_by),
+        selectinload(RMA.notes),
+    )
+    with SessionLocal() as session:
+        below = (
+            session.query(RMA)
+            .options(*options)
+            .filter(RMA.rma_number < rma_number)
+            .order_by(desc(RMA.rma_number))
+            .limit(before)
+            .all()
+        )
+        rest = (
+            session.query(RMA)
+            .options(*options)
+            .filter(RMA.rma_number >= rma_number)
+            .order_by(asc(RMA.rma_number))
+            .limit(after + 1)
+            .all()
+        )
+    return below[::-1] + rest
+
+
+def get_rmas_by_rma_nums(rma_numbers: Sequence[int]) -> list[RMA]:
+    rmas: list[RMA] = []
+    with SessionLocal() as session:
+        for chunk in _chunked(list(rma_numbers)):
+            rmas.extend(
+                session.query(RMA)
+                .options(
+                    joinedload(RMA.part_number).joinedload(PartNumber.product),
+                    joinedload(RMA.customer),
+                    joinedload(RMA.issued_by),
+                    selectinload(RMA.notes),
+                )
+                .filter(RMA.rma_number.in_(chunk))
+                .all()
+            )
+    return rmas
+
+
+def get_reasons_for_return(rma_numbers: Sequence[int]) -> dict[int, str]:
+    """Returns the full reason for return of each RMA, keyed by RMA number."""
+    reasons: dict[int, str] = {}
+    with SessionLocal() as session:
+        for chunk in _chunked(list(rma_numbers)):
+            reasons.update(
+                session.execute(
+                    select(RMANotes.rma_number, RMANotes.reason_for_return).where(
+                        RMANotes.rma_number.in_(chunk)
+                    )
+                ).all()
+            )
+    return reasons
 
 
 def get_rma_by_sn(serial_num: str, fuzzy: bool = False) -> RMA | None:
@@ -228,6 +663,7 @@ def get_rma_by_sn(serial_num: str, fuzzy: bool = False) -> RMA | None:
                     joinedload(RMA.part_number).joinedload(PartNumber.product),
                     joinedload(RMA.customer),
                     joinedload(RMA.issued_by),
+                    selectinload(RMA.notes),
                 )
                 .filter(RMA.serial_number.like(f'%{serial_num}%'))
                 .order_by(RMA.rma_number.desc())
@@ -240,6 +676,7 @@ def get_rma_by_sn(serial_num: str, fuzzy: bool = False) -> RMA | None:
                 joinedload(RMA.part_number).joinedload(PartNumber.product),
                 joinedload(RMA.customer),
                 joinedload(RMA.issued_by),
+                selectinload(RMA.notes),
             )
             .filter_by(serial_number=serial_num)
             .order_by(RMA.rma_number.desc())
@@ -247,6 +684,38 @@ def get_rma_by_sn(serial_num: str, fuzzy: bool = False) -> RMA | None:
         )
 
 
+def find_rmas_by_sn(
+    serial_num: str, limit: int = 50, include_archive: bool = True
+) -> list[RMA]:
+    """
+    Returns up to `limit` RMAs whose serial number contains `serial_num`, newest first.
+    Archived RMAs are included unless include_archive is False.
+    """
+    with SessionLocal() as session:
+        rmas = (
+            session.query(RMA)
+            .options(
+                joinedload(RMA.part_number).joinedload(PartNumber.product),
+                joinedload(RMA.customer),
+                joinedload(RMA.issued_by),
+                selectinload(RMA.notes),
+            )
+            .filter(RMA.serial_number.like(f'%{serial_num}%'))
+            .order_by(RMA.rma_number.desc())
+            .limit(limit)
+            .all()
+        )
+        if include_archive:
+            rmas += load_archived_rmas(
+                session,
+                archived_rmas.c.serial_number.like(f'%{serial_num}%'),
+                limit=limit,
+            )
+
+    rmas.sort(key=attrgetter('rma_number'), reverse=True)
+    return rmas[:limit]
+
+
 def overwrite_rma_record(rma_number: str, entries: list[str | bool | None]) -> bool:
     with SessionLocal() as session:
         rma = session.query(RMA).filter_by(rma_number=rma_number).first()
@@ -254,28 +723,20 @@ def overwrite_rma_record(rma_number: str, entries: list[str | bool | None]) -> b
         if not rma:
             return False
 
-        # List of attribute names to overwrite
-        attribute_names = [
-            'reason_for_return',
-            'status',
-            'customer_po_number',
-            'work_order',
-            'incoming_inspection_notes',
-            'resolution_notes',
-            'shipped_back_on',
-            'is_warranty',
-        ]
-
-        if len(entries) != len(attribute_names):
+        if len(entries) != len(OVERWRITABLE_ATTRIBUTES):
             raise ValueError(
                 'The number of entries does not match the number of attributes to overwrite.'
             )
 
         # Set new values
-        for attr, value in zip(attribute_names, entries):
+        for attr, value in zip(OVERWRITABLE_ATTRIBUTES, entries):
             if attr == 'shipped_back_on' and type(value) is str:
                 value = datetime.strptime(value, '%Y-%m-%d')
+            if attr == 'status':
+                value = RMAStatus.coerce(value)
             setattr(rma, attr, value)
+        if rma.notes is not None and session.is_modified(rma.notes):
+            rma.last_updated = func.now()  # also when only the notes changed
 
         session.commit()
         return True
@@ -0,0 +1,189 @@
+"""
+Moves long-closed RMAs out of rma.db into rma_archive.db and back.
+
+Run it as a module like this `python -m src.archive archive --years 3` or
+`python -m src.archive restore 19001 19002`. The same operations are available
+as `python -m src.cli archive` and `python -m src.cli restore`.
+"""
+
+import argparse
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, insert, or_, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .database import (
+    RMA,
+    RMA_COLUMNS,
+    RMA_NOTES_COLUMNS,
+    PartNumber,
+    RMANotes,
+    RMAStatus,
+    SessionLocal,
+    archived_rma_notes,
+    archived_rmas,
+)
+
+DEFAULT_ARCHIVE_AFTER_YEARS = 3
+
+
+def archive_cutoff(years: int) -> datetime:
+    return datetime.now() - timedelta(days=round(365.25 * years))
+
+
+def archive_closed_rmas(
+    older_than_years: int = DEFAULT_ARCHIVE_AFTER_YEARS, dry_run: bool = False
+) -> list[int]:
+    """
+    Moves RMAs that were closed more than `older_than_years` ago to the archive.
+
+    An RMA counts as closed on its ship-back date, or on its last update if it
+    was closed without one. Its notes move with it. The copies and the deletes
+    run in one transaction.
+
+    Returns the archived RMA numbers (or the ones that would be, if dry_run).
+    """
+    cutoff = archive_cutoff(older_than_years)
+    condition = and_(
+        RMA.status == RMAStatus.CLOSED,
+        or_(
+            RMA.shipped_back_on < cutoff,
+            and_(RMA.shipped_back_on.is_(None), RMA.last_updated < cutoff),
+        ),
+    )
+
+    with SessionLocal() as session:
+        rma_numbers = list(
+            session.scalars(
+                select(RMA.rma_number).where(condition).order_by(RMA.rma_number)
+            )
+        )
+        if dry_run or not rma_numbers:
+            return rma_numbers
+
+        columns = [RMA.__table__.c[name] for name in RMA_COLUMNS]
+        session.execute(
+            insert(archived_rmas).from_select(
+                RMA_COLUMNS, select(*columns).where(condition)
+            )
+        )
+        moved = RMANotes.rma_number.in_(rma_numbers)
+        notes_columns = [RMANotes.__table__.c[name] for name in RMA_NOTES_COLUMNS]
+        session.execute(
+            insert(archived_rma_notes).from_select(
+                RMA_NOTES_COLUMNS, select(*notes_columns).where(moved)
+            )
+        )
+        session.execute(delete(RMANotes).where(moved))
+        session.execute(delete(RMA).where(condition))
+        session.commit()
+
+    return rma_numbers
+
+
+def restore_rmas(rma_numbers: Sequence[int]) -> list[int]:
+    """
+    Moves the given RMAs from the archive back into rma.db in one transaction.
+
+    Returns the RMA numbers that were found in the archive and restored.
+    """
+    condition = archived_rmas.c.rma_number.in_([int(num) for num in rma_numbers])
+
+    with SessionLocal() as session:
+        restored = list(
+            session.scalars(
+                select(archived_rmas.c.rma_number)
+                .where(condition)
+                .order_by(archived_rmas.c.rma_number)
+            )
+        )
+        if not restored:
+            return []
+
+        columns = [archived_rmas.c[name] for name in RMA_COLUMNS]
+        session.execute(
+            insert(RMA.__table__).from_select(
+                RMA_COLUMNS, select(*columns).where(condition)
+            )
+        )
+        notes_condition = archived_rma_notes.c.rma_number.in_(restored)
+        notes_columns = [archived_rma_notes.c[name] for name in RMA_NOTES_COLUMNS]
+        session.execute(
+            insert(RMANotes.__table__).from_select(
+                RMA_NOTES_COLUMNS, select(*notes_columns).where(notes_condition)
+            )
+        )
+        session.execute(delete(archived_rma_notes).where(notes_condition))
+        session.execute(delete(archived_rmas).where(condition))
+        session.commit()
+
+    return restored
+
+
+def load_archived_rmas(
+    session: Session, condition, limit: int | None = None
+) -> list[RMA]:
+    """
+    Loads archived rows matching `condition` as RMA objects, newest first.
+
+    The rows are mapped onto the RMA class with from_statement(), and their
+    customer, part number/product and issuer are loaded from rma.db, so callers
+    can use them like any other RMA. Their notes are read from the archive's
+    rma_notes. They are read-only: writes through the ORM go to rma.db, so an
+    RMA has to be restored before it can be edited.
+    """
+    stmt = (
+        select(archived_rmas)
+        .where(condition)
+        .order_by(archived_rmas.c.rma_number.desc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    rmas = list(
+        session.scalars(
+            select(RMA)
+            .from_statement(stmt)
+            .options(
+                selectinload(RMA.part_number).selectinload(PartNumber.product),
+                selectinload(RMA.customer),
+                selectinload(RMA.issued_by),
+            )
+        )
+    )
+
+    notes = {
+        row.rma_number: row
+        for row in session.execute(
+            select(archived_rma_notes).where(
+                archived_rma_notes.c.rma_number.in_(
+                    select(stmt.subquery().c.rma_number)
+                )
+            )
+        )
+    }
+    for rma in rmas:
+        row = notes.get(rma.rma_number)
+        set_committed_value(rma, 'notes', RMANotes(**row._mapping) if row else None)
+    return rmas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    archive = subparsers.add_parser('archive')
+    archive.add_argument('--years', type=int, default=DEFAULT_ARCHIVE_AFTER_YEARS)
+    archive.add_argument('--dry-run', action='store_true')
+    restore = subparsers.add_parser('restore')
+    restore.add_argument('rma_numbers', nargs='+', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'archive':
+        moved = archive_closed_rmas(args.years, args.dry_run)
+        verb = 'Would archive' if args.dry_run else 'Archived'
+        print(f'{verb} {len(moved)} RMAs closed more than {args.years} years ago.')
+    else:
+        moved = restore_rmas(args.rma_numbers)
+        print(f'Restored {len(moved)} RMAs: {", ".join(map(str, moved))}')
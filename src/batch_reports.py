@@ -0,0 +1,177 @@
+"""
+Generates one open-RMA PDF per customer or per product in parallel.
+
+Run it as a module like this
+`python -m src.batch_reports --by customer --out "C:/RMA Reports"`
+"""
+
+import argparse
+import hashlib
+import os
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Literal
+
+from sqlalchemy import func, select
+
+from .database import (
+    RMA,
+    RMA_IS_OPEN,
+    Customer,
+    PartNumber,
+    Product,
+    RMANotes,
+    SessionLocal,
+    status_label,
+)
+from .pdf import PDF, RowDataSource, format_cell
+
+PartitionKey = Literal['customer', 'product']
+
+OPEN_RMA_HEADERS: tuple[str, ...] = (
+    'RMA #',
+    'Customer',
+    'Product',
+    'Part #',
+    'Serial #',
+    'Reason for Return',
+    'Warranty',
+    'Status',
+)
+PARTITION_COLUMNS: dict[str, int] = {
+    'customer': OPEN_RMA_HEADERS.index('Customer'),
+    'product': OPEN_RMA_HEADERS.index('Product'),
+}
+
+
+def fetch_open_rma_rows() -> list[tuple[str, ...]]:
+    """
+    Returns every open RMA as a tuple of display strings in OPEN_RMA_HEADERS order.
+
+    This is a single joined Core query, so no ORM objects are materialized.
+    The reports print the full reason for return from rma_notes, not the
+    shortened reason_summary the tables show.
+    """
+    stmt = (
+        select(
+            RMA.rma_number,
+            Customer.name,
+            Product.name,
+            PartNumber.number,
+            RMA.serial_number,
+            func.coalesce(RMANotes.reason_for_return, RMA.reason_summary),
+            RMA.is_warranty,
+            status_label(RMA.status),
+        )
+        .join(Customer, RMA.customer_id == Customer.id)
+        .join(PartNumber, RMA.part_number_id == PartNumber.id)
+        .join(Product, PartNumber.product_id == Product.id)
+        .outerjoin(RMANotes, RMA.rma_number == RMANotes.rma_number)
+        .where(RMA_IS_OPEN)
+        .order_by(RMA.rma_number)
+    )
+
+    with SessionLocal() as session:
+        result = session.execute(stmt).all()
+
+    rows: list[tuple[str, ...]] = []
+    for row in result:
+        values = list(row)
+        values[6] = 'Yes' if values[6] else 'No'
+        rows.append(tuple(format_cell(value) for value in values))
+    return rows
+
+
+def partition_rows(
+    rows: Sequence[tuple[str, ...]], partition_by: PartitionKey
+) -> dict[str, list[tuple[str, ...]]]:
+    column = PARTITION_COLUMNS[partition_by]
+    partitions: dict[str, list[tuple[str, ...]]] = defaultdict(list)
+    for row in rows:
+        partitions[row[column]].append(row)
+    return dict(partitions)
+
+
+def report_file_names(
+    partition_by: PartitionKey, keys: Iterable[str]
+) -> dict[str, str]:
+    """
+    Returns the PDF file name for each partition key.
+
+    Keys are reduced to file-name-safe characters, so different keys can end up
+    with the same name, ignoring case as Windows does (e.g. 'A/B' and 'a b').
+    Each of those gets a short hash of its key appended, so no report
+    overwrites another and a key keeps its file name from run to run.
+    """
+    safe_keys = {
+        key: re.sub(r'[^A-Za-z0-9._-]+', '_', key).strip('_') or 'unnamed'
+        for key in keys
+    }
+    uses = Counter(safe_key.casefold() for safe_key in safe_keys.values())
+    names: dict[str, str] = {}
+    for key, safe_key in safe_keys.items():
+        if uses[safe_key.casefold()] > 1:
+            safe_key += '-' + hashlib.sha1(key.encode()).hexdigest()[:8]
+        names[key] = f'open_rmas_{partition_by}_{safe_key}.pdf'
+    return names
+
+
+def render_report(title: str, rows: Sequence[tuple[str, ...]], pdf_path: Path) -> Path:
+    # Module-level so it can be pickled and run in a worker process.
+    source = RowDataSource(OPEN_RMA_HEADERS, rows)
+    return PDF(source, title=title).save(pdf_path)
+
+
+def generate_batch_reports(
+    output_dir: Path,
+    partition_by: PartitionKey = 'customer',
+    max_workers: int | None = None,
+) -> list[Path]:
+    """
+    Writes one open-RMA PDF for every distinct customer or product to output_dir.
+
+    The open RMAs are queried once in the calling process; each partition is then
+    rendered in its own process so the work is spread across all cores.
+
+    Returns the paths of the written PDFs, sorted by file name.
+    """
+    if partition_by not in PARTITION_COLUMNS:
+        raise ValueError(f'Cannot partition reports by "{partition_by}"')
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    partitions = partition_rows(fetch_open_rma_rows(), partition_by)
+    if not partitions:
+        return []
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(partitions))
+    file_names = report_file_names(partition_by, partitions)
+    written: list[Path] = []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                render_report,
+                f'Open RMAs - {key.upper()}',
+                rows,
+                output_dir / file_names[key],
+            )
+            for key, rows in partitions.items()
+        ]
+        for future in as_completed(futures):
+            written.append(future.result())
+
+    return sorted(written)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--by', choices=sorted(PARTITION_COLUMNS), default='customer')
+    parser.add_argument('--out', type=Path, required=True)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    paths = generate_batch_reports(args.out, args.by, args.workers)
+    print(f'Wrote {len(paths)} reports to {args.out}')
@@ -0,0 +1,347 @@
+"""
+Headless command-line interface to the RMA database.
+
+Run it as a module like this `python -m src.cli <command> [options]`, for example
+`python -m src.cli update-status Closed 25001 25002 25003` or
+`python -m src.cli update-status Closed --csv shipped.csv`.
+Use `python -m src.cli --help` to list the commands.
+"""
+
+import argparse
+import csv
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from .api import (
+    RMA_STATUSES,
+    add_rma,
+    find_rmas_by_sn,
+    get_counts_by_customer,
+    get_counts_by_product,
+    get_monthly_counts,
+    get_status_counts,
+    get_turnaround_stats,
+    get_warranty_ratio,
+    update_status_bulk,
+)
+from .archive import (
+    DEFAULT_ARCHIVE_AFTER_YEARS,
+    archive_closed_rmas,
+    restore_rmas,
+)
+from .batch_reports import (
+    OPEN_RMA_HEADERS,
+    fetch_open_rma_rows,
+    generate_batch_reports,
+)
+from .csv_io.export_to_csv import EXPORT_FILE, export_rmas_to_csv
+from .csv_io.export_to_parquet import PARQUET_EXPORT_FILE, export_rmas_to_parquet
+from .csv_io.import_from_access_csv import import_csv
+from .csv_io.import_from_sqlite_csv import import_rmas_from_csv
+from .csv_io.import_pipeline import ImportCheckpointError
+from .database import Customer, PartNumber, SessionLocal, User, initialize_database
+from .migrations import run_migrations
+from .pdf import PDF, RowDataSource
+from .snapshot import (
+    SNAPSHOT_KEEP,
+    create_snapshot,
+    list_snapshots,
+    resolve_snapshot,
+    restore_snapshot,
+)
+
+
+def read_rma_numbers_csv(csv_path: Path) -> list[int]:
+    """
+    Reads RMA numbers from the 'rma_number' (or 'RMA') column of a CSV file.
+    Files without either header are read from their first column.
+    """
+    with csv_path.open(newline='', encoding='utf-8-sig') as file:
+        rows = [row for row in csv.reader(file) if row]
+
+    if not rows:
+        return []
+
+    column = 0
+    header = [name.strip().lower() for name in rows[0]]
+    for name in ('rma_number', 'rma'):
+        if name in header:
+            column = header.index(name)
+            rows = rows[1:]
+            break
+
+    return [int(row[column]) for row in rows if row[column].strip()]
+
+
+def resolve_id(model, column, value: str) -> int:
+    # Names imported from the old Access database keep their original case.
+    with SessionLocal() as session:
+        row_id = session.execute(
+            select(model.id).where(func.lower(column) == value.strip().lower())
+        ).scalar_one_or_none()
+    if row_id is None:
+        raise SystemExit(f'{model.__name__} "{value}" not found.')
+    return row_id
+
+
+def cmd_add_rma(args: argparse.Namespace) -> int:
+    rma_number = add_rma(
+        rma_number=args.rma_number,
+        customer_id=resolve_id(Customer, Customer.name, args.customer),
+        part_number_id=resolve_id(PartNumber, PartNumber.number, args.part_number),
+        serial_number=args.serial,
+        reason_for_return=args.reason,
+        issued_by_id=resolve_id(User, User.name, args.issued_by),
+        is_warranty=args.warranty,
+        customer_po_number=args.po,
+    )
+    if rma_number is None:
+        print('Failed to add the RMA.', file=sys.stderr)
+        return 1
+    print(f'Added RMA-{rma_number}')
+    return 0
+
+
+def cmd_update_status(args: argparse.Namespace) -> int:
+    rma_numbers: list[int] = list(args.rma_numbers)
+    if args.csv:
+        rma_numbers.extend(read_rma_numbers_csv(args.csv))
+    if not rma_numbers:
+        print('No RMA numbers given.', file=sys.stderr)
+        return 1
+
+    outcomes = update_status_bulk(rma_numbers, args.status)
+    for rma_number, outcome in outcomes.items():
+        print(f'RMA-{rma_number}: {outcome}')
+    return 0 if 'not found' not in outcomes.values() else 1
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    if args.format == 'parquet':
+        export_rmas_to_parquet(args.out or PARQUET_EXPORT_FILE)
+    else:
+        export_rmas_to_csv(args.out or EXPORT_FILE)
+    return 0
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+    try:
+        if args.format == 'access':
+            import_csv(args.file, args.workers, args.resume, args.dry_run)
+        else:
+            import_rmas_from_csv(args.file, args.workers, args.resume, args.dry_run)
+    except ImportCheckpointError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_search_sn(args: argparse.Namespace) -> int:
+    rmas = find_rmas_by_sn(args.serial, limit=args.limit)
+    for rma in rmas:
+        print(
+            f'{rma.rma_number}\t{rma.serial_number}\t'
+            f'{rma.customer.name.upper()}\t{rma.status}'
+        )
+    return 0 if rmas else 1
+
+
+def cmd_report_pdf(args: argparse.Namespace) -> int:
+    if args.by:
+        paths = generate_batch_reports(args.out, args.by, args.workers)
+        print(f'Wrote {len(paths)} reports to {args.out}')
+        return 0
+
+    source = RowDataSource(OPEN_RMA_HEADERS, fetch_open_rma_rows())
+    pdf_path = PDF(source).save(args.out)
+    print(f'Wrote {pdf_path}')
+    return 0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    counts = get_status_counts()
+    width = max((len(status) for status in counts), default=5)
+    for status, count in counts.items():
+        print(f'{status:<{width}}  {count}')
+    print(f'{"Total":<{width}}  {sum(counts.values())}')
+
+    warranty_ratio = get_warranty_ratio()
+    if warranty_ratio is not None:
+        print(f'\nWarranty ratio: {warranty_ratio:.1%}')
+
+    turnaround = get_turnaround_stats()
+    if 'mean' in turnaround:
+        summary = ', '.join(
+            f'{key} {value:.0f}' for key, value in turnaround.items() if key != 'count'
+        )
+        print(f'Turnaround days ({int(turnaround["count"])} shipped): {summary}')
+
+    if args.by:
+        breakdown = {
+            'customer': get_counts_by_customer,
+            'product': get_counts_by_product,
+            'month': get_monthly_counts,
+        }[args.by]()
+        print()
+        for key, count in breakdown:
+            print(f'{key}\t{count}')
+    return 0
+
+
+def cmd_archive(args: argparse.Namespace) -> int:
+    moved = archive_closed_rmas(args.years, args.dry_run)
+    verb = 'Would archive' if args.dry_run else 'Archived'
+    print(f'{verb} {len(moved)} RMAs closed more than {args.years} years ago.')
+    return 0
+
+
+def cmd_restore(args: argparse.Namespace) -> int:
+    restored = restore_rmas(args.rma_numbers)
+    print(f'Restored {len(restored)} RMAs: {", ".join(map(str, restored))}')
+    return 0 if len(restored) == len(set(args.rma_numbers)) else 1
+
+
+def cmd_snapshot(args: argparse.Namespace) -> int:
+    print(f'Wrote snapshot {create_snapshot(keep=args.keep)}')
+    return 0
+
+
+def cmd_list_snapshots(args: argparse.Namespace) -> int:
+    for folder in list_snapshots():
+        print(folder.name)
+    return 0
+
+
+def cmd_restore_snapshot(args: argparse.Namespace) -> int:
+    for path in restore_snapshot(resolve_snapshot(args.name)):
+        print(f'Restored {path}')
+    return 0
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    if args.dry_run:
+        if not run_migrations(dry_run=True):
+            print('The schema is up to date.')
+        return 0
+    applied = initialize_database()
+    print(f'Applied {len(applied)} migrations: {", ".join(applied) or "none"}')
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli', description='RMA database batch operations.'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add = subparsers.add_parser('add-rma', help='Issue a new RMA.')
+    add.add_argument('--customer', required=True)
+    add.add_argument('--part-number', required=True)
+    add.add_argument('--serial', required=True)
+    add.add_argument('--reason', required=True)
+    add.add_argument('--issued-by', required=True)
+    add.add_argument('--warranty', action='store_true')
+    add.add_argument('--po', default=None, help='Customer PO number.')
+    add.add_argument('--rma-number', type=int, default=None)
+    add.set_defaults(func=cmd_add_rma)
+
+    status = subparsers.add_parser(
+        'update-status', help='Set the status of many RMAs in one transaction.'
+    )
+    status.add_argument('status', choices=RMA_STATUSES)
+    status.add_argument('rma_numbers', nargs='*', type=int)
+    status.add_argument('--csv', type=Path, default=None)
+    status.set_defaults(func=cmd_update_status)
+
+    export = subparsers.add_parser('export', help='Write the CSV or Parquet backup.')
+    export.add_argument('--out', type=Path, default=None)
+    export.add_argument('--format', choices=('csv', 'parquet'), default='csv')
+    export.set_defaults(func=cmd_export)
+
+    import_ = subparsers.add_parser('import', help='Import RMAs from a CSV file.')
+    import_.add_argument('file', type=Path)
+    import_.add_argument('--format', choices=('sqlite', 'access'), default='sqlite')
+    import_.add_argument('--workers', type=int, default=None)
+    import_.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted import from its checkpoint.',
+    )
+    import_.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Report what would be imported without writing anything.',
+    )
+    import_.set_defaults(func=cmd_import)
+
+    search = subparsers.add_parser('search-sn', help='Find RMAs by partial S/N.')
+    search.add_argument('serial')
+    search.add_argument('--limit', type=int, default=50)
+    search.set_defaults(func=cmd_search_sn)
+
+    report = subparsers.add_parser('report-pdf', help='Write open-RMA PDF reports.')
+    report.add_argument(
+        '--out',
+        type=Path,
+        required=True,
+        help='PDF file, or output directory when --by is given.',
+    )
+    report.add_argument('--by', choices=('customer', 'product'), default=None)
+    report.add_argument('--workers', type=int, default=None)
+    report.set_defaults(func=cmd_report_pdf)
+
+    stats = subparsers.add_parser('stats', help='Print RMA statistics.')
+    stats.add_argument('--by', choices=('customer', 'product', 'month'), default=None)
+    stats.set_defaults(func=cmd_stats)
+
+    archive = subparsers.add_parser(
+        'archive', help='Move long-closed RMAs to rma_archive.db.'
+    )
+    archive.add_argument('--years', type=int, default=DEFAULT_ARCHIVE_AFTER_YEARS)
+    archive.add_argument('--dry-run', action='store_true')
+    archive.set_defaults(func=cmd_archive)
+
+    restore = subparsers.add_parser(
+        'restore', help='Move archived RMAs back into rma.db.'
+    )
+    restore.add_argument('rma_numbers', nargs='+', type=int)
+    restore.set_defaults(func=cmd_restore)
+
+    snapshot = subparsers.add_parser(
+        'snapshot', help='Write a compressed snapshot of the database files.'
+    )
+    snapshot.add_argument('--keep', type=int, default=SNAPSHOT_KEEP)
+    snapshot.set_defaults(func=cmd_snapshot)
+
+    snapshots = subparsers.add_parser('list-snapshots', help='List the snapshots.')
+    snapshots.set_defaults(func=cmd_list_snapshots)
+
+    restore_snapshot_ = subparsers.add_parser(
+        'restore-snapshot', help='Replace the database files with a snapshot.'
+    )
+    restore_snapshot_.add_argument('name')
+    restore_snapshot_.set_defaults(func=cmd_restore_snapshot)
+
+    migrate = subparsers.add_parser(
+        'migrate', help='Apply pending schema migrations to rma.db.'
+    )
+    migrate.add_argument(
+        '--dry-run', action='store_true', help='Print the pending DDL only.'
+    )
+    migrate.set_defaults(func=cmd_migrate)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.func is not cmd_migrate:
+        initialize_database()  # creates tables and applies pending migrations
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,16 @@
 import csv
 from pathlib import Path
 
+from sqlalchemy import true
+from sqlalchemy.orm import selectinload
+
+from ..archive import load_archived_rmas
 from ..database import RMA, SessionLocal
 
 EXPORT_FILE = Path('//opdata2/Company/PRODUCTION FOLDER/RMA/HyperionRMAs_backup.csv')
 
 
-def export_rmas_to_csv() -> None:
+def export_rmas_to_csv(export_file: Path = EXPORT_FILE) -> None:
     session = SessionLocal()
 
     # Define the fieldnames (column headers) for the CSV
@@ -29,11 +33,15 @@ def export_rmas_to_csv() -> None:
         'shipped_back_on',
     ]
 
-    with EXPORT_FILE.open('w', newline='', encoding='utf-8') as csvfile:
+    with export_file.open('w', newline='', encoding='utf-8') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
 
-        for rma in session.query(RMA).all():
+        # Archived RMAs are part of the backup too (see src/archive.py)
+        rmas = session.query(RMA).options(
+            selectinload(RMA.notes)
+        ).all() + load_archived_rmas(session, true())
+        for rma in rmas:
             writer.writerow(
                 {
                     'rma_number': rma.rma_number,
@@ -44,7 +52,7 @@ def export_rmas_to_csv() -> None:
                     'serial_number': rma.serial_number,
                     'is_warranty': rma.is_warranty,
                     'reason_for_return': rma.reason_for_return,
-                    'status': rma.status,
+                    'status': rma.status.label,
                     'issued_on': rma.issued_on.strftime('%Y-%m-%d')
                     if rma.issued_on
                     else '',
@@ -62,7 +70,7 @@ def export_rmas_to_csv() -> None:
             )
 
     session.close()
-    print(f'Export completed to {EXPORT_FILE}')
+    print(f'Export completed to {export_file}')
 
 
 if __name__ == '__main__':
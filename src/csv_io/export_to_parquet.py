@@ -0,0 +1,134 @@
+"""
+Columnar Parquet export of the RMA dataset, archive included.
+
+Dates are written as timestamps, is_warranty as a bool, and the repetitive
+customer/product/status/issued_by columns are dictionary encoded, so analysis
+tools can load the file directly instead of re-parsing the CSV backup, e.g.
+`pyarrow.parquet.read_table(path, filters=[('issued_on', '>=', ...)])`.
+
+Requires pyarrow, which is only needed for this export.
+"""
+
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from ..database import (
+    Customer,
+    PartNumber,
+    Product,
+    User,
+    all_rma_notes,
+    all_rmas,
+    engine,
+    status_label,
+)
+
+PARQUET_EXPORT_FILE = Path(
+    '//opdata2/Company/PRODUCTION FOLDER/RMA/HyperionRMAs_backup.parquet'
+)
+BATCH_SIZE = 5000
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    timestamp = pa.timestamp('s')
+    return pa.schema(
+        [
+            ('rma_number', pa.int64()),
+            ('issued_by', dictionary),
+            ('customer', dictionary),
+            ('part_number', pa.string()),
+            ('product', dictionary),
+            ('serial_number', pa.string()),
+            ('is_warranty', pa.bool_()),
+            ('reason_for_return', pa.string()),
+            ('status', dictionary),
+            ('issued_on', timestamp),
+            ('last_updated', timestamp),
+            ('customer_po_number', pa.string()),
+            ('work_order', pa.string()),
+            ('incoming_inspection_notes', pa.string()),
+            ('resolution_notes', pa.string()),
+            ('shipped_back_on', timestamp),
+        ]
+    )
+
+
+def export_statement():
+    # Outer joins so an RMA with a dangling lookup id is still exported.
+    return (
+        select(
+            all_rmas.c.rma_number,
+            User.name.label('issued_by'),
+            Customer.name.label('customer'),
+            PartNumber.number.label('part_number'),
+            Product.name.label('product'),
+            all_rmas.c.serial_number,
+            all_rmas.c.is_warranty,
+            func.coalesce(
+                all_rma_notes.c.reason_for_return, all_rmas.c.reason_summary
+            ).label('reason_for_return'),
+            status_label(all_rmas.c.status).label('status'),
+            all_rmas.c.issued_on,
+            all_rmas.c.last_updated,
+            all_rmas.c.customer_po_number,
+            all_rmas.c.work_order,
+            all_rma_notes.c.incoming_inspection_notes,
+            all_rma_notes.c.resolution_notes,
+            all_rmas.c.shipped_back_on,
+        )
+        .outerjoin(all_rma_notes, all_rmas.c.rma_number == all_rma_notes.c.rma_number)
+        .outerjoin(User, all_rmas.c.issued_by_id == User.id)
+        .outerjoin(Customer, all_rmas.c.customer_id == Customer.id)
+        .outerjoin(PartNumber, all_rmas.c.part_number_id == PartNumber.id)
+        .outerjoin(Product, PartNumber.product_id == Product.id)
+        .order_by(all_rmas.c.rma_number)
+    )
+
+
+def export_rmas_to_parquet(
+    export_file: Path = PARQUET_EXPORT_FILE, batch_size: int = BATCH_SIZE
+) -> int:
+    """
+    Streams every RMA into a Parquet file, one record batch per `batch_size` rows.
+
+    Rows are fetched with a server-side cursor, so only one batch is ever held in
+    memory. Returns the number of RMAs written.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError('The Parquet export requires pyarrow.') from e
+
+    schema = parquet_schema()
+    written = 0
+
+    with (
+        engine.connect() as connection,
+        pq.ParquetWriter(str(export_file), schema, compression='zstd') as writer,
+    ):
+        result = connection.execution_options(yield_per=batch_size).execute(
+            export_statement()
+        )
+        for partition in result.partitions():
+            columns = list(zip(*partition, strict=True))
+            batch = pa.RecordBatch.from_arrays(
+                [
+                    pa.array(values, type=field.type)
+                    for values, field in zip(columns, schema, strict=True)
+                ],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            written += batch.num_rows
+
+    print(f'Export completed to {export_file} ({written} RMAs)')
+    return written
+
+
+if __name__ == '__main__':
+    export_rmas_to_parquet()
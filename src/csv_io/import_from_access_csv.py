@@ -5,91 +5,72 @@ Delete the rma.db file in the X/rma_database folder.
 Run the script as a module like this `python -m src.csv_io.import_from_access_csv`
 """
 
-import csv
-from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from sqlalchemy.orm import Session
-
-from ..database import (
-    RMA,
-    Customer,
-    PartNumber,
-    Product,
-    SessionLocal,
-    User,
-    initialize_database,
-)
+from ..database import RMAStatus, initialize_database
+from .import_pipeline import Record, RowRejected, run_import
+from .parsing import parse_bool
 
 CSV_PATH = Path('//opdata2/Company/PRODUCTION FOLDER/RMA/HyperionRMAs.csv')
 
-DATE_FMT = '%m/%d/%Y'
-
-
-def parse_date(value) -> datetime | None:
-    try:
-        return datetime.strptime(value, DATE_FMT)
-    except (ValueError, TypeError):
-        return None
-
-
-def parse_bool(value: str) -> bool:
-    return value.strip().upper() == 'TRUE'
-
-
-def get_or_create(session: Session, model, **kwargs) -> Any:
-    instance = session.query(model).filter_by(**kwargs).one_or_none()
-    if instance is None:
-        instance = model(**kwargs)
-        session.add(instance)
-        session.flush()  # Assigns ID
-    return instance
-
-
-def import_csv() -> None:
+DATE_COLUMNS = ('Date RMA Issued', 'Date Product Shipped back to Customer')
+
+
+def required(row: dict[str, str], column: str) -> str:
+    value = (row.get(column) or '').strip()
+    if not value:
+        raise RowRejected(f'missing {column}')
+    return value
+
+
+def validate_row(row: dict[str, Any]) -> Record:
+    """
+    Converts one row of the Access export. Runs in an import worker process,
+    with the DATE_COLUMNS already parsed.
+    """
+    rma_number = required(row, 'RMA')
+    if not rma_number.isdigit():
+        raise RowRejected(f'bad RMA number: {rma_number!r}')
+
+    return {
+        'rma_number': int(rma_number),
+        'issued_by': (row['Issued by'] or '').strip(),
+        'customer': required(row, 'Customer'),
+        'product': required(row, 'ProductDescription'),
+        'part_number': required(row, 'Product Number'),
+        'serial_number': (row['Product Serial Number'] or '').strip(),
+        'is_warranty': parse_bool(row['Warranty']),
+        'reason_for_return': (row['Description of Problem'] or '').strip(),
+        'status': RMAStatus.CLOSED
+        if parse_bool(row['RMA Closed'])
+        else RMAStatus.ISSUED,
+        'issued_on': row['Date RMA Issued'],
+        'shipped_back_on': row['Date Product Shipped back to Customer'],
+        'customer_po_number': row['Customer PO number'].strip() or None,
+        'work_order': row['Work Order Number'].strip() or None,
+        'incoming_inspection_notes': row['Inspection/Refurb Notes'].strip() or None,
+        'resolution_notes': row['Resolution'].strip() or None,
+    }
+
+
+def import_csv(
+    csv_path: Path = CSV_PATH,
+    max_workers: int | None = None,
+    resume: bool = False,
+    dry_run: bool = False,
+) -> None:
     initialize_database()  # Ensure tables are created
 
-    with (
-        SessionLocal() as session,
-        open(CSV_PATH, newline='', encoding='utf-8-sig') as file,
-    ):
-        reader = csv.DictReader(file)
-
-        for row in reader:
-            row = {k.strip(): v for k, v in row.items()}
-            # Fetch or create related objects
-            user = get_or_create(session, User, name=row['Issued by'])
-            customer = get_or_create(session, Customer, name=row['Customer'])
-            product = get_or_create(session, Product, name=row['ProductDescription'])
-            part_number = get_or_create(
-                session, PartNumber, number=row['Product Number'], product=product
-            )
-
-            # Create RMA entry
-            rma = RMA(
-                rma_number=row['RMA'],
-                issued_by=user,
-                customer=customer,
-                part_number=part_number,
-                serial_number=row['Product Serial Number'],
-                is_warranty=parse_bool(row['Warranty']),
-                reason_for_return=row['Description of Problem'],
-                status='Closed' if parse_bool(row['RMA Closed']) else 'Issued',
-                issued_on=parse_date(row['Date RMA Issued']),
-                shipped_back_on=parse_date(
-                    row['Date Product Shipped back to Customer']
-                ),
-                customer_po_number=row['Customer PO number'] or None,
-                work_order=row['Work Order Number'] or None,
-                incoming_inspection_notes=row['Inspection/Refurb Notes'] or None,
-                resolution_notes=row['Resolution'] or None,
-            )
-
-            session.add(rma)
-
-        session.commit()
-        print('Import complete.')
+    summary = run_import(
+        csv_path,
+        validate_row,
+        max_workers,
+        resume=resume,
+        dry_run=dry_run,
+        date_columns=DATE_COLUMNS,
+    )
+    print(f'Import complete: {summary}')
 
 
 if __name__ == '__main__':
@@ -1,90 +1,73 @@
-import csv
-from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from sqlalchemy.orm import Session
-
-from ..database import (
-    RMA,
-    Customer,
-    PartNumber,
-    Product,
-    SessionLocal,
-    User,
-    initialize_database,
-)
+from ..database import RMAStatus, initialize_database
+from .import_pipeline import Record, RowRejected, run_import
+from .parsing import parse_bool
 
 DB_PATH = Path('./X/rma_database/rma.db')
 IMPORT_FILE = Path('//opdata2/Company/PRODUCTION FOLDER/RMA/HyperionRMAs2.csv')
-
-
-def parse_date(date_str: str) -> datetime | None:
+DATE_COLUMNS = ('issued_on', 'last_updated', 'shipped_back_on')
+
+
+def validate_row(row: dict[str, Any]) -> Record:
+    """
+    Converts one row of the CSV backup. Runs in an import worker process,
+    with the DATE_COLUMNS already parsed.
+    """
+    record: Record = {
+        column: (row[column] or '').strip()
+        for column in (
+            'issued_by',
+            'customer',
+            'product',
+            'part_number',
+            'serial_number',
+            'reason_for_return',
+            'status',
+        )
+    }
+    for column in ('customer', 'product', 'part_number', 'status'):
+        if not record[column]:
+            raise RowRejected(f'missing {column}')
     try:
-        return datetime.strptime(date_str, '%Y-%m-%d') if date_str else None
+        record['status'] = RMAStatus.coerce(record['status'])
+    except ValueError as e:
+        raise RowRejected(str(e)) from None
+    try:
+        record['rma_number'] = int(row['rma_number'])
     except ValueError:
-        return None
-
-
-def parse_bool(val: str) -> bool:
-    return val.lower() in ('true', '1', 'yes') if isinstance(val, str) else bool(val)
-
-
-def get_or_create(session: Session, model, **kwargs) -> Any:
-    instance = session.query(model).filter_by(**kwargs).first()
-    if not instance:
-        instance = model(**kwargs)
-        session.add(instance)
-    return instance
-
-
-def import_rmas_from_csv():
-    session = SessionLocal()
-
-    with IMPORT_FILE.open('r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-
-        for row in reader:
-            # Resolve related records
-            user = get_or_create(session, User, name=row['issued_by'])
-            customer = get_or_create(session, Customer, name=row['customer'])
-            product = get_or_create(session, Product, name=row['product'])
-            part_number = get_or_create(
-                session, PartNumber, number=row['part_number'], product=product
-            )
-
-            # Check for existing RMA to prevent duplicates
-            existing = (
-                session.query(RMA).filter_by(rma_number=row['rma_number']).first()
-            )
-            if existing:
-                print(f'Skipping existing RMA {row["rma_number"]}')
-                continue
-
-            rma = RMA(
-                rma_number=row['rma_number'],
-                issued_by=user,
-                customer=customer,
-                part_number=part_number,
-                serial_number=row['serial_number'],
-                is_warranty=parse_bool(row['is_warranty']),
-                reason_for_return=row['reason_for_return'],
-                status=row['status'],
-                issued_on=parse_date(row['issued_on']),
-                last_updated=parse_date(row['last_updated']),
-                customer_po_number=row['customer_po_number'] or None,
-                work_order=row['work_order'] or None,
-                incoming_inspection_notes=row['incoming_inspection_notes'] or None,
-                resolution_notes=row['resolution_notes'] or None,
-                shipped_back_on=parse_date(row['shipped_back_on']),
-            )
-
-            session.add(rma)
-
-        session.commit()
-        print(f'Import complete from {IMPORT_FILE}')
-
-    session.close()
+        raise RowRejected(f'bad RMA number: {row["rma_number"]!r}') from None
+
+    record['is_warranty'] = parse_bool(row['is_warranty'])
+    for column in DATE_COLUMNS:
+        record[column] = row[column]
+    for column in (
+        'customer_po_number',
+        'work_order',
+        'incoming_inspection_notes',
+        'resolution_notes',
+    ):
+        record[column] = row[column] or None
+    return record
+
+
+def import_rmas_from_csv(
+    import_file: Path = IMPORT_FILE,
+    max_workers: int | None = None,
+    resume: bool = False,
+    dry_run: bool = False,
+) -> None:
+    summary = run_import(
+        import_file,
+        validate_row,
+        max_workers,
+        encoding='utf-8',
+        resume=resume,
+        dry_run=dry_run,
+        date_columns=DATE_COLUMNS,
+    )
+    print(f'Import complete from {import_file}: {summary}')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,459 @@
+"""
+Two-stage CSV import shared by both importers.
+
+The parser stage reads the file in chunks and hands each chunk to a process
+pool, where a per-format `validate_row` function trims, converts and checks
+every row. The writer stage runs in the main process only: it resolves
+users/customers/products/part numbers against an in-memory cache and
+bulk-inserts each validated batch. Rows that fail validation or clash with an
+existing RMA are written to a rejects file with the reason, and the import
+carries on.
+
+The import only ever inserts: a row whose RMA number is already in the
+database (or the archive) is rejected as a conflict and the existing RMA is
+left unchanged.
+
+Every batch is committed on its own and recorded in a checkpoint file next to
+the CSV, so an interrupted import can be resumed from the last committed line.
+A dry run goes through the same stages without writing anything.
+"""
+
+import csv
+import hashlib
+import json
+import os
+from collections import Counter, deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..database import (
+    RMA,
+    Customer,
+    PartNumber,
+    Product,
+    RMANotes,
+    SessionLocal,
+    User,
+    all_rmas,
+    split_notes,
+)
+from .parsing import DATE_SAMPLE_ROWS, detect_date_format, parse_dates
+
+CHUNK_SIZE = 1000
+EXISTING_RMA_REASON = 'RMA number already exists'
+
+# A validated row: the RMA columns plus the names of the records it refers to
+# under the keys in DIMENSION_KEYS.
+Record = dict[str, Any]
+RowValidator = Callable[[dict[str, Any]], Record]
+DIMENSION_KEYS = ('issued_by', 'customer', 'product', 'part_number')
+
+
+class RowRejected(ValueError):
+    """Raised by a row validator with the reason the row cannot be imported."""
+
+
+class ImportCheckpointError(Exception):
+    """Raised when an import cannot be resumed from its checkpoint file."""
+
+
+@dataclass
+class Reject:
+    line: int
+    reason: str
+    row: dict[str, str]
+
+
+@dataclass
+class Parsed:
+    line: int
+    record: Record
+    row: dict[str, str]
+
+
+@dataclass
+class ImportSummary:
+    inserted: int = 0
+    rejected: int = 0
+    conflicts: int = 0
+    created: Counter = field(default_factory=Counter)
+    rejects_file: Path | None = None
+    dry_run: bool = False
+    resumed_after_line: int = 0
+
+    def __str__(self) -> str:
+        verb = 'would be imported' if self.dry_run else 'imported'
+        text = (
+            f'{self.inserted} RMAs {verb}, {self.rejected} rejected '
+            f'({self.conflicts} already exist and are left unchanged)'
+        )
+        if self.created:
+            text += ', new ' + ', '.join(
+                f'{count} {kind}' for kind, count in sorted(self.created.items())
+            )
+        if self.resumed_after_line:
+            text += f', resumed after line {self.resumed_after_line}'
+        if self.rejects_file is not None and self.rejected and not self.dry_run:
+            text += f' (see {self.rejects_file})'
+        return text
+
+
+def read_chunks(
+    csv_path: Path,
+    chunk_size: int = CHUNK_SIZE,
+    encoding: str = 'utf-8-sig',
+    start_after_line: int = 0,
+) -> Iterator[list[tuple[int, dict[str, str]]]]:
+    """
+    Yields lists of (line number, raw row) with the header names stripped,
+    skipping rows that end on or before `start_after_line`.
+    """
+    with csv_path.open(newline='', encoding=encoding) as file:
+        reader = csv.DictReader(file)
+        reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+        rows = (
+            (reader.line_num, row)
+            for row in reader
+            if reader.line_num > start_after_line
+        )
+        while chunk := list(islice(rows, chunk_size)):
+            yield chunk
+
+
+def detect_date_formats(
+    csv_path: Path, date_columns: Sequence[str], encoding: str = 'utf-8-sig'
+) -> dict[str, str | None]:
+    """Detects the format of each date column from the first rows of the file."""
+    sample = next(read_chunks(csv_path, DATE_SAMPLE_ROWS, encoding), [])
+    return {
+        column: detect_date_format(row.get(column) or '' for _, row in sample)
+        for column in date_columns
+    }
+
+
+def validate_chunk(
+    validator: RowValidator,
+    chunk: list[tuple[int, dict[str, str]]],
+    date_formats: dict[str, str | None] | None = None,
+) -> tuple[list[Parsed], list[Reject]]:
+    """
+    Runs in a worker process. Never raises for a bad row.
+
+    The date columns are parsed for the whole chunk at once and handed to the
+    validator as datetime (or None) instead of text.
+    """
+    dates = {
+        column: parse_dates([row.get(column) or '' for _, row in chunk], fmt)
+        for column, fmt in (date_formats or {}).items()
+    }
+
+    valid: list[Parsed] = []
+    rejects: list[Reject] = []
+    for index, (line, row) in enumerate(chunk):
+        try:
+            if None in row:
+                raise RowRejected('too many fields')
+            if None in row.values():
+                raise RowRejected('too few fields')
+            typed_row: dict[str, Any] = dict(row)
+            for column, (parsed, bad) in dates.items():
+                if index in bad:
+                    raise RowRejected(f'bad date in {column}: {row[column]!r}')
+                typed_row[column] = parsed[index]
+            valid.append(Parsed(line, validator(typed_row), row))
+        except (RowRejected, ValueError, KeyError, TypeError) as e:
+            rejects.append(Reject(line, str(e) or type(e).__name__, row))
+    return valid, rejects
+
+
+def validated_chunks(
+    csv_path: Path,
+    validator: RowValidator,
+    max_workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    encoding: str = 'utf-8-sig',
+    start_after_line: int = 0,
+    date_formats: dict[str, str | None] | None = None,
+) -> Iterator[tuple[list[Parsed], list[Reject]]]:
+    """
+    Validates the file chunk by chunk in a process pool, yielding results in
+    file order. Only a few chunks per worker are in flight at a time, so memory
+    use does not grow with the size of the file.
+    """
+    chunks = read_chunks(csv_path, chunk_size, encoding, start_after_line)
+    workers = max_workers or os.cpu_count() or 1
+    in_flight_limit = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: deque[Future] = deque()
+        for chunk in chunks:
+            in_flight.append(
+                executor.submit(validate_chunk, validator, chunk, date_formats)
+            )
+            if len(in_flight) >= in_flight_limit:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+class DimensionCache:
+    """
+    Maps user/customer/product names and part numbers to ids, loading the
+    existing ones once and creating missing ones on first use.
+
+    With dry_run=True missing ones are only given a placeholder id in memory.
+    `created` counts the new ones by table name either way.
+    """
+
+    def __init__(self, session: Session, dry_run: bool = False) -> None:
+        self.session = session
+        self.dry_run = dry_run
+        self.created: Counter = Counter()
+        self.users = dict(session.execute(select(User.name, User.id)).all())
+        self.customers = dict(session.execute(select(Customer.name, Customer.id)).all())
+        self.products = dict(session.execute(select(Product.name, Product.id)).all())
+        self.part_numbers = dict(
+            session.execute(select(PartNumber.number, PartNumber.id)).all()
+        )
+
+    def _create(self, ids: dict[str, int], key: str, instance) -> int:
+        self.created[instance.__tablename__] += 1
+        if self.dry_run:
+            ids[key] = -len(ids) - 1
+            return ids[key]
+        self.session.add(instance)
+        self.session.flush()  # Assigns ID
+        ids[key] = instance.id
+        return instance.id
+
+    def user_id(self, name: str) -> int:
+        if name in self.users:
+            return self.users[name]
+        return self._create(self.users, name, User(name=name))
+
+    def customer_id(self, name: str) -> int:
+        if name in self.customers:
+            return self.customers[name]
+        return self._create(self.customers, name, Customer(name=name))
+
+    def product_id(self, name: str) -> int:
+        if name in self.products:
+            return self.products[name]
+        return self._create(self.products, name, Product(name=name))
+
+    def part_number_id(self, number: str, product_name: str) -> int:
+        if number in self.part_numbers:
+            return self.part_numbers[number]
+        part_number = PartNumber(
+            number=number, product_id=self.product_id(product_name)
+        )
+        return self._create(self.part_numbers, number, part_number)
+
+    def resolve(self, record: Record) -> dict[str, Any]:
+        values = {
+            key: value for key, value in record.items() if key not in DIMENSION_KEYS
+        }
+        values['issued_by_id'] = self.user_id(record['issued_by'])
+        values['customer_id'] = self.customer_id(record['customer'])
+        values['part_number_id'] = self.part_number_id(
+            record['part_number'], record['product']
+        )
+        return values
+
+
+def existing_rma_numbers(session: Session, rma_numbers: list[int]) -> set[int]:
+    # all_rmas covers the archive too, so archived RMAs are not imported twice.
+    return set(
+        session.scalars(
+            select(all_rmas.c.rma_number).where(all_rmas.c.rma_number.in_(rma_numbers))
+        )
+    )
+
+
+def write_batch(
+    session: Session,
+    cache: DimensionCache,
+    batch: list[Parsed],
+    seen: set[int],
+) -> tuple[int, list[Reject]]:
+    """
+    Bulk-inserts one validated batch, or only counts it in a dry run. The notes
+    go to rma_notes after their RMAs. Returns the insert count and rejects.
+    """
+    rejects: list[Reject] = []
+    existing = existing_rma_numbers(
+        session, [parsed.record['rma_number'] for parsed in batch]
+    )
+
+    rows_by_keys: dict[frozenset[str], list[dict[str, Any]]] = {}
+    notes_by_keys: dict[frozenset[str], list[dict[str, Any]]] = {}
+    for parsed in batch:
+        rma_number = parsed.record['rma_number']
+        # Before `existing`: a repeat of a row committed in an earlier batch is
+        # in both, and a dry run (which commits nothing) only sees it here
+        if rma_number in seen:
+            rejects.append(
+                Reject(parsed.line, 'duplicate RMA number in file', parsed.row)
+            )
+            continue
+        if rma_number in existing:
+            rejects.append(Reject(parsed.line, EXISTING_RMA_REASON, parsed.row))
+            continue
+        seen.add(rma_number)
+        values = cache.resolve(parsed.record)
+        notes = split_notes(values)
+        rows_by_keys.setdefault(frozenset(values), []).append(values)
+        notes_by_keys.setdefault(frozenset(notes), []).append(notes)
+
+    # executemany needs the same keys in every row of a call
+    inserted = 0
+    for rows in rows_by_keys.values():
+        if not cache.dry_run:
+            session.execute(insert(RMA), rows)
+        inserted += len(rows)
+    if not cache.dry_run:
+        for rows in notes_by_keys.values():
+            session.execute(insert(RMANotes), rows)
+    return inserted, rejects
+
+
+def append_rejects(rejects_file: Path, rejects: list[Reject]) -> None:
+    # Every rejected row comes from the same DictReader, so has the same keys
+    fieldnames = ['line', 'reason', *rejects[0].row]
+    write_header = not rejects_file.exists()
+
+    with rejects_file.open('a', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+        if write_header:
+            writer.writeheader()
+        for reject in rejects:
+            writer.writerow(
+                {**reject.row, 'line': reject.line, 'reason': reject.reason}
+            )
+
+
+def rejects_path(csv_path: Path) -> Path:
+    return csv_path.with_name(f'{csv_path.stem}.rejects.csv')
+
+
+def checkpoint_path(csv_path: Path) -> Path:
+    return csv_path.with_name(f'{csv_path.stem}.checkpoint.json')
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open('rb') as file:
+        while chunk := file.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_checkpoint(checkpoint_file: Path, checkpoint: dict[str, Any]) -> None:
+    staging = checkpoint_file.with_name(f'{checkpoint_file.name}.tmp')
+    staging.write_text(json.dumps(checkpoint, indent=2))
+    os.replace(staging, checkpoint_file)  # never leave a half-written checkpoint
+
+
+def read_checkpoint(checkpoint_file: Path, source_sha256: str) -> dict[str, Any]:
+    if not checkpoint_file.exists():
+        raise ImportCheckpointError(f'No checkpoint to resume from: {checkpoint_file}')
+    checkpoint = json.loads(checkpoint_file.read_text())
+    if checkpoint['source_sha256'] != source_sha256:
+        raise ImportCheckpointError(
+            'The file has changed since the checkpoint was written; '
+            'import it again without resume.'
+        )
+    return checkpoint
+
+
+def run_import(
+    csv_path: Path,
+    validator: RowValidator,
+    max_workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    encoding: str = 'utf-8-sig',
+    resume: bool = False,
+    dry_run: bool = False,
+    date_columns: Sequence[str] = (),
+) -> ImportSummary:
+    """
+    Imports a CSV file through the parse/validate and write stages.
+
+    Each batch is committed on its own, then the checkpoint file records the
+    last committed source line and the SHA-256 of the file. With resume=True an
+    interrupted import of the unchanged file carries on after that line. The
+    checkpoint is removed once the import completes.
+
+    The format of each of `date_columns` is detected from the first rows, and
+    those columns reach the validator already parsed.
+
+    With dry_run=True the file is parsed and resolved against the database in
+    memory only: nothing is written, not even the rejects file, and the summary
+    reports what would be inserted, rejected and created. There is nothing to
+    report as updated, since existing RMAs are never updated.
+    """
+    checkpoint_file = checkpoint_path(csv_path)
+    source_sha256 = file_sha256(csv_path)
+    summary = ImportSummary(rejects_file=rejects_path(csv_path), dry_run=dry_run)
+
+    if resume:
+        checkpoint = read_checkpoint(checkpoint_file, source_sha256)
+        summary.resumed_after_line = checkpoint['line']
+        summary.inserted = checkpoint['inserted']
+        summary.rejected = checkpoint['rejected']
+        summary.conflicts = checkpoint['conflicts']
+    elif not dry_run:
+        summary.rejects_file.unlink(missing_ok=True)
+
+    seen: set[int] = set()
+    with SessionLocal() as session:
+        cache = DimensionCache(session, dry_run)
+        for valid, rejects in validated_chunks(
+            csv_path,
+            validator,
+            max_workers,
+            chunk_size,
+            encoding,
+            summary.resumed_after_line,
+            detect_date_formats(csv_path, date_columns, encoding),
+        ):
+            if valid:
+                inserted, write_rejects = write_batch(session, cache, valid, seen)
+                summary.inserted += inserted
+                rejects += write_rejects
+
+            summary.rejected += len(rejects)
+            summary.conflicts += sum(
+                reject.reason == EXISTING_RMA_REASON for reject in rejects
+            )
+            if dry_run:
+                continue
+
+            session.commit()
+            if rejects:
+                append_rejects(summary.rejects_file, rejects)
+            last_line = max(
+                [parsed.line for parsed in valid] + [reject.line for reject in rejects]
+            )
+            write_checkpoint(
+                checkpoint_file,
+                {
+                    'source': str(csv_path),
+                    'source_sha256': source_sha256,
+                    'line': last_line,
+                    'inserted': summary.inserted,
+                    'rejected': summary.rejected,
+                    'conflicts': summary.conflicts,
+                },
+            )
+
+    summary.created = cache.created
+    if not dry_run:
+        checkpoint_file.unlink(missing_ok=True)
+    return summary
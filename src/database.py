@@ -1,14 +1,26 @@
 from datetime import datetime
+from enum import IntEnum
 from pathlib import Path
+from typing import Any
 
 from sqlalchemy import (
+    JSON,
     Boolean,
+    CheckConstraint,
+    Column,
     DateTime,
     Engine,
     ForeignKey,
+    Index,
+    MetaData,
+    SmallInteger,
     String,
+    Table,
     Text,
+    TypeDecorator,
+    case,
     create_engine,
+    event,
 )
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -18,12 +30,22 @@ from sqlalchemy.orm import (
     relationship,
     sessionmaker,
 )
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.sql import func
 
 # === File location ===
 DB_PATH: Path = Path(r'X/rma_database/rma.db')
 DATABASE_URL: str = f'sqlite:///{DB_PATH.as_posix()}'
 
+# === Notes ===
+NOTE_COLUMNS: tuple[str, ...] = (
+    'reason_for_return',
+    'incoming_inspection_notes',
+    'resolution_notes',
+)
+REASON_SUMMARY_LENGTH = 60  # rmas.reason_summary, the reason shown in tables
+SUMMARY_ELLIPSIS = '...'  # latin-1, so the PDF core fonts can draw it
+
 # === SQLAlchemy setup ===
 engine: Engine = create_engine(DATABASE_URL, echo=False, future=True)
 SessionLocal = sessionmaker(bind=engine)
@@ -68,8 +90,69 @@ class PartNumber(Base):
     rmas: Mapped[list['RMA']] = relationship(back_populates='part_number')
 
 
+# === Status ===
+class RMAStatus(IntEnum):
+    """
+    The RMA workflow in order. rmas.status stores the integer code; `label` is
+    what the GUI, CLI, CSV and PDF show, and this is the only place the two are
+    mapped.
+    """
+
+    ISSUED = 1
+    RECEIVED = 2
+    IN_PROCESS = 3
+    COMPLETE = 4
+    CLOSED = 5
+
+    @property
+    def label(self) -> str:
+        return self.name.replace('_', ' ').title()
+
+    def __str__(self) -> str:
+        return self.label
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.label, format_spec)
+
+    @classmethod
+    def coerce(cls, value: 'RMAStatus | int | str') -> 'RMAStatus':
+        """Accepts a status, its code or its exact label; raises ValueError otherwise."""
+        if isinstance(value, str):
+            for status in cls:
+                if status.label == value:
+                    return status
+            raise ValueError(f'Unknown RMA status: {value!r}')
+        return cls(value)
+
+
+class StatusCode(TypeDecorator):
+    """
+    Stores an RMAStatus as its integer code and loads it back as an RMAStatus.
+    Labels are accepted when binding, so `RMA.status == 'Closed'` still works,
+    but an unknown label raises instead of creating a new status.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(RMAStatus.coerce(value))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else RMAStatus(value)
+
+
+STATUS_CHECK: str = f'status IN ({", ".join(str(int(s)) for s in RMAStatus)})'
+
+
+def status_label(column):
+    """SQL expression for the label of a status column, for exports and reports."""
+    return case({status: status.label for status in RMAStatus}, value=column)
+
+
 class RMA(Base):
     __tablename__ = 'rmas'
+    __table_args__ = (CheckConstraint(STATUS_CHECK, name='ck_rmas_status'),)
 
     rma_number: Mapped[int] = mapped_column(
         primary_key=True, unique=True, nullable=False
@@ -87,9 +170,11 @@ class RMA(Base):
 
     serial_number: Mapped[str] = mapped_column(String(50))
     is_warranty: Mapped[bool] = mapped_column(Boolean)
-    reason_for_return: Mapped[str] = mapped_column(Text)
+    reason_summary: Mapped[str] = mapped_column(
+        String(REASON_SUMMARY_LENGTH), server_default=''
+    )
 
-    status: Mapped[str] = mapped_column(String, default='Issued')
+    status: Mapped[RMAStatus] = mapped_column(StatusCode, default=RMAStatus.ISSUED)
     issued_on: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now(), server_default=func.now(), index=True
     )
@@ -99,18 +184,326 @@ class RMA(Base):
 
     customer_po_number: Mapped[str] = mapped_column(String(50), nullable=True)
     work_order: Mapped[str] = mapped_column(String(50), nullable=True)
-    incoming_inspection_notes: Mapped[str] = mapped_column(Text, nullable=True)
-    resolution_notes: Mapped[str] = mapped_column(Text, nullable=True)
     shipped_back_on: Mapped[datetime] = mapped_column(
         DateTime, nullable=True, index=True
     )
 
+    # The long free text lives in rma_notes. Loaders add selectinload(RMA.notes)
+    # only where the notes are shown; the properties below read and write them.
+    notes: Mapped['RMANotes | None'] = relationship(
+        back_populates='rma', cascade='all, delete-orphan'
+    )
+
+    def _writable_notes(self) -> 'RMANotes':
+        if self.notes is None:
+            self.notes = RMANotes()
+        return self.notes
+
+    @property
+    def reason_for_return(self) -> str:
+        return self.notes.reason_for_return if self.notes else self.reason_summary
+
+    @reason_for_return.setter
+    def reason_for_return(self, value: str) -> None:
+        self._writable_notes().reason_for_return = value
+        self.reason_summary = summarize_reason(value)
+
+    @property
+    def incoming_inspection_notes(self) -> str | None:
+        return self.notes.incoming_inspection_notes if self.notes else None
+
+    @incoming_inspection_notes.setter
+    def incoming_inspection_notes(self, value: str | None) -> None:
+        self._writable_notes().incoming_inspection_notes = value
+
+    @property
+    def resolution_notes(self) -> str | None:
+        return self.notes.resolution_notes if self.notes else None
+
+    @resolution_notes.setter
+    def resolution_notes(self, value: str | None) -> None:
+        self._writable_notes().resolution_notes = value
+
+
+class RMANotes(Base):
+    """
+    The long free-text fields of an RMA, one row per RMA.
+
+    They are kept off the rmas row so scans of rmas (open RMAs, status filters,
+    navigation, S/N search) read far fewer pages. rmas.reason_summary keeps a
+    one-line copy of the reason for the tables.
+    """
+
+    __tablename__ = 'rma_notes'
+
+    rma_number: Mapped[int] = mapped_column(
+        ForeignKey('rmas.rma_number'), primary_key=True, autoincrement=False
+    )
+    reason_for_return: Mapped[str] = mapped_column(Text)
+    incoming_inspection_notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    resolution_notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    rma: Mapped['RMA'] = relationship(back_populates='notes')
+
+
+def summarize_reason(reason: str | None) -> str:
+    """
+    The reason_summary of a reason: line breaks become spaces and anything past
+    REASON_SUMMARY_LENGTH is cut off with an ellipsis. Migration 4 does the
+    same in SQL.
+    """
+    summary = (reason or '').replace('\r', '').replace('\n', ' ')
+    if len(summary) > REASON_SUMMARY_LENGTH:
+        summary = summary[: REASON_SUMMARY_LENGTH - len(SUMMARY_ELLIPSIS)]
+        summary += SUMMARY_ELLIPSIS
+    return summary
+
+
+def split_notes(values: dict[str, Any]) -> dict[str, Any]:
+    """
+    Moves the NOTE_COLUMNS out of a dict of RMA column values for a Core insert
+    or update, setting reason_summary when the reason is present. Returns the
+    rma_notes values.
+    """
+    notes = {'rma_number': values['rma_number']}
+    for column in NOTE_COLUMNS:
+        if column in values:
+            notes[column] = values.pop(column)
+    if 'reason_for_return' in notes:
+        values['reason_summary'] = summarize_reason(notes['reason_for_return'])
+    return notes
+
+
+# === Open-RMA working set ===
+# Open RMAs are a few hundred rows out of the whole history. Queries for them
+# filter on RMA_IS_OPEN, which is the WHERE clause of this partial index word
+# for word, so SQLite reads them from the index in RMA number order instead of
+# scanning rmas. The index holds every column the open-RMAs view and its PDF
+# show, so the PDF query never touches the table.
+RMA_IS_OPEN = RMA.__table__.c.status != RMAStatus.CLOSED
+open_rmas_index = Index(
+    'ix_rmas_open',
+    RMA.__table__.c.rma_number,
+    RMA.__table__.c.status,
+    RMA.__table__.c.customer_id,
+    RMA.__table__.c.part_number_id,
+    RMA.__table__.c.issued_by_id,
+    RMA.__table__.c.is_warranty,
+    RMA.__table__.c.serial_number,
+    RMA.__table__.c.reason_summary,
+    sqlite_where=RMA_IS_OPEN,
+)
+
+
+class RMANumberSequence(Base):
+    """
+    The last RMA number handed out in each year's block (year 26 is 26001-26999).
+
+    New numbers are taken by incrementing this row inside the transaction that
+    inserts the RMA (see api.allocate_rma_number), so concurrent submits queue
+    on SQLite's write lock instead of computing the same number.
+    """
+
+    __tablename__ = 'rma_number_sequences'
+
+    year: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    last_number: Mapped[int] = mapped_column(nullable=False)
+
+
+class SchemaVersion(Base):
+    """
+    One row per migration applied to this file (see src/migrations.py).
+    """
+
+    __tablename__ = 'schema_version'
+
+    version: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(100))
+    applied_on: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
+class RMAChange(Base):
+    """
+    Append-only journal of every insert, update and delete on the rmas table.
+
+    Rows are written by SQLite triggers (see _journal_triggers) rather than ORM
+    events so that bulk Core UPDATEs and other tools writing to the file are
+    recorded too. `seq` is an AUTOINCREMENT key, so it only ever increases and
+    consumers can resume from the last sequence number they processed.
+    """
+
+    __tablename__ = 'rma_changes'
+    __table_args__ = ({'sqlite_autoincrement': True},)
+
+    seq: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    rma_number: Mapped[int] = mapped_column(index=True)
+    operation: Mapped[str] = mapped_column(String(10))  # insert, update, delete
+    changed_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    changed_columns: Mapped[list[str]] = mapped_column(JSON)
+    old_values: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    new_values: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+
+
+# last_updated changes on every write, so it is left out of the diff
+JOURNALED_COLUMNS: tuple[str, ...] = tuple(
+    column.name for column in RMA.__table__.columns if column.name != 'last_updated'
+)
+
+
+def _journal_triggers() -> dict[str, str]:
+    def json_object(prefix: str) -> str:
+        pairs = ', '.join(f"'{col}', {prefix}.{col}" for col in JOURNALED_COLUMNS)
+        return f'json_object({pairs})'
+
+    def diff(columns: tuple[str, ...]) -> str:
+        return ' UNION ALL '.join(
+            f"SELECT '{col}' AS col, OLD.{col} AS old, NEW.{col} AS new"
+            for col in columns
+        )
+
+    all_columns = 'json_array(' + ', '.join(f"'{c}'" for c in JOURNALED_COLUMNS) + ')'
+
+    return {
+        'rma_changes_after_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS rma_changes_after_insert AFTER INSERT ON rmas
+        BEGIN
+            INSERT INTO rma_changes
+                (rma_number, operation, changed_columns, old_values, new_values)
+            VALUES
+                (NEW.rma_number, 'insert', {all_columns}, NULL, {json_object('NEW')});
+        END
+        """,
+        'rma_changes_after_update': f"""
+        CREATE TRIGGER IF NOT EXISTS rma_changes_after_update AFTER UPDATE ON rmas
+        BEGIN
+            INSERT INTO rma_changes
+                (rma_number, operation, changed_columns, old_values, new_values)
+            SELECT NEW.rma_number, 'update', json_group_array(col),
+                   json_group_object(col, old), json_group_object(col, new)
+            FROM ({diff(JOURNALED_COLUMNS)})
+            WHERE old IS NOT new
+            HAVING count(*) > 0;
+        END
+        """,
+        # Editing only the notes leaves the rmas row alone, so log it here
+        'rma_changes_after_notes_update': f"""
+        CREATE TRIGGER IF NOT EXISTS rma_changes_after_notes_update
+        AFTER UPDATE ON rma_notes
+        BEGIN
+            INSERT INTO rma_changes
+                (rma_number, operation, changed_columns, old_values, new_values)
+            SELECT NEW.rma_number, 'update', json_group_array(col),
+                   json_group_object(col, old), json_group_object(col, new)
+            FROM ({diff(NOTE_COLUMNS)})
+            WHERE old IS NOT new
+            HAVING count(*) > 0;
+        END
+        """,
+        'rma_changes_after_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS rma_changes_after_delete AFTER DELETE ON rmas
+        BEGIN
+            INSERT INTO rma_changes
+                (rma_number, operation, changed_columns, old_values, new_values)
+            VALUES
+                (OLD.rma_number, 'delete', {all_columns}, {json_object('OLD')}, NULL);
+        END
+        """,
+    }
+
+
+# The triggers name columns of both tables, so they are (re)created by the
+# migration runner once the tables have their current shape
+JOURNAL_TRIGGERS: dict[str, str] = _journal_triggers()
+
+
+# === Cold archive ===
+# Closed RMAs older than a few years are moved to a separate file that every
+# connection ATTACHes as `archive` (see src/archive.py), which keeps the rmas
+# table in rma.db down to the working set. `all_rmas` is a per-connection TEMP
+# view over both files for search and history queries, and `all_rma_notes`
+# the same over both rma_notes tables.
+ARCHIVE_PATH: Path = DB_PATH.with_name('rma_archive.db')
+RMA_COLUMNS: tuple[str, ...] = tuple(column.name for column in RMA.__table__.columns)
+RMA_NOTES_COLUMNS: tuple[str, ...] = tuple(
+    column.name for column in RMANotes.__table__.columns
+)
+
+archive_metadata = MetaData()
+
+
+def _plain_columns(table: Table) -> list[Column]:
+    # Same columns as in rma.db, without foreign keys: SQLite cannot enforce them
+    # across attached files and the archive holds no users/customers tables.
+    return [
+        Column(
+            column.name,
+            column.type,
+            primary_key=column.primary_key,
+            nullable=column.nullable,
+        )
+        for column in table.columns
+    ]
+
+
+archived_rmas = Table(
+    'rmas',
+    archive_metadata,
+    *_plain_columns(RMA.__table__),
+    CheckConstraint(STATUS_CHECK, name='ck_rmas_status'),
+    schema='archive',
+)
+archived_rma_notes = Table(
+    'rma_notes',
+    archive_metadata,
+    *_plain_columns(RMANotes.__table__),
+    schema='archive',
+)
+all_rmas = Table('all_rmas', archive_metadata, *_plain_columns(RMA.__table__))
+all_rma_notes = Table(
+    'all_rma_notes', archive_metadata, *_plain_columns(RMANotes.__table__)
+)
+
+
+def _union_view(name: str, table: str, columns: tuple[str, ...]) -> str:
+    column_list = ', '.join(columns)
+    return (
+        f'CREATE TEMP VIEW IF NOT EXISTS {name} AS '
+        f'SELECT {column_list} FROM main.{table} '
+        f'UNION ALL SELECT {column_list} FROM archive.{table}'
+    )
+
+
+TEMP_VIEWS: dict[str, str] = {
+    'all_rmas': _union_view('all_rmas', 'rmas', RMA_COLUMNS),
+    'all_rma_notes': _union_view('all_rma_notes', 'rma_notes', RMA_NOTES_COLUMNS),
+}
+
+
+@event.listens_for(engine, 'connect')
+def _attach_archive(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute('ATTACH DATABASE ? AS archive', (str(ARCHIVE_PATH),))
+    for table in (archived_rmas, archived_rma_notes):
+        cursor.execute(
+            str(CreateTable(table, if_not_exists=True).compile(dialect=engine.dialect))
+        )
+    for view in TEMP_VIEWS.values():
+        cursor.execute(view)
+    cursor.close()
+
 
 # === Initialization function ===
-def initialize_database() -> None:
+def initialize_database() -> list[str]:
+    """
+    Creates missing tables, then applies pending migrations, which is how new
+    indexes and columns reach existing files. Returns the migrations applied.
+    """
+    from .migrations import run_migrations  # migrations imports this module
+
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     configure_mappers()
     Base.metadata.create_all(engine)
+    return [migration.name for migration in run_migrations()]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,213 @@
+"""
+The RMA table held in memory column by column, for the table models.
+
+gui.rma_dataset shares one copy between the windows and keeps it current.
+"""
+
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import ColumnElement, select
+from sqlalchemy.orm import joinedload
+
+from .api import RMA_ATTR_ACCESSORS, get_rmas_by_rma_nums
+from .database import (
+    RMA,
+    RMA_IS_OPEN,
+    PartNumber,
+    RMANotes,
+    RMAStatus,
+    SessionLocal,
+)
+
+# The columns the table windows can show, stored as display values
+DATASET_COLUMNS: tuple[str, ...] = (
+    'RMA #',
+    'Customer',
+    'Product',
+    'Part #',
+    'Serial #',
+    'Reason for Return',
+    'Warranty',
+    'Status',
+    'Date Issued',
+    'Cust. PO #',
+    'WO #',
+    'Inspection Notes',
+    'Issued By',
+    'Resolution',
+    'Date Returned',
+    'Last Updated',
+)
+# Columns read from rma_notes, loaded only for the windows that show them
+NOTE_HEADERS: tuple[str, ...] = ('Inspection Notes', 'Resolution')
+RMA_HEADERS: tuple[str, ...] = tuple(
+    header for header in DATASET_COLUMNS if header not in NOTE_HEADERS
+)
+# Columns whose sort keys are ints; a missing value sorts first as -1
+NUMERIC_COLUMNS = frozenset(
+    {'RMA #', 'Status', 'Date Issued', 'Date Returned', 'Last Updated'}
+)
+
+SortKey = int | str
+
+
+def cell(rma: RMA, header: str) -> tuple[Any, SortKey]:
+    """
+    Returns the display value of one cell and its typed sort key: the number
+    for RMA #, the workflow code for Status, days since 0001-01-01 for dates
+    and the case-folded text for everything else.
+    """
+    try:
+        value = RMA_ATTR_ACCESSORS[header](rma)
+    except AttributeError:  # e.g. a dangling customer id
+        value = None
+    if value is None:
+        return None, -1 if header in NUMERIC_COLUMNS else ''
+    if header == 'Status':
+        return value, int(rma.status)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d'), value.toordinal()
+    if isinstance(value, int):
+        return value, value
+    return value, str(value).casefold()
+
+
+class RMAColumns:
+    """
+    An in-memory copy of the RMA table.
+
+    The RMAs are kept column by column: a list of display values and a list of
+    typed sort keys per header in DATASET_COLUMNS, plus the status codes, all
+    indexed by the row in `rma_numbers`. The ORM objects are dropped once their
+    values are copied. Table models show a filtered subset of it (e.g. the open
+    RMAs) by RMA number.
+
+    It starts empty. load_open() adds the open RMAs, from the ix_rmas_open
+    partial index; load_closed() and load_notes() add the closed ones and the
+    NOTE_HEADERS from rma_notes for the windows that show them. Until then the
+    note columns are empty.
+    """
+
+    def __init__(self) -> None:
+        self.rma_numbers: list[int] = []
+        self.row_by_number: dict[int, int] = {}
+        self.columns: dict[str, list[Any]] = {header: [] for header in DATASET_COLUMNS}
+        self.sort_keys: dict[str, list[SortKey]] = {
+            header: [] for header in DATASET_COLUMNS
+        }
+        self.statuses: list[RMAStatus] = []
+        self.closed_loaded = False
+        self.notes_loaded = False
+
+    def load_open(self) -> None:
+        self._store(self._query_rmas(RMA_IS_OPEN))
+
+    def load_closed(self) -> None:
+        """Adds the closed RMAs, which only the full RMA table shows."""
+        if self.closed_loaded:
+            return
+        self._store(self._query_rmas(~RMA_IS_OPEN))
+        self.closed_loaded = True
+
+    def load_notes(self) -> None:
+        """Fills the NOTE_HEADERS columns of the loaded RMAs from rma_notes."""
+        if self.notes_loaded:
+            return
+        with SessionLocal() as session:
+            notes = session.execute(
+                select(
+                    RMANotes.rma_number,
+                    RMANotes.incoming_inspection_notes,
+                    RMANotes.resolution_notes,
+                )
+            ).all()
+        for rma_number, *values in notes:
+            row = self.row_by_number.get(rma_number)
+            if row is None:  # added since the RMAs were loaded; reload() has it
+                continue
+            for header, value in zip(NOTE_HEADERS, values, strict=True):
+                self.columns[header][row] = value
+                self.sort_keys[header][row] = '' if value is None else value.casefold()
+        self.notes_loaded = True
+
+    def value(self, rma_number: int, header: str) -> Any:
+        return self.columns[header][self.row_by_number[rma_number]]
+
+    def sort_key(self, rma_number: int, header: str) -> SortKey:
+        return self.sort_keys[header][self.row_by_number[rma_number]]
+
+    def status(self, rma_number: int) -> RMAStatus:
+        return self.statuses[self.row_by_number[rma_number]]
+
+    def reload(self, rma_numbers: list[int]) -> tuple[list[int], list[int]]:
+        """
+        Reloads the given RMAs from the database. Returns the RMA numbers that
+        were reloaded and the ones that no longer exist.
+        """
+        rmas: list[RMA] = get_rmas_by_rma_nums(rma_numbers)
+        found: set[int] = {rma.rma_number for rma in rmas}
+        removed: list[int] = [num for num in rma_numbers if num not in found]
+        self._store(rmas, DATASET_COLUMNS if self.notes_loaded else RMA_HEADERS)
+        self._drop(removed)
+        return [rma.rma_number for rma in rmas], removed
+
+    @staticmethod
+    def _query_rmas(where: ColumnElement[bool]) -> list[RMA]:
+        """Loads the RMAs matching `where`, without their notes."""
+        with SessionLocal() as session:
+            return (
+                session.query(RMA)
+                .options(
+                    joinedload(RMA.part_number).joinedload(PartNumber.product),
+                    joinedload(RMA.customer),
+                    joinedload(RMA.issued_by),
+                )
+                .filter(where)
+                .order_by(RMA.rma_number)
+                .all()
+            )
+
+    def _store(self, rmas: list[RMA], headers: Sequence[str] = RMA_HEADERS) -> None:
+        """
+        Overwrites the given columns of known RMAs and appends new ones. The
+        other columns of a new row start empty.
+        """
+        for rma in rmas:
+            row = self.row_by_number.get(rma.rma_number)
+            if row is None:
+                row = len(self.rma_numbers)
+                self.row_by_number[rma.rma_number] = row
+                self.rma_numbers.append(rma.rma_number)
+                self.statuses.append(rma.status)
+                for header in DATASET_COLUMNS:
+                    self.columns[header].append(None)
+                    self.sort_keys[header].append(
+                        -1 if header in NUMERIC_COLUMNS else ''
+                    )
+            else:
+                self.statuses[row] = rma.status
+            for header in headers:
+                value, key = cell(rma, header)
+                self.columns[header][row] = value
+                self.sort_keys[header][row] = key
+
+    def _drop(self, rma_numbers: Iterable[int]) -> None:
+        rows = sorted(
+            (
+                self.row_by_number[num]
+                for num in rma_numbers
+                if num in self.row_by_number
+            ),
+            reverse=True,
+        )
+        if not rows:
+            return
+        for row in rows:
+            del self.rma_numbers[row]
+            del self.statuses[row]
+            for header in DATASET_COLUMNS:
+                del self.columns[header][row]
+                del self.sort_keys[header][row]
+        self.row_by_number = {num: row for row, num in enumerate(self.rma_numbers)}
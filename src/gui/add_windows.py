@@ -1,5 +1,4 @@
 from collections import defaultdict
-from datetime import datetime
 
 from PySide6.QtWidgets import (
     QCheckBox,
@@ -11,11 +10,17 @@ from PySide6.QtWidgets import (
     QPushButton,
     QVBoxLayout,
 )
-from sqlalchemy import func
 
-from ..api import add_customer, add_part_number, add_product, add_rma, add_user
+from ..api import (
+    add_customer,
+    add_part_number,
+    add_product,
+    add_rma,
+    add_user,
+    generate_rma_number,
+)
 from ..csv_io.export_to_csv import export_rmas_to_csv
-from ..database import RMA, Customer, PartNumber, Product, SessionLocal, User
+from ..database import Customer, PartNumber, Product, SessionLocal, User
 from ..email import send_outlook_email
 from .error_messages import (
     add_customer_failed_message,
@@ -174,20 +179,7 @@ class AddRMAWindow(QDialog):
             self.send_email()
 
     def generate_rma_number(self) -> str:
-        year_prefix = datetime.now().strftime('%y')
-        base = int(year_prefix) * 1000
-
-        with SessionLocal() as session:
-            latest = (
-                session.query(func.max(RMA.rma_number))
-                .filter(RMA.rma_number.like(f'{year_prefix}%'))
-                .scalar()
-            )
-
-            if latest:
-                return str(int(latest) + 1)
-            else:
-                return str(base + 1)
+        return str(generate_rma_number())
 
     def create_gui(self, generated_rma_number: str) -> None:
         self.setFixedSize(400, 500)
@@ -285,7 +277,6 @@ class AddRMAWindow(QDialog):
                 self.part_number_cbb.addItem(part.number, part.id)
 
     def add_new_rma(self) -> bool:
-        rma_number = int(self.rma_number_input.text())
         customer_id = self.customer_cbb.currentData()
         part_number_id = self.part_number_cbb.currentData()
         serial_number = self.serial_number_input.text()
@@ -297,8 +288,9 @@ class AddRMAWindow(QDialog):
         if not customer_po_number:
             customer_po_number = None
 
-        if add_rma(
-            rma_number=rma_number,
+        # The number shown is a preview; the real one is allocated on insert
+        rma_number = add_rma(
+            rma_number=None,
             customer_id=customer_id,
             part_number_id=part_number_id,
             serial_number=serial_number,
@@ -306,7 +298,9 @@ class AddRMAWindow(QDialog):
             issued_by_id=issued_by_id,
             is_warranty=is_warranty,
             customer_po_number=customer_po_number,
-        ):
+        )
+        if rma_number is not None:
+            self.rma_number_input.setText(str(rma_number))
             self.accept()
             return True
         else:
@@ -0,0 +1,48 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+from sqlalchemy.exc import OperationalError
+
+from ..api import changes_since, latest_change_seq
+
+POLL_INTERVAL_MS = 5000
+
+
+class ChangePoller(QObject):
+    """
+    Watches the rma_changes journal on a timer and reports which RMAs changed.
+
+    Each tick runs one indexed `seq > last_seq` query, so an idle poll costs the
+    same no matter how many RMAs are in the database.
+
+    Signals:
+        rmas_changed(list): The distinct RMA numbers changed since the last tick.
+    """
+
+    rmas_changed = Signal(list)
+
+    def __init__(self, interval_ms: int = POLL_INTERVAL_MS, parent=None) -> None:
+        super().__init__(parent)
+        self.last_seq: int = latest_change_seq()
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.poll)
+
+    def start(self) -> None:
+        """Starts the timer, first catching up on changes made while stopped."""
+        self.poll()
+        self.timer.start()
+
+    def stop(self) -> None:
+        self.timer.stop()
+
+    def poll(self) -> None:
+        try:
+            changes = changes_since(self.last_seq)
+        except OperationalError:  # share unavailable or file locked; retry next tick
+            return
+
+        if not changes:
+            return
+
+        self.last_seq = changes[-1].seq
+        rma_numbers = list(dict.fromkeys(change.rma_number for change in changes))
+        self.rmas_changed.emit(rma_numbers)
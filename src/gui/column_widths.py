@@ -0,0 +1,42 @@
+import heapq
+
+from PySide6.QtWidgets import QTableView
+
+SAMPLE_ROWS = 100
+MEASURED_PER_COLUMN = 3  # the longest strings in the sample are measured
+CELL_MARGIN = 8  # WordWrapDelegate's QTextDocument margin, both sides
+
+
+def estimate_column_width(table_view: QTableView, column: int) -> int:
+    """
+    Estimates the width a column needs from its header and a sample of rows.
+
+    Unlike resizeColumnsToContents(), which lays out every cell, this reads at
+    most SAMPLE_ROWS evenly spaced rows and measures only the few longest
+    strings among them, so the cost does not grow with the row count.
+    """
+    model = table_view.model()
+    row_count = model.rowCount()
+    step = max(1, row_count // SAMPLE_ROWS)
+    texts = {
+        str(value)
+        for row in range(0, row_count, step)
+        if (value := model.index(row, column).data()) is not None
+    }
+    metrics = table_view.fontMetrics()
+    content_width = max(
+        (
+            metrics.horizontalAdvance(text)
+            for text in heapq.nlargest(MEASURED_PER_COLUMN, texts, key=len)
+        ),
+        default=0,
+    )
+    header_width = table_view.horizontalHeader().sectionSizeHint(column)
+    return max(content_width + CELL_MARGIN, header_width)
+
+
+def fit_column_widths(table_view: QTableView, max_width: int, padding: int) -> None:
+    """Sets every column to its estimated width, capped at `max_width`, plus padding."""
+    for column in range(table_view.model().columnCount()):
+        width = min(estimate_column_width(table_view, column), max_width)
+        table_view.setColumnWidth(column, width + padding)
@@ -11,7 +11,6 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
-from qt_material import apply_stylesheet
 
 from .add_windows import (
     AddCustomerWindow,
@@ -21,6 +20,8 @@ from .add_windows import (
     AddUserWindow,
 )
 from .error_messages import no_quick_start_guide
+from .statistics_window import StatisticsWindow
+from .theme import load_theme_stylesheet
 from .view_open_rmas_window import ViewOpenRMAsWindow
 from .view_rma_records_window import ViewRMARecordsWindow
 from .view_rma_table_window import ViewRMATable
@@ -77,6 +78,10 @@ class MainWindow(QMainWindow):
         view_rma_records_window = ViewRMARecordsWindow(self)
         view_rma_records_window.show()
 
+    def _handle_view_statistics_button(self) -> None:
+        statistics_window = StatisticsWindow(self)
+        statistics_window.show()
+
     def create_gui(self) -> None:
         window_width = 550
         window_height = 500
@@ -88,9 +93,10 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(QIcon(icon_path))
         self.setWindowTitle(f'RMA Database v{self.version}')
 
-        apply_stylesheet(self, theme='dark_lightgreen.xml', invert_secondary=True)
+        # Read from the theme cache; qt_material only runs when it is missing
         self.setStyleSheet(
-            self.styleSheet() + """QLineEdit, QTextEdit {color: lightgreen;}"""
+            load_theme_stylesheet(self.version)
+            + """QLineEdit, QTextEdit {color: lightgreen;}"""
         )
 
         # Create the validator for numerical inputs
@@ -143,6 +149,8 @@ class MainWindow(QMainWindow):
         self.view_open_rmas_button.setCursor(Qt.CursorShape.PointingHandCursor)
         self.view_all_rmas_button = QPushButton('View RMA Table')
         self.view_all_rmas_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.view_statistics_button = QPushButton('View Statistics')
+        self.view_statistics_button.setCursor(Qt.CursorShape.PointingHandCursor)
 
         self.add_new_rma_button.clicked.connect(self._handle_add_new_rma_button)
         self.view_rma_records_button.clicked.connect(
@@ -150,12 +158,14 @@ class MainWindow(QMainWindow):
         )
         self.view_open_rmas_button.clicked.connect(self._handle_view_open_rmas_button)
         self.view_all_rmas_button.clicked.connect(self._handle_view_rma_table_button)
+        self.view_statistics_button.clicked.connect(self._handle_view_statistics_button)
 
         v_button_layout = QVBoxLayout()
         v_button_layout.addWidget(self.add_new_rma_button)
         v_button_layout.addWidget(self.view_rma_records_button)
         v_button_layout.addWidget(self.view_open_rmas_button)
         v_button_layout.addWidget(self.view_all_rmas_button)
+        v_button_layout.addWidget(self.view_statistics_button)
 
         main_layout = QHBoxLayout()
         main_layout.addLayout(v_button_layout)
@@ -0,0 +1,52 @@
+from PySide6.QtCore import QThread, Signal
+
+from ..pdf import PDF, PDFRenderCancelled, RowDataSource
+
+
+class PDFRenderWorker(QThread):
+    """
+    Renders an open-RMA PDF from a RowDataSource on a background thread.
+
+    The source must hold plain strings rather than read a live Qt model (see
+    pdf.table_view_data_source with snapshot=True) because Qt models may only be
+    read from the GUI thread.
+
+    Signals:
+        progress(int, int): Rows rendered so far and the total row count.
+        rendered(str): Path of the finished PDF file.
+        failed(str): Error message if rendering or writing the file failed.
+        cancelled(): Emitted instead of rendered() when cancel() was called.
+    """
+
+    progress = Signal(int, int)
+    rendered = Signal(str)
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, source: RowDataSource, parent=None) -> None:
+        super().__init__(parent)
+        self.source = source
+        self._cancel_requested = False
+
+    def cancel(self) -> None:
+        self._cancel_requested = True
+
+    def is_cancel_requested(self) -> bool:
+        return self._cancel_requested
+
+    def run(self) -> None:
+        try:
+            pdf = PDF(
+                self.source,
+                progress_callback=self.progress.emit,
+                is_cancelled=self.is_cancel_requested,
+            )
+            pdf_path = pdf.save()
+        except PDFRenderCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:  # noqa: BLE001 - any render error goes to the UI thread
+            self.failed.emit(str(e))
+            return
+
+        self.rendered.emit(str(pdf_path))
@@ -0,0 +1,248 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from PySide6.QtCore import QObject, QThread, Signal
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..api import (
+    get_newest_rma_num,
+    get_oldest_rma_num,
+    get_rma_by_rma_num,
+    get_rma_window,
+)
+from ..database import RMA
+
+PREFETCH_WINDOW = 10  # RMAs fetched on each side of the current one
+CACHE_SIZE = 100
+
+
+class RMAWindowWorker(QThread):
+    """
+    Fetches a window of RMAs around an anchor number on a background thread.
+
+    Signals:
+        fetched(int, list, int, int): The anchor, the RMAs in number order, and
+            the `before` and `after` sizes that were requested.
+    """
+
+    fetched = Signal(int, list, int, int)
+
+    def __init__(self, anchor: int, before: int, after: int, parent=None) -> None:
+        super().__init__(parent)
+        self.anchor = anchor
+        self.before = before
+        self.after = after
+
+    def run(self) -> None:
+        try:
+            rmas = get_rma_window(self.anchor, self.before, self.after)
+        except SQLAlchemyError:  # a failed prefetch just means the next move loads it
+            return
+        self.fetched.emit(self.anchor, rmas, self.before, self.after)
+
+
+class RMARecordCursor(QObject):
+    """
+    Steps through RMAs in number order for the records window, serving moves from
+    an LRU cache of recently seen and prefetched RMAs.
+
+    `order` is a run of consecutive RMA numbers (no RMA between two entries is
+    missing from it) around the current one. Whenever the current RMA gets
+    within half a window of either end of the run, the next window beyond that
+    end is fetched on a worker thread, so moving one record at a time normally
+    never waits on the database. invalidate() drops RMAs the change poller
+    reported so they are read again on the next visit.
+    """
+
+    def __init__(
+        self,
+        window: int = PREFETCH_WINDOW,
+        cache_size: int = CACHE_SIZE,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.window = window
+        self.cache_size = cache_size
+        self.cache: OrderedDict[int, RMA] = OrderedDict()
+        self.order: list[int] = []
+        self.at_start = False  # order[0] is the lowest RMA number
+        self.at_end = False  # order[-1] is the highest RMA number
+        self.current: int | None = None
+        self.generation = 0  # bumped on invalidation so stale prefetches are dropped
+        self.worker: RMAWindowWorker | None = None
+        self.worker_generation = 0
+
+    # === Navigation ===
+    def first(self) -> RMA | None:
+        first_rma: int | None = get_oldest_rma_num()
+        return self.move_to(first_rma) if first_rma is not None else None
+
+    def last(self) -> RMA | None:
+        last_rma: int | None = get_newest_rma_num()
+        return self.move_to(last_rma) if last_rma is not None else None
+
+    def prev(self) -> RMA | None:
+        return self.step(-1)
+
+    def next(self) -> RMA | None:
+        return self.step(1)
+
+    def move_to(self, rma: RMA | int) -> RMA | None:
+        """Makes the given RMA (or RMA number) current and returns it."""
+        if isinstance(rma, RMA):
+            self._remember(rma)
+            rma_number = rma.rma_number
+        else:
+            rma_number = rma
+
+        found = self._get(rma_number)
+        if found is None:
+            found = get_rma_by_rma_num(rma_number)  # also finds archived RMAs
+            if found is None:
+                return None
+            self._remember(found)
+
+        self.current = rma_number
+        self._prefetch_if_needed()
+        return found
+
+    def step(self, offset: int) -> RMA | None:
+        """Moves `offset` RMAs along the number order; None past either end."""
+        if self.current is None:
+            return None
+
+        for _ in range(2):  # a second try after reloading a stale run
+            if self.current not in self.order:
+                self._load_window(self.current)
+            index = bisect_left(self.order, self.current)
+            if self.current in self.order or offset < 0:
+                index += offset
+            else:  # the current RMA is archived or gone; index is the next one up
+                index += offset - 1
+
+            if index < 0 and self.at_start:
+                return None
+            if index >= len(self.order) and self.at_end:
+                return None
+            if index < 0 or index >= len(self.order):
+                self._load_window(self.current)
+                continue
+
+            rma = self._get(self.order[index])
+            if rma is None:  # deleted since the run was read; _get reloaded it
+                continue
+            self.current = rma.rma_number
+            self._prefetch_if_needed()
+            return rma
+        return None
+
+    # === Cache ===
+    def invalidate(self, rma_numbers: Iterable[int]) -> None:
+        """Forgets the given RMAs, e.g. ones the change poller saw edited."""
+        self.generation += 1
+        for rma_number in rma_numbers:
+            self.cache.pop(rma_number, None)
+            # An RMA added inside the run would make it skip a record
+            if (
+                self.order
+                and self.order[0] < rma_number < self.order[-1]
+                and rma_number not in self.order
+            ):
+                self.order = []
+
+    def _remember(self, rma: RMA) -> None:
+        self.cache[rma.rma_number] = rma
+        self.cache.move_to_end(rma.rma_number)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _get(self, rma_number: int) -> RMA | None:
+        rma = self.cache.get(rma_number)
+        if rma is not None:
+            self.cache.move_to_end(rma_number)
+            return rma
+        self._load_window(rma_number)
+        return self.cache.get(rma_number)
+
+    def _load_window(self, anchor: int) -> None:
+        rmas = get_rma_window(anchor, self.window, self.window)
+        self._merge_window(anchor, rmas, self.window, self.window, replace=True)
+
+    def _merge_window(
+        self,
+        anchor: int,
+        rmas: list[RMA],
+        before: int,
+        after: int,
+        replace: bool = False,
+    ) -> None:
+        numbers = [rma.rma_number for rma in rmas]
+        for rma in rmas:
+            self._remember(rma)
+
+        at_start = sum(number < anchor for number in numbers) < before
+        at_end = sum(number > anchor for number in numbers) < after
+        overlaps = bool(
+            self.order
+            and numbers
+            and numbers[0] <= self.order[-1]
+            and numbers[-1] >= self.order[0]
+        )
+        if replace or not overlaps:
+            if not replace and self.order:
+                return  # a prefetch that no longer borders the run
+            self.order = numbers
+            self.at_start = at_start
+            self.at_end = at_end
+            return
+
+        merged = sorted(set(self.order) | set(numbers))
+        if numbers and numbers[0] == merged[0]:
+            self.at_start = at_start if before else self.at_start
+        if numbers and numbers[-1] == merged[-1]:
+            self.at_end = at_end if after else self.at_end
+        self.order = merged
+
+    # === Prefetch ===
+    def _prefetch_if_needed(self) -> None:
+        if self.worker is not None or self.current not in self.order:
+            return
+
+        index = self.order.index(self.current)
+        margin = self.window // 2
+        if not self.at_end and len(self.order) - 1 - index <= margin:
+            self._start_prefetch(self.order[-1], 0, self.window)
+        elif not self.at_start and index <= margin:
+            self._start_prefetch(self.order[0], self.window, 0)
+
+    def _start_prefetch(self, anchor: int, before: int, after: int) -> None:
+        self.worker_generation = self.generation
+        self.worker = RMAWindowWorker(anchor, before, after, self)
+        self.worker.fetched.connect(self._handle_prefetched)
+        self.worker.finished.connect(self._handle_worker_finished)
+        self.worker.start()
+
+    def _handle_prefetched(
+        self, anchor: int, rmas: list, before: int, after: int
+    ) -> None:
+        if self.worker_generation != self.generation:
+            return
+        self._merge_window(anchor, rmas, before, after)
+
+    def _handle_worker_finished(self) -> None:
+        worker = self.sender()
+        worker.deleteLater()
+        if worker is not self.worker:  # already let go of by shutdown()
+            return
+        self.worker = None
+        self._prefetch_if_needed()  # the user may have moved on meanwhile
+
+    def shutdown(self) -> None:
+        """
+        Waits for a running prefetch and lets go of it, so its queued finished
+        signal cannot start another one after the window is hidden.
+        """
+        if self.worker is not None:
+            self.worker.wait()
+            self.worker = None
@@ -0,0 +1,68 @@
+from collections.abc import Callable
+
+from PySide6.QtCore import QObject, Signal
+
+from ..dataset import RMAColumns
+from .change_poller import ChangePoller
+
+
+class RMADataset(QObject, RMAColumns):
+    """
+    The RMAColumns shared by every table window, kept current while any of
+    them is open.
+
+    The open RMAs are loaded when the dataset is created; the windows that
+    show closed RMAs or notes load those (see RMAColumns).
+
+    Windows attach() while they are open. A single ChangePoller keeps the copy
+    current by reloading only the RMAs the journal reports, and runs only while
+    at least one window is attached.
+
+    Use RMADataset.instance() rather than creating one.
+
+    Signals:
+        rmas_changed(list, list): The RMA numbers that were reloaded and the
+            ones that no longer exist, after the columns have been updated.
+    """
+
+    rmas_changed = Signal(list, list)
+
+    _instance: 'RMADataset | None' = None
+
+    @classmethod
+    def instance(cls) -> 'RMADataset':
+        """Returns the process-wide dataset, loading it on first use."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)  # also runs RMAColumns.__init__()
+        self.attached: int = 0
+
+        # Created before the load so no edit made while loading is missed
+        self.change_poller = ChangePoller(parent=self)
+        self.change_poller.rmas_changed.connect(self.refresh)
+        self.load_open()
+
+    def attach(self, on_change: Callable[[list, list], None]) -> None:
+        """
+        Connects a window's slot to rmas_changed and starts the ChangePoller
+        for the first window. Call detach() with the same slot when it closes.
+        """
+        self.rmas_changed.connect(on_change)
+        self.attached += 1
+        if self.attached == 1:
+            self.change_poller.start()
+
+    def detach(self, on_change: Callable[[list, list], None]) -> None:
+        """Disconnects a window's slot and stops the poller after the last one."""
+        self.rmas_changed.disconnect(on_change)
+        self.attached -= 1
+        if self.attached == 0:
+            self.change_poller.stop()
+
+    def refresh(self, rma_numbers: list[int]) -> None:
+        """Reloads the given RMAs from the database and notifies the views."""
+        changed, removed = self.reload(rma_numbers)
+        self.rmas_changed.emit(changed, removed)
@@ -0,0 +1,59 @@
+from PySide6.QtCore import QAbstractItemModel, QEvent, QObject, QTimer
+from PySide6.QtWidgets import QTableView
+
+
+class VisibleRowSizer(QObject):
+    """
+    Fits the height of the rows on screen to their word-wrapped contents.
+
+    resizeRowsToContents() lays out every cell of every row, which grows with
+    the table. This sizes only the rows in the viewport, a screenful at most,
+    after scrolling, a viewport or column resize, or any change to the model's
+    rows (filtering, sorting, live updates). Rows off screen keep the default
+    height until they are scrolled into view. Changes are batched with a 0 ms
+    timer, so a burst of signals sizes the rows once.
+    """
+
+    def __init__(self, table_view: QTableView) -> None:
+        super().__init__(table_view)
+        self.table_view = table_view
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.size_visible_rows)
+        table_view.verticalScrollBar().valueChanged.connect(self.schedule)
+        table_view.horizontalHeader().sectionResized.connect(self.schedule)
+        table_view.viewport().installEventFilter(self)
+
+    def track(self, model: QAbstractItemModel) -> None:
+        """Re-sizes the visible rows whenever `model` (the view's model) changes."""
+        for signal in (
+            model.layoutChanged,
+            model.modelReset,
+            model.rowsInserted,
+            model.rowsRemoved,
+            model.dataChanged,
+        ):
+            signal.connect(self.schedule)
+        self.schedule()
+
+    def schedule(self) -> None:
+        self.timer.start()
+
+    def size_visible_rows(self) -> None:
+        """Sizes each row from the top of the viewport down to its bottom edge."""
+        view = self.table_view
+        row = view.rowAt(0)
+        if row < 0:
+            return
+        row_count = view.model().rowCount()
+        bottom = view.viewport().height()
+        # Sizing a row moves the ones below it, so look up each position afresh
+        while row < row_count and view.rowViewportPosition(row) < bottom:
+            view.resizeRowToContents(row)
+            row += 1
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Resize:
+            self.schedule()
+        return False
@@ -0,0 +1,31 @@
+from PySide6.QtCore import QThread, Signal
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..api import find_rmas_by_sn
+
+
+class SNSearchWorker(QThread):
+    """
+    Runs one partial serial number search on a background thread.
+
+    Signals:
+        found(int, list): The request id passed in and the matching RMAs.
+        failed(int, str): The request id and the error message.
+    """
+
+    found = Signal(int, list)
+    failed = Signal(int, str)
+
+    def __init__(self, request_id: int, serial_num: str, limit: int, parent=None):
+        super().__init__(parent)
+        self.request_id = request_id
+        self.serial_num = serial_num
+        self.limit = limit
+
+    def run(self) -> None:
+        try:
+            rmas = find_rmas_by_sn(self.serial_num, limit=self.limit)
+        except SQLAlchemyError as e:
+            self.failed.emit(self.request_id, str(e))
+            return
+        self.found.emit(self.request_id, rmas)
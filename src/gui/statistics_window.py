@@ -0,0 +1,124 @@
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QDialog,
+    QGridLayout,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QTabWidget,
+    QVBoxLayout,
+)
+
+from ..api import (
+    get_counts_by_customer,
+    get_counts_by_product,
+    get_monthly_counts,
+    get_open_backlog_by_status,
+    get_status_counts,
+    get_turnaround_stats,
+    get_warranty_ratio,
+)
+
+
+class StatisticsWindow(QDialog):
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle('RMA Statistics')
+        self.resize(520, 600)
+        self.create_gui()
+        self.load_data()
+
+    def create_gui(self) -> None:
+        self.total_label = QLabel('Total RMAs')
+        self.total_display = QLabel()
+        self.total_display.setStyleSheet('color: lightgreen;')
+        self.open_label = QLabel('Open RMAs')
+        self.open_display = QLabel()
+        self.open_display.setStyleSheet('color: lightgreen;')
+        self.warranty_label = QLabel('Warranty Ratio')
+        self.warranty_display = QLabel()
+        self.warranty_display.setStyleSheet('color: lightgreen;')
+        self.turnaround_label = QLabel('Turnaround (days)')
+        self.turnaround_display = QLabel()
+        self.turnaround_display.setStyleSheet('color: lightgreen;')
+
+        summary_layout = QGridLayout()
+        summary_layout.addWidget(self.total_label, 0, 0)
+        summary_layout.addWidget(self.total_display, 0, 1)
+        summary_layout.addWidget(self.open_label, 1, 0)
+        summary_layout.addWidget(self.open_display, 1, 1)
+        summary_layout.addWidget(self.warranty_label, 2, 0)
+        summary_layout.addWidget(self.warranty_display, 2, 1)
+        summary_layout.addWidget(self.turnaround_label, 3, 0, Qt.AlignmentFlag.AlignTop)
+        summary_layout.addWidget(self.turnaround_display, 3, 1)
+
+        self.status_table = self.create_count_table('Status')
+        self.backlog_table = self.create_count_table('Status')
+        self.customer_table = self.create_count_table('Customer')
+        self.product_table = self.create_count_table('Product')
+        self.month_table = self.create_count_table('Month')
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.status_table, 'By Status')
+        self.tabs.addTab(self.backlog_table, 'Open Backlog')
+        self.tabs.addTab(self.customer_table, 'By Customer')
+        self.tabs.addTab(self.product_table, 'By Product')
+        self.tabs.addTab(self.month_table, 'By Month')
+
+        main_layout = QVBoxLayout()
+        main_layout.addLayout(summary_layout)
+        main_layout.addWidget(self.tabs)
+
+        self.setLayout(main_layout)
+
+    def create_count_table(self, key_header: str) -> QTableWidget:
+        table = QTableWidget(0, 2, self)
+        table.setHorizontalHeaderLabels([key_header, 'RMAs'])
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def fill_count_table(
+        self, table: QTableWidget, rows: list[tuple[str, int]]
+    ) -> None:
+        table.setRowCount(len(rows))
+        for row, (key, count) in enumerate(rows):
+            table.setItem(row, 0, QTableWidgetItem(str(key)))
+            count_item = QTableWidgetItem()
+            count_item.setData(Qt.ItemDataRole.DisplayRole, count)
+            table.setItem(row, 1, count_item)
+        table.resizeColumnToContents(0)
+
+    def load_data(self) -> None:
+        status_counts = get_status_counts()
+        backlog = get_open_backlog_by_status()
+        warranty_ratio = get_warranty_ratio()
+        turnaround = get_turnaround_stats()
+
+        self.total_display.setText(str(sum(status_counts.values())))
+        self.open_display.setText(str(sum(backlog.values())))
+        self.warranty_display.setText(
+            'n/a' if warranty_ratio is None else f'{warranty_ratio:.1%}'
+        )
+
+        if turnaround.get('mean') is None:
+            self.turnaround_display.setText('No RMAs have shipped back yet.')
+        else:
+            lines = [
+                f'shipped: {int(turnaround["count"])}',
+                f'mean: {turnaround["mean"]:.1f}',
+            ]
+            lines += [
+                f'{key}: {value:.0f}'
+                for key, value in turnaround.items()
+                if key.startswith('p')
+            ]
+            self.turnaround_display.setText('\n'.join(lines))
+
+        self.fill_count_table(self.status_table, list(status_counts.items()))
+        self.fill_count_table(self.backlog_table, list(backlog.items()))
+        self.fill_count_table(self.customer_table, get_counts_by_customer())
+        self.fill_count_table(self.product_table, get_counts_by_product())
+        self.fill_count_table(self.month_table, get_monthly_counts())
@@ -0,0 +1,107 @@
+"""
+Cached qt-material theme, so the app does not render it on every start.
+
+qt_material.apply_stylesheet() renders the theme's Jinja template and writes
+its icons on every call. Here that is done once per theme, app version and
+qt-material version: the stylesheet, the icons it refers to (`icon:` URLs), the
+Roboto fonts and the placeholder text color it sets on the palette are saved to
+a cache folder, and later starts only read them back. qt_material is imported
+only when the cache has to be built.
+
+Run it as a module like this `python -m src.gui.theme 2.0.0` to (re)build the
+cache for an app version ahead of time.
+"""
+
+import argparse
+import json
+import os
+import shutil
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from PySide6.QtCore import QDir, QStandardPaths
+from PySide6.QtGui import QColor, QFontDatabase, QGuiApplication, QPalette
+from PySide6.QtWidgets import QApplication
+
+THEME = 'dark_lightgreen.xml'
+THEME_QSS = 'theme.qss'  # written last, so its presence marks a complete cache
+THEME_SETTINGS = 'theme.json'
+
+
+def theme_cache_dir(app_version: str, theme: str = THEME) -> Path:
+    """Returns the cache folder for this theme, app version and qt-material."""
+    try:
+        qt_material_version = version('qt-material')
+    except PackageNotFoundError:  # e.g. no dist-info in the PyInstaller build
+        qt_material_version = 'unknown'
+    cache_root = Path(
+        QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.GenericCacheLocation
+        )
+    )
+    key = f'{Path(theme).stem}-{app_version}-qt_material-{qt_material_version}'
+    return cache_root / 'rma_database' / 'theme' / key
+
+
+def build_theme_cache(cache_dir: Path, theme: str = THEME) -> None:
+    """Renders the theme with qt_material and saves it, its icons and fonts."""
+    import qt_material
+
+    stylesheet = qt_material.build_stylesheet(theme=theme, invert_secondary=True)
+    if stylesheet is None:
+        raise ValueError(f'qt_material has no theme {theme!r}')
+
+    # build_stylesheet() wrote the icons and put them on the 'icon:' search path
+    icons_dir = cache_dir / 'icons'
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    for search_path in QDir.searchPaths('icon'):
+        shutil.copytree(search_path, icons_dir, dirs_exist_ok=True)
+    fonts_dir = cache_dir / 'fonts'
+    fonts_dir.mkdir(parents=True, exist_ok=True)
+    for font in (Path(qt_material.__file__).parent / 'fonts').rglob('*.ttf'):
+        shutil.copy2(font, fonts_dir)
+
+    # build_stylesheet() also tints the palette's placeholder text
+    placeholder = QGuiApplication.palette().color(QPalette.ColorRole.PlaceholderText)
+    settings = {'placeholder_color': placeholder.name(QColor.NameFormat.HexArgb)}
+    (cache_dir / THEME_SETTINGS).write_text(json.dumps(settings, indent=2))
+
+    staging = cache_dir / f'{THEME_QSS}.tmp'
+    staging.write_text(stylesheet, encoding='utf-8')
+    os.replace(staging, cache_dir / THEME_QSS)
+
+
+def load_theme_stylesheet(app_version: str, theme: str = THEME) -> str:
+    """
+    Returns the theme's stylesheet, building the cache first if it is missing.
+
+    Also registers the cached icons and fonts the stylesheet refers to and
+    sets the placeholder text color, which apply_stylesheet() used to do.
+    """
+    cache_dir = theme_cache_dir(app_version, theme)
+    qss_file = cache_dir / THEME_QSS
+    if not qss_file.exists():
+        build_theme_cache(cache_dir, theme)
+
+    QDir.setSearchPaths('icon', [str(cache_dir / 'icons')])
+    for font in (cache_dir / 'fonts').glob('*.ttf'):
+        QFontDatabase.addApplicationFont(str(font))
+    settings = json.loads((cache_dir / THEME_SETTINGS).read_text())
+    palette = QGuiApplication.palette()
+    palette.setColor(
+        QPalette.ColorRole.PlaceholderText, QColor(settings['placeholder_color'])
+    )
+    QGuiApplication.setPalette(palette)
+    return qss_file.read_text(encoding='utf-8')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('app_version')
+    parser.add_argument('--theme', default=THEME)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache_dir = theme_cache_dir(args.app_version, args.theme)
+    build_theme_cache(cache_dir, args.theme)
+    print(f'Built the {args.theme} theme cache in {cache_dir}')
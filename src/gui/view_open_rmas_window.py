@@ -1,3 +1,5 @@
+from collections.abc import Sequence
+from pathlib import Path
 from typing import Any
 
 from PySide6.QtCore import (
@@ -20,6 +22,7 @@ from PySide6.QtWidgets import (
     QLabel,
     QListWidget,
     QListWidgetItem,
+    QProgressDialog,
     QPushButton,
     QStyledItemDelegate,
     QStyleOptionViewItem,
@@ -28,23 +31,47 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
-from sqlalchemy.orm import joinedload
 
-from ..database import RMA, PartNumber, SessionLocal
+from ..api import get_reasons_for_return
+from ..database import RMAStatus
 from ..models import OpenRMAsSortFilterProxyModel, OpenRMAsTableModel
-from ..pdf import PDF
+from ..pdf import open_pdf_file, table_view_data_source
+from .column_widths import fit_column_widths
 from .custom_dropdown_style import combo_style
 from .error_messages import open_pdf_failed_message
+from .pdf_render_worker import PDFRenderWorker
+from .rma_dataset import RMADataset
+from .row_heights import VisibleRowSizer
+
+
+def with_full_reasons(
+    headers: Sequence[str], rows: Sequence[Sequence[str]]
+) -> list[tuple[str, ...]]:
+    """
+    Replaces the shortened reason the table shows with the full reason for
+    return from rma_notes, which is what the printed report should carry.
+    """
+    column = list(headers).index('Reason for Return')
+    reasons = get_reasons_for_return([int(row[0]) for row in rows])
+    return [
+        (*row[:column], reasons.get(int(row[0]), row[column]), *row[column + 1 :])
+        for row in rows
+    ]
 
 
 class ViewOpenRMAsWindow(QDialog):
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         self.setWindowTitle('View Open RMAs')
+        # Opened anew per click, so free it on close
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.pdf_worker: PDFRenderWorker | None = None
+        self.pdf_progress: QProgressDialog | None = None
         self.table_view = QTableView(self)
         self.table_view.setWordWrap(True)
         self.table_view.setTextElideMode(Qt.TextElideMode.ElideNone)
         self.table_view.setItemDelegate(WordWrapDelegate(self.table_view))
+        self.row_sizer = VisibleRowSizer(self.table_view)
 
         self.print_button = QPushButton('Print to PDF', self)
         self.print_button.clicked.connect(self._handle_print_button_pressed)
@@ -67,10 +94,7 @@ class ViewOpenRMAsWindow(QDialog):
 
         self.filter_status_label = QLabel('Filter by Status:')
         selection_list = [
-            'Issued',
-            'Received',
-            'In Process',
-            'Complete',
+            status.label for status in RMAStatus if status != RMAStatus.CLOSED
         ]
         self.filter_status_dd = MultiSelectDropdown(items=selection_list, parent=self)
         self.filter_status_dd.selectionChanged.connect(self.apply_status_filter)
@@ -105,30 +129,22 @@ class ViewOpenRMAsWindow(QDialog):
 
         self.setLayout(main_layout)
 
+        self.dataset = RMADataset.instance()
         self.load_data()
+        # Its first poll may patch the model, so this comes after load_data()
+        self.dataset.attach(self.apply_remote_changes)
+        # finished is emitted however the dialog closes, including Esc
+        self.finished.connect(self._detach_dataset)
         self.filter_status_dd.emit_selection_changed()
         self.adjust_window_size()
 
     def load_data(self) -> None:
-        with SessionLocal() as session:
-            open_rmas = (
-                session.query(RMA)
-                .options(
-                    joinedload(RMA.part_number).joinedload(PartNumber.product),
-                    joinedload(RMA.customer),
-                    joinedload(RMA.issued_by),
-                )
-                .filter(RMA.status != 'Closed')
-                .all()
-            )
+        # The open RMAs are a view of the shared dataset, so this runs no query
+        self.model = OpenRMAsTableModel(self.dataset, self)
 
-        products: list[str] = sorted(
-            {rma.part_number.product.name for rma in open_rmas}
-        )
-        customers: list[str] = sorted({rma.customer.name for rma in open_rmas})
-        warranties: list[str] = sorted(
-            {'Yes' if rma.is_warranty else 'No' for rma in open_rmas}
-        )
+        products: list[str] = self.model.distinct_values('Product')
+        customers: list[str] = self.model.distinct_values('Customer')
+        warranties: list[str] = self.model.distinct_values('Warranty')
         # statuses: list[str] = sorted({rma.status for rma in open_rmas})
 
         self.filter_customer_cbb.blockSignals(True)  # prevent premature filtering
@@ -155,8 +171,6 @@ class ViewOpenRMAsWindow(QDialog):
         # self.filter_status_dd.addItems(statuses)
         # self.filter_status_dd.blockSignals(False)
 
-        self.model = OpenRMAsTableModel(open_rmas)
-
         self.proxy_model = OpenRMAsSortFilterProxyModel()
         self.proxy_model.setSourceModel(self.model)
 
@@ -165,43 +179,93 @@ class ViewOpenRMAsWindow(QDialog):
         self.proxy_model.sort(0, Qt.SortOrder.AscendingOrder)  # sort by ascending RMA#
 
         self.adjust_column_widths()
-        self.table_view.resizeRowsToContents()
+        self.row_sizer.track(self.proxy_model)
         self.adjust_window_size()
 
     def apply_customer_filter(self, customer: str) -> None:
         self.proxy_model.set_customer_filter(customer)
-        self.table_view.resizeRowsToContents()
 
     def apply_product_filter(self, product: str) -> None:
         self.proxy_model.set_product_filter(product)
-        self.table_view.resizeRowsToContents()
 
     def apply_warranty_filter(self, warranty: str) -> None:
         self.proxy_model.set_warranty_filter(warranty)
-        self.table_view.resizeRowsToContents()
 
     def apply_status_filter(self, selected_statuses: list[str]) -> None:
         filtered_statuses = [
             status for status in selected_statuses if status != 'Select All'
         ]
         self.proxy_model.set_status_filter(filtered_statuses)
-        self.table_view.resizeRowsToContents()
 
     def _handle_print_button_pressed(self) -> None:
-        pdf = PDF(self.table_view)
+        if self.pdf_worker is not None:  # a report is already being rendered
+            return
+
+        # Qt models can only be read on the GUI thread, so copy the visible rows
+        # into plain strings before handing them to the render thread.
+        source = table_view_data_source(self.table_view, snapshot=True)
+        source.rows = with_full_reasons(source.headers, source.rows)
+
+        self.pdf_progress = QProgressDialog(
+            'Rendering open RMAs...', 'Cancel', 0, source.row_count or 0, self
+        )
+        self.pdf_progress.setWindowTitle('Print to PDF')
+        self.pdf_progress.setWindowModality(Qt.WindowModality.NonModal)
+        self.pdf_progress.setMinimumDuration(500)
+        self.pdf_progress.setAutoClose(False)
+        self.pdf_progress.setAutoReset(False)
+
+        self.pdf_worker = PDFRenderWorker(source, self)
+        self.pdf_worker.progress.connect(self._handle_pdf_progress)
+        self.pdf_worker.rendered.connect(self._handle_pdf_rendered)
+        self.pdf_worker.failed.connect(self._handle_pdf_failed)
+        self.pdf_worker.finished.connect(self._handle_pdf_worker_finished)
+        self.pdf_progress.canceled.connect(self.pdf_worker.cancel)
+
+        self.print_button.setEnabled(False)
+        self.pdf_worker.start()
+
+    def _handle_pdf_progress(self, done: int, total: int) -> None:
+        if self.pdf_progress is not None:
+            self.pdf_progress.setMaximum(total)  # 0 shows a busy indicator
+            self.pdf_progress.setValue(done)
+
+    def _handle_pdf_rendered(self, pdf_path: str) -> None:
         try:
-            pdf.open()
+            open_pdf_file(Path(pdf_path))
         except Exception as e:
             open_pdf_failed_message(self, e)
 
+    def _handle_pdf_failed(self, error: str) -> None:
+        open_pdf_failed_message(self, error)
+
+    def _handle_pdf_worker_finished(self) -> None:
+        if self.pdf_progress is not None:
+            self.pdf_progress.close()
+            self.pdf_progress.deleteLater()
+            self.pdf_progress = None
+        if self.pdf_worker is not None:
+            self.pdf_worker.deleteLater()
+            self.pdf_worker = None
+        self.print_button.setEnabled(True)
+
+    def done(self, result: int) -> None:
+        # Esc and the close button both end up here, before WA_DeleteOnClose
+        if self.pdf_worker is not None:
+            self.pdf_worker.cancel()
+            self.pdf_worker.wait()
+        super().done(result)
+
+    def _detach_dataset(self) -> None:
+        self.dataset.detach(self.apply_remote_changes)
+
+    def apply_remote_changes(self, changed: list[int], removed: list[int]) -> None:
+        """Patches the model with the RMAs the shared dataset just reloaded."""
+        self.model.apply_changes(changed, removed)
+
     def adjust_column_widths(self) -> None:
-        self.table_view.resizeColumnsToContents()
-        extra_padding = 15
-        max_column_width = 163
-        for col in range(self.model.columnCount()):
-            current_width = self.table_view.columnWidth(col)
-            col_width = min(current_width, max_column_width)
-            self.table_view.setColumnWidth(col, col_width + extra_padding)
+        # Estimated from a sample of rows, so opening does not scale with the table
+        fit_column_widths(self.table_view, max_width=163, padding=15)
 
     def adjust_window_size(self) -> None:
         """
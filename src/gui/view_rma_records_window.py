@@ -1,8 +1,9 @@
 from typing import Any
 
-from PySide6.QtCore import QDate, QRegularExpression, Qt, Signal
+from PySide6.QtCore import QDate, QRegularExpression, Qt, QTimer, Signal
 from PySide6.QtGui import QRegularExpressionValidator
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QCalendarWidget,
     QCheckBox,
     QComboBox,
@@ -13,21 +14,28 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QMessageBox,
     QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
     QTextEdit,
     QVBoxLayout,
 )
 
 from ..api import (
-    get_newest_rma_num,
-    get_oldest_rma_num,
+    RMA_STATUSES,
     get_rma_by_rma_num,
-    get_rma_by_sn,
     overwrite_rma_record,
 )
 from ..csv_io.export_to_csv import export_rmas_to_csv
-from ..database import RMA
+from ..database import RMA, RMAStatus
 from ..email import send_outlook_email
+from .change_poller import ChangePoller
 from .error_messages import overwrite_record_failed_message
+from .record_cursor import RMARecordCursor
+from .sn_search_worker import SNSearchWorker
+
+SN_SEARCH_DEBOUNCE_MS = 200
+SN_SEARCH_LIMIT = 50
+SN_SEARCH_HEADERS = ['RMA #', 'S/N', 'Customer', 'Status']
 
 
 class ViewRMARecordsWindow(QDialog):
@@ -36,10 +44,12 @@ class ViewRMARecordsWindow(QDialog):
         self.setWindowTitle('RMA Records')
         self.set_window_size()
         self.create_gui()
-        rma: RMA | None = None
-        last_rma: int | None = get_newest_rma_num()
-        if last_rma is not None:
-            rma = get_rma_by_rma_num(last_rma)
+
+        self.cursor = RMARecordCursor(parent=self)
+        self.change_poller = ChangePoller(parent=self)
+        self.change_poller.rmas_changed.connect(self.cursor.invalidate)
+
+        rma: RMA | None = self.cursor.last()
         if rma is not None:
             self.load_rma_data(rma)
         self.save_button.setEnabled(False)
@@ -47,11 +57,12 @@ class ViewRMARecordsWindow(QDialog):
     def _handle_save_button_pressed(self) -> None:
         rma_number = self.rma_num_display.text()
         self.save_changes(rma_number)
+        self.cursor.invalidate([int(rma_number)])
         export_rmas_to_csv()  # write backup to CSV
         # check if the status has changed and that the new status is 'Received'
         if (
             self.loaded_status != self.status_ccb.currentText()
-            and self.status_ccb.currentText() == 'Received'
+            and self.status_ccb.currentText() == RMAStatus.RECEIVED.label
         ):
             self.send_email()
         self.save_button.setEnabled(False)
@@ -67,6 +78,7 @@ class ViewRMARecordsWindow(QDialog):
         rma_search_window.exec()
 
     def _process_search_input(self, rma: RMA) -> None:
+        self.cursor.move_to(rma)
         self.load_rma_data(rma)
 
     def _handle_go_to_first_button_pressed(self) -> None:
@@ -86,6 +98,15 @@ class ViewRMARecordsWindow(QDialog):
     def _enable_save_button(self) -> None:
         self.save_button.setEnabled(True)
 
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.change_poller.start()
+
+    def hideEvent(self, event) -> None:
+        self.change_poller.stop()
+        self.cursor.shutdown()
+        super().hideEvent(event)
+
     def set_window_size(self) -> None:
         aspect_ratio: dict[str, int] = {'width': 4, 'height': 3}
         scaling_factor: int = 170
@@ -122,9 +143,7 @@ class ViewRMARecordsWindow(QDialog):
         self.warranty_cb = QCheckBox()
         self.status_label = QLabel('Status')
         self.status_ccb = QComboBox()
-        self.status_ccb.addItems(
-            ['Issued', 'Received', 'In Process', 'Complete', 'Closed']
-        )
+        self.status_ccb.addItems(RMA_STATUSES)
         self.status_ccb.setStyleSheet('color: lightgreen;')
         self.inspection_notes_label = QLabel('Inspection Notes')
         self.inspection_notes_text = QTextEdit()
@@ -245,7 +264,7 @@ class ViewRMARecordsWindow(QDialog):
         self.date_issued_display.setText(rma.issued_on.strftime('%Y-%m-%d'))
         self.issued_by_display.setText(rma.issued_by.name.upper())
         self.warranty_cb.setChecked(rma.is_warranty)
-        self.status_ccb.setCurrentText(rma.status)
+        self.status_ccb.setCurrentText(rma.status.label)
         self.customer_po_num_input.setText(rma.customer_po_number)
         self.work_order_input.setText(rma.work_order)
         self.inspection_notes_text.setPlainText(rma.incoming_inspection_notes)
@@ -259,7 +278,7 @@ class ViewRMARecordsWindow(QDialog):
                 rma.shipped_back_on.strftime('%Y-%m-%d')
             )
 
-        if rma.status == 'Closed':
+        if rma.status == RMAStatus.CLOSED:
             self.shipped_back_date_input.setEnabled(False)
 
         self.loaded_status = self.status_ccb.currentText()
@@ -295,65 +314,48 @@ class ViewRMARecordsWindow(QDialog):
         )
 
     def get_oldest_rma_record(self) -> None:
-        rma: RMA | None = None
-        first_rma: int | None = get_oldest_rma_num()
-        if first_rma is not None:
-            rma = get_rma_by_rma_num(first_rma)
+        rma: RMA | None = self.cursor.first()
         if rma is not None:
             self.load_rma_data(rma)
 
     def get_prev_rma(self, current_rma_num: int) -> None:
-        current_num = current_rma_num
-
         try:
-            max_lookback = 1001
-            for i, num in enumerate(range(current_num - 1, 0, -1)):
-                if i >= max_lookback:
-                    break
-                rma = get_rma_by_rma_num(num)
-                if rma is not None:
-                    self.load_rma_data(rma)
-                    return
+            if self.cursor.current != current_rma_num:
+                self.cursor.move_to(current_rma_num)
+            rma = self.cursor.prev()
         except Exception as e:
             QMessageBox.critical(
                 self, 'Error', f'An error occured while searching: {str(e)}'
             )
+            return
 
+        if rma is not None:
+            self.load_rma_data(rma)
+            return
         QMessageBox.information(
             self, 'No Previous Record', 'This is the first available RMA record.'
         )
 
     def get_next_rma(self, current_rma_num: int) -> None:
-        current_num = current_rma_num
-
-        latest_rma_str = get_newest_rma_num()
-        if latest_rma_str is None:
-            return
-        latest_rma_num = int(latest_rma_str)
-
         try:
-            max_lookup = 1001
-            for i, num in enumerate(range(current_num + 1, latest_rma_num + 1)):
-                if i >= max_lookup:
-                    break
-                rma = get_rma_by_rma_num(num)
-                if rma is not None:
-                    self.load_rma_data(rma)
-                    return
+            if self.cursor.current != current_rma_num:
+                self.cursor.move_to(current_rma_num)
+            rma = self.cursor.next()
         except Exception as e:
             QMessageBox.critical(
                 self, 'Error', f'An error occured while searching: {str(e)}'
             )
+            return
 
+        if rma is not None:
+            self.load_rma_data(rma)
+            return
         QMessageBox.information(
             self, 'No Next Record', 'This is the last available RMA record.'
         )
 
     def get_last_rma(self) -> None:
-        rma: RMA | None = None
-        last_rma: int | None = get_newest_rma_num()
-        if last_rma is not None:
-            rma = get_rma_by_rma_num(last_rma)
+        rma: RMA | None = self.cursor.last()
         if rma is not None:
             self.load_rma_data(rma)
 
@@ -416,30 +418,87 @@ class DateLineEdit(QLineEdit):
 
 
 class SNSearchWindow(QDialog):
+    """
+    Search-as-you-type list of the RMAs whose serial number contains the input.
+
+    Keystrokes are debounced, and each search runs on an SNSearchWorker. Only one
+    search runs at a time: text typed meanwhile waits for it to finish, and the
+    results of a search that no longer matches the input are dropped.
+    """
+
     searched_rma = Signal(RMA)
 
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
+        self.request_id = 0
+        self.pending_search = False
+        self.worker: SNSearchWorker | None = None
+        self.results: list[RMA] = []
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(SN_SEARCH_DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.start_search)
         self.create_gui()
 
+    def _handle_sn_text_changed(self) -> None:
+        self.debounce_timer.start()
+
     def _handle_search_button_pressed(self) -> None:
-        serial_number = self.sn_input.text()
-        self.search_by_sn(serial_number)
+        row = self.results_table.currentRow()
+        if 0 <= row < len(self.results):
+            self.searched_rma.emit(self.results[row])
+            self.accept()
+
+    def _handle_result_double_clicked(self, row: int, column: int) -> None:
+        self._handle_search_button_pressed()
+
+    def _handle_search_found(self, request_id: int, rmas: list) -> None:
+        if request_id == self.request_id:
+            self.show_results(rmas)
+
+    def _handle_search_failed(self, request_id: int, message: str) -> None:
+        if request_id == self.request_id:
+            self.status_display.setText(f'Search failed: {message}')
+
+    def _handle_worker_finished(self) -> None:
+        if self.worker is not None:
+            self.worker.deleteLater()
+        self.worker = None
+        if self.pending_search:
+            self.start_search()
 
     def create_gui(self) -> None:
-        self.setFixedSize(300, 100)
+        self.setMinimumSize(520, 360)
         self.setWindowTitle('Search RMAs by Serial Number')
 
         self.sn_label = QLabel('Serial Number')
         self.sn_input = QLineEdit()
+        self.sn_input.setPlaceholderText('Type part of a serial number...')
 
         regex = QRegularExpression(r'^[a-zA-Z0-9]*$')
         validator = QRegularExpressionValidator(regex)
         self.sn_input.setValidator(validator)
 
-        self.search_button = QPushButton('Search')
+        self.results_table = QTableWidget(0, len(SN_SEARCH_HEADERS), self)
+        self.results_table.setHorizontalHeaderLabels(SN_SEARCH_HEADERS)
+        self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.results_table.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.results_table.setSelectionMode(
+            QAbstractItemView.SelectionMode.SingleSelection
+        )
+        self.results_table.verticalHeader().setVisible(False)
+        self.results_table.horizontalHeader().setStretchLastSection(True)
+        self.status_display = QLabel()
 
+        self.search_button = QPushButton('Open')
+        self.search_button.setEnabled(False)
+
+        self.sn_input.textChanged.connect(self._handle_sn_text_changed)
+        self.sn_input.returnPressed.connect(self._handle_search_button_pressed)
         self.search_button.clicked.connect(self._handle_search_button_pressed)
+        self.results_table.cellDoubleClicked.connect(self._handle_result_double_clicked)
 
         h_layout = QHBoxLayout()
         h_layout.addWidget(self.sn_label)
@@ -447,19 +506,64 @@ class SNSearchWindow(QDialog):
 
         main_layout = QVBoxLayout()
         main_layout.addLayout(h_layout)
+        main_layout.addWidget(self.results_table)
+        main_layout.addWidget(self.status_display)
         main_layout.addWidget(self.search_button)
 
         self.setLayout(main_layout)
 
-    def search_by_sn(self, serial_number: str) -> None:
-        rma: RMA | None = get_rma_by_sn(serial_number, fuzzy=True)
-        if rma is not None:
-            self.searched_rma.emit(rma)
-            self.accept()
-        else:
-            QMessageBox.warning(
-                self, 'No Record Found', f'SN-{serial_number} not found.'
+    def start_search(self) -> None:
+        serial_number = self.sn_input.text()
+        self.request_id += 1  # results of earlier searches are now stale
+        if not serial_number:
+            self.pending_search = False
+            self.show_results([])
+            return
+        if self.worker is not None:
+            self.pending_search = True  # run once the current search finishes
+            return
+
+        self.pending_search = False
+        self.worker = SNSearchWorker(
+            self.request_id, serial_number, SN_SEARCH_LIMIT, self
+        )
+        self.worker.found.connect(self._handle_search_found)
+        self.worker.failed.connect(self._handle_search_failed)
+        self.worker.finished.connect(self._handle_worker_finished)
+        self.worker.start()
+
+    def show_results(self, rmas: list[RMA]) -> None:
+        self.results = rmas
+        self.results_table.setRowCount(len(rmas))
+        for row, rma in enumerate(rmas):
+            values = (
+                rma.rma_number,
+                rma.serial_number,
+                rma.customer.name.upper(),
+                rma.status.label,
             )
+            for column, value in enumerate(values):
+                self.results_table.setItem(row, column, QTableWidgetItem(str(value)))
+        self.results_table.resizeColumnsToContents()
+
+        if rmas:
+            self.results_table.selectRow(0)
+        self.search_button.setEnabled(bool(rmas))
+        if not self.sn_input.text():
+            self.status_display.clear()
+        elif len(rmas) >= SN_SEARCH_LIMIT:
+            self.status_display.setText(
+                f'Showing the newest {SN_SEARCH_LIMIT} matches.'
+            )
+        else:
+            self.status_display.setText(f'{len(rmas)} matching RMAs.')
+
+    def done(self, result: int) -> None:
+        self.debounce_timer.stop()
+        self.pending_search = False
+        if self.worker is not None:
+            self.worker.wait()
+        super().done(result)
 
 
 class RMASearchWindow(QDialog):
@@ -1,19 +1,27 @@
 from PySide6.QtCore import QModelIndex, QPersistentModelIndex, QSize, Qt
 from PySide6.QtGui import QTextDocument
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QComboBox,
     QDialog,
     QGridLayout,
+    QInputDialog,
     QLabel,
+    QMessageBox,
+    QPushButton,
     QStyledItemDelegate,
     QStyleOptionViewItem,
     QTableView,
     QVBoxLayout,
 )
-from sqlalchemy.orm import joinedload
 
-from ..database import RMA, PartNumber, SessionLocal
+from ..api import RMA_STATUSES, update_status_bulk
+from ..csv_io.export_to_csv import export_rmas_to_csv
+from ..database import RMAStatus
 from ..models import AllRMAsSortFilterProxyModel, AllRMAsTableModel
+from .column_widths import fit_column_widths
+from .rma_dataset import RMADataset
+from .row_heights import VisibleRowSizer
 
 
 class ViewRMATable(QDialog):
@@ -22,10 +30,23 @@ class ViewRMATable(QDialog):
         self.setWindowFlags(self.windowFlags() | Qt.WindowType.Window)
         self.setWindowFlag(Qt.WindowType.WindowMaximizeButtonHint, True)
         self.setWindowTitle('RMA Table')
+        # Opened anew per click, so free it on close
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         self.table_view = QTableView(self)
         self.table_view.setWordWrap(True)
         self.table_view.setTextElideMode(Qt.TextElideMode.ElideNone)
         self.table_view.setItemDelegate(WordWrapDelegate(self.table_view))
+        self.row_sizer = VisibleRowSizer(self.table_view)
+        self.table_view.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.table_view.setSelectionMode(
+            QAbstractItemView.SelectionMode.ExtendedSelection
+        )
+
+        self.set_status_button = QPushButton('Set Status of Selected', self)
+        self.set_status_button.clicked.connect(self._handle_set_status_button_pressed)
+        self.set_status_button.setCursor(Qt.CursorShape.PointingHandCursor)
 
         self.filter_customer_label = QLabel('Filter by Customer:')
         self.filter_customer_cbb = QComboBox(self)
@@ -64,6 +85,9 @@ class ViewRMATable(QDialog):
             self.filter_status_label, 1, 2, Qt.AlignmentFlag.AlignRight
         )
         self.filters_layout.addWidget(self.filter_status_cbb, 1, 3)
+        self.filters_layout.addWidget(
+            self.set_status_button, 0, 4, 2, 1, Qt.AlignmentFlag.AlignVCenter
+        )
 
         main_layout = QVBoxLayout(self)
         main_layout.addLayout(self.filters_layout)
@@ -71,24 +95,26 @@ class ViewRMATable(QDialog):
 
         self.setLayout(main_layout)
 
+        self.dataset = RMADataset.instance()
         self.load_data()
+        # Its first poll may patch the model, so this comes after load_data()
+        self.dataset.attach(self.apply_remote_changes)
+        # finished is emitted however the dialog closes, including Esc
+        self.finished.connect(self._detach_dataset)
 
     def load_data(self) -> None:
-        with SessionLocal() as session:
-            all_rmas = (
-                session.query(RMA)
-                .options(
-                    joinedload(RMA.part_number).joinedload(PartNumber.product),
-                    joinedload(RMA.customer),
-                    joinedload(RMA.issued_by),
-                )
-                .all()
+        # Shares the dataset with the open RMAs window, so this runs no query
+        self.model = AllRMAsTableModel(self.dataset, self)
+
+        products = self.model.distinct_values('Product')
+        customers = self.model.distinct_values('Customer')
+        warranties = self.model.distinct_values('Warranty')
+        statuses = [
+            status.label
+            for status in sorted(
+                {self.model.status(row) for row in range(self.model.rowCount())}
             )
-
-        products = sorted({rma.part_number.product.name for rma in all_rmas})
-        customers = sorted({rma.customer.name for rma in all_rmas})
-        warranties = sorted({'Yes' if rma.is_warranty else 'No' for rma in all_rmas})
-        statuses = sorted({rma.status for rma in all_rmas})
+        ]
 
         self.filter_customer_cbb.blockSignals(True)  # prevent premature filtering
         self.filter_customer_cbb.clear()
@@ -114,7 +140,6 @@ class ViewRMATable(QDialog):
         self.filter_status_cbb.addItems(statuses)
         self.filter_status_cbb.blockSignals(False)
 
-        self.model = AllRMAsTableModel(all_rmas)
         self.proxy_model = AllRMAsSortFilterProxyModel()
         self.proxy_model.setSourceModel(self.model)
         self.table_view.setModel(self.proxy_model)
@@ -122,33 +147,73 @@ class ViewRMATable(QDialog):
         self.proxy_model.sort(0, Qt.SortOrder.AscendingOrder)  # sort by ascending RMA#
 
         self.adjust_column_widths()
-        self.table_view.resizeRowsToContents()
+        self.row_sizer.track(self.proxy_model)
         self.adjust_window_size()
 
     def apply_customer_filter(self, customer: str) -> None:
         self.proxy_model.set_customer_filter(customer)
-        self.table_view.resizeRowsToContents()
 
     def apply_product_filter(self, product: str) -> None:
         self.proxy_model.set_product_filter(product)
-        self.table_view.resizeRowsToContents()
 
     def apply_warranty_filter(self, warranty: str) -> None:
         self.proxy_model.set_warranty_filter(warranty)
-        self.table_view.resizeRowsToContents()
 
-    def apply_status_filter(self, status: list[str]) -> None:
+    def apply_status_filter(self, status: str) -> None:
         self.proxy_model.set_status_filter(status)
-        self.table_view.resizeRowsToContents()
+
+    def _handle_set_status_button_pressed(self) -> None:
+        source_rows: list[int] = [
+            self.proxy_model.mapToSource(index).row()
+            for index in self.table_view.selectionModel().selectedRows()
+        ]
+        if not source_rows:
+            QMessageBox.information(
+                self, 'No RMAs Selected', 'Select one or more RMAs in the table first.'
+            )
+            return
+
+        new_status, ok = QInputDialog.getItem(
+            self,
+            'Set Status',
+            f'New status for {len(source_rows)} selected RMA(s):',
+            list(RMA_STATUSES),
+            editable=False,
+        )
+        if not ok:
+            return
+
+        self.set_status(source_rows, new_status)
+
+    def set_status(self, source_rows: list[int], new_status: str) -> None:
+        status = RMAStatus.coerce(new_status)
+        rma_numbers: list[int] = [self.model.rma_numbers[row] for row in source_rows]
+        outcomes = update_status_bulk(rma_numbers, status)
+
+        updated = [num for num in rma_numbers if outcomes.get(num) == 'updated']
+        if updated:
+            self.dataset.refresh(updated)  # patches every window showing them
+            self.proxy_model.invalidateFilter()
+            export_rmas_to_csv()  # write backup to CSV
+
+        failed = [num for num, outcome in outcomes.items() if outcome != 'updated']
+        message = f'{len(updated)} RMA(s) set to "{new_status}".'
+        if failed:
+            message += '\n\nNot changed: ' + ', '.join(
+                f'RMA-{num} ({outcomes[num]})' for num in failed
+            )
+        QMessageBox.information(self, 'Status Updated', message)
+
+    def _detach_dataset(self) -> None:
+        self.dataset.detach(self.apply_remote_changes)
+
+    def apply_remote_changes(self, changed: list[int], removed: list[int]) -> None:
+        """Patches the model with the RMAs the shared dataset just reloaded."""
+        self.model.apply_changes(changed, removed)
 
     def adjust_column_widths(self) -> None:
-        self.table_view.resizeColumnsToContents()
-        extra_padding = 15
-        max_column_width = 163
-        for col in range(self.model.columnCount()):
-            current_width = self.table_view.columnWidth(col)
-            col_width = min(current_width, max_column_width)
-            self.table_view.setColumnWidth(col, col_width + extra_padding)
+        # Estimated from a sample of rows, so opening does not scale with the table
+        fit_column_widths(self.table_view, max_width=163, padding=15)
 
     def adjust_window_size(self) -> None:
         """
@@ -0,0 +1,346 @@
+"""
+Versioned schema migrations for rma.db.
+
+Base.metadata.create_all() only creates missing tables, so new indexes, columns
+and backfills of existing files are written as migrations here. Each one is a
+function registered with @migration(version, name). Pending migrations run in
+version order inside a single BEGIN EXCLUSIVE transaction, so other instances
+of the app wait for them and never see a half-migrated file. Each applied
+version is recorded in the schema_version table. If anything was applied,
+the journal triggers, indexes and temp views are recreated from the current
+models and ANALYZE refreshes the planner statistics.
+
+initialize_database() runs them at startup. Run it as a module like this
+`python -m src.migrations --dry-run` to print the pending DDL without applying it.
+"""
+
+import argparse
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import DDL, Connection, Executable, insert, inspect, select, text
+from sqlalchemy.schema import CreateIndex
+
+from .database import (
+    JOURNAL_TRIGGERS,
+    RMA,
+    TEMP_VIEWS,
+    SchemaVersion,
+    engine,
+    initialize_database,
+)
+
+
+class MigrationContext:
+    """Runs a migration's statements, or prints them in a dry run."""
+
+    def __init__(self, connection: Connection, dry_run: bool = False) -> None:
+        self.connection = connection
+        self.dry_run = dry_run
+
+    def execute(self, statement: Executable) -> None:
+        if self.dry_run:
+            compiled = statement.compile(
+                dialect=engine.dialect, compile_kwargs={'literal_binds': True}
+            )
+            print(f'{str(compiled).strip()};')
+        else:
+            self.connection.execute(statement)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[MigrationContext], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, name: str):
+    def register(upgrade: Callable[[MigrationContext], None]):
+        if any(existing.version == version for existing in MIGRATIONS):
+            raise ValueError(f'Migration {version} is defined twice.')
+        MIGRATIONS.append(Migration(version, name, upgrade))
+        return upgrade
+
+    return register
+
+
+# === Migrations ===
+# Never edit or renumber a migration that has shipped; add a new one instead.
+# Migrations spell out their DDL rather than using the models, which keep
+# changing, and check the shape of each table they touch, because tables made
+# by create_all() on a newer version already have the final shape.
+def _columns(context: MigrationContext, schema: str, table: str) -> dict[str, str]:
+    """Column name -> declared type of an existing table."""
+    rows = context.connection.exec_driver_sql(f'PRAGMA {schema}.table_info({table})')
+    return {row[1]: row[2].upper() for row in rows}
+
+
+def _drop_dependents(context: MigrationContext) -> None:
+    # SQLite re-checks triggers, views and indexes that name a table when it is
+    # renamed or loses a column. _sync_schema_objects() creates them again.
+    for name in JOURNAL_TRIGGERS:
+        context.execute(text(f'DROP TRIGGER IF EXISTS main.{name}'))
+    for name in TEMP_VIEWS:
+        context.execute(text(f'DROP VIEW IF EXISTS temp.{name}'))
+    context.execute(text('DROP INDEX IF EXISTS main.ix_rmas_open'))
+
+
+@migration(1, 'open RMAs partial index')
+def _create_open_rmas_index(context: MigrationContext) -> None:
+    context.execute(
+        text(
+            'CREATE INDEX IF NOT EXISTS ix_rmas_open ON rmas (rma_number, status, '
+            'customer_id, part_number_id, issued_by_id, is_warranty, serial_number, '
+            "reason_for_return) WHERE status != 'Closed'"
+        )
+    )
+
+
+@migration(2, 'backfill RMA number sequences')
+def _backfill_rma_number_sequences(context: MigrationContext) -> None:
+    # Numbers are the 2-digit year followed by 3 digits (api.RMA_NUMBERS_PER_YEAR)
+    context.execute(
+        text(
+            'INSERT INTO rma_number_sequences (year, last_number) '
+            'SELECT rma_number / 1000, max(rma_number) FROM rmas WHERE true '
+            'GROUP BY rma_number / 1000 '
+            'ON CONFLICT (year) DO UPDATE '
+            'SET last_number = max(last_number, excluded.last_number)'
+        )
+    )
+
+
+# rmas as of migration 3, the same in both files except for the foreign keys
+# and column defaults, which only rma.db has
+_RMAS_V3_COLUMNS: tuple[str, ...] = (
+    'rma_number',
+    'issued_by_id',
+    'customer_id',
+    'part_number_id',
+    'serial_number',
+    'is_warranty',
+    'reason_for_return',
+    'status',
+    'issued_on',
+    'last_updated',
+    'customer_po_number',
+    'work_order',
+    'incoming_inspection_notes',
+    'resolution_notes',
+    'shipped_back_on',
+)
+_STATUS_CODES_V3: dict[str, int] = {
+    'Issued': 1,
+    'Received': 2,
+    'In Process': 3,
+    'Complete': 4,
+    'Closed': 5,
+}
+
+
+def _rmas_v3_ddl(schema: str) -> str:
+    main = schema == 'main'
+    default = 'DEFAULT CURRENT_TIMESTAMP ' if main else ''
+    foreign_keys = (
+        'FOREIGN KEY(customer_id) REFERENCES customers (id), '
+        'FOREIGN KEY(issued_by_id) REFERENCES users (id), '
+        'FOREIGN KEY(part_number_id) REFERENCES part_numbers (id), '
+        if main
+        else ''
+    )
+    return (
+        f'CREATE TABLE {schema}.rmas_new ('
+        'rma_number INTEGER NOT NULL, issued_by_id INTEGER NOT NULL, '
+        'customer_id INTEGER NOT NULL, part_number_id INTEGER NOT NULL, '
+        'serial_number VARCHAR(50) NOT NULL, is_warranty BOOLEAN NOT NULL, '
+        'reason_for_return TEXT NOT NULL, status SMALLINT NOT NULL, '
+        f'issued_on DATETIME {default}NOT NULL, '
+        f'last_updated DATETIME {default}NOT NULL, '
+        'customer_po_number VARCHAR(50), work_order VARCHAR(50), '
+        'incoming_inspection_notes TEXT, resolution_notes TEXT, '
+        'shipped_back_on DATETIME, PRIMARY KEY (rma_number), '
+        f'{"UNIQUE (rma_number), " if main else ""}{foreign_keys}'
+        'CONSTRAINT ck_rmas_status CHECK (status IN (1, 2, 3, 4, 5)))'
+    )
+
+
+@migration(3, 'integer status codes')
+def _convert_status_to_codes(context: MigrationContext) -> None:
+    # SQLite cannot add a CHECK constraint to an existing table, so both rmas
+    # tables are rebuilt: copy into a new table, drop the old, rename.
+    known = set(_STATUS_CODES_V3) | set(_STATUS_CODES_V3.values())
+    to_rebuild = [
+        schema
+        for schema in ('main', 'archive')
+        if _columns(context, schema, 'rmas').get('status') != 'SMALLINT'
+    ]
+    for schema in to_rebuild:
+        found = context.connection.scalars(
+            text(f'SELECT DISTINCT status FROM {schema}.rmas')
+        )
+        unknown = sorted(str(value) for value in found if value not in known)
+        if unknown:
+            raise ValueError(
+                f'{schema}.rmas has statuses that are not in RMAStatus: {unknown}. '
+                'Correct them before migrating.'
+            )
+
+    if to_rebuild:
+        _drop_dependents(context)
+    codes = ' '.join(
+        f"WHEN '{label}' THEN {code}" for label, code in _STATUS_CODES_V3.items()
+    )
+    columns = ', '.join(_RMAS_V3_COLUMNS)
+    values = ', '.join(
+        f'CASE status {codes} ELSE status END' if column == 'status' else column
+        for column in _RMAS_V3_COLUMNS
+    )
+    for schema in to_rebuild:
+        context.execute(text(_rmas_v3_ddl(schema)))
+        context.execute(
+            text(
+                f'INSERT INTO {schema}.rmas_new ({columns}) '
+                f'SELECT {values} FROM {schema}.rmas'
+            )
+        )
+        context.execute(text(f'DROP TABLE {schema}.rmas'))
+        context.execute(text(f'ALTER TABLE {schema}.rmas_new RENAME TO rmas'))
+
+
+@migration(4, 'notes side table')
+def _move_notes_to_side_table(context: MigrationContext) -> None:
+    # Same rule as database.summarize_reason(), with the v4 length of 60
+    flattened = "replace(replace(reason_for_return, char(13), ''), char(10), ' ')"
+    summary = (
+        f'CASE WHEN length({flattened}) > 60 '
+        f"THEN substr({flattened}, 1, 57) || '...' ELSE {flattened} END"
+    )
+    to_split = [
+        schema
+        for schema in ('main', 'archive')
+        if 'reason_for_return' in _columns(context, schema, 'rmas')
+    ]
+    if to_split:
+        _drop_dependents(context)
+    for schema in to_split:
+        foreign_key = (
+            ', FOREIGN KEY(rma_number) REFERENCES rmas (rma_number)'
+            if schema == 'main'
+            else ''
+        )
+        context.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS {schema}.rma_notes ('
+                'rma_number INTEGER NOT NULL, reason_for_return TEXT NOT NULL, '
+                'incoming_inspection_notes TEXT, resolution_notes TEXT, '
+                f'PRIMARY KEY (rma_number){foreign_key})'
+            )
+        )
+        context.execute(
+            text(
+                f'INSERT OR REPLACE INTO {schema}.rma_notes (rma_number, '
+                'reason_for_return, incoming_inspection_notes, resolution_notes) '
+                'SELECT rma_number, reason_for_return, incoming_inspection_notes, '
+                f'resolution_notes FROM {schema}.rmas'
+            )
+        )
+        context.execute(
+            text(
+                f'ALTER TABLE {schema}.rmas '
+                "ADD COLUMN reason_summary VARCHAR(60) NOT NULL DEFAULT ''"
+            )
+        )
+        context.execute(text(f'UPDATE {schema}.rmas SET reason_summary = {summary}'))
+        for column in (
+            'reason_for_return',
+            'incoming_inspection_notes',
+            'resolution_notes',
+        ):
+            context.execute(text(f'ALTER TABLE {schema}.rmas DROP COLUMN {column}'))
+
+
+# === Runner ===
+def applied_versions(connection: Connection) -> set[int]:
+    if not inspect(connection).has_table(SchemaVersion.__tablename__):
+        return set()
+    return set(connection.scalars(select(SchemaVersion.version)))
+
+
+def _sync_schema_objects(context: MigrationContext) -> None:
+    """
+    Brings the journal triggers, rmas indexes and temp views up to the current
+    models, after migrations may have dropped or outdated them.
+    """
+    for name, trigger in JOURNAL_TRIGGERS.items():
+        context.execute(text(f'DROP TRIGGER IF EXISTS main.{name}'))
+        context.execute(DDL(trigger))
+    for index in RMA.__table__.indexes:
+        context.execute(CreateIndex(index, if_not_exists=True))
+    for name, view in TEMP_VIEWS.items():
+        context.execute(text(f'DROP VIEW IF EXISTS temp.{name}'))
+        context.execute(text(view))
+
+
+def run_migrations(dry_run: bool = False) -> list[Migration]:
+    """
+    Applies every migration newer than the file's schema_version, in order.
+
+    With dry_run the pending statements are printed and nothing is written.
+    Returns the migrations that were (or would be) applied.
+    """
+    with engine.connect().execution_options(
+        isolation_level='AUTOCOMMIT'  # so the driver leaves BEGIN/COMMIT to us
+    ) as connection:
+        connection.exec_driver_sql('BEGIN' if dry_run else 'BEGIN EXCLUSIVE')
+        try:
+            done = applied_versions(connection)
+            pending = sorted(
+                (m for m in MIGRATIONS if m.version not in done),
+                key=lambda m: m.version,
+            )
+            context = MigrationContext(connection, dry_run)
+            if pending and not dry_run:
+                SchemaVersion.__table__.create(connection, checkfirst=True)
+            for pending_migration in pending:
+                if dry_run:
+                    print(f'-- {pending_migration.version}: {pending_migration.name}')
+                pending_migration.upgrade(context)
+                if not dry_run:
+                    connection.execute(
+                        insert(SchemaVersion).values(
+                            version=pending_migration.version,
+                            name=pending_migration.name,
+                        )
+                    )
+            if pending:
+                _sync_schema_objects(context)
+                context.execute(text('ANALYZE'))
+        except BaseException:
+            connection.exec_driver_sql('ROLLBACK')
+            raise
+        connection.exec_driver_sql('ROLLBACK' if dry_run else 'COMMIT')
+
+    if pending and not dry_run:
+        engine.dispose()  # pooled connections still have the old temp views
+    return pending
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Print the pending DDL without applying it.',
+    )
+    args = parser.parse_args()
+
+    if args.dry_run:
+        if not run_migrations(dry_run=True):
+            print('The schema is up to date.')
+    else:
+        applied = initialize_database()
+        print(f'Applied {len(applied)} migrations: {", ".join(applied) or "none"}')
@@ -1,5 +1,4 @@
-from collections.abc import Callable
-from datetime import datetime
+from collections.abc import Iterable
 from typing import Any
 
 from PySide6.QtCore import (
@@ -10,65 +9,43 @@ from PySide6.QtCore import (
     Qt,
 )
 
-from .api import RMA_ATTR_ACCESSORS
-from .database import RMA
+from .database import RMAStatus
+from .dataset import RMAColumns
 
+# data() role returning a cell's typed sort key (see dataset.cell())
+SORT_KEY_ROLE = Qt.ItemDataRole.UserRole + 1
 
-class AllRMAsTableModel(QAbstractTableModel):
-    def __init__(self, rmas: list[RMA], parent=None) -> None:
-        super().__init__(parent)
-        self.rmas = rmas
-        self.headers: list[str] = [
-            'RMA #',
-            'Customer',
-            'Product',
-            'Part #',
-            'Serial #',
-            'Reason for Return',
-            'Warranty',
-            'Status',
-            'Date Issued',
-            'Cust. PO #',
-            'WO #',
-            'Inspection Notes',
-            'Issued By',
-            'Resolution',
-            'Date Returned',
-            'Last Updated',
-        ]
 
-        self.accessors: list[Callable] = [
-            RMA_ATTR_ACCESSORS[header] for header in self.headers
-        ]
-
-    def rowCount(self, parent=None) -> int:
-        return len(self.rmas)
+class RMAListTableModel(QAbstractTableModel):
+    """
+    Base for table models that show one RMA per row of an RMAColumns dataset.
 
-    def columnCount(self, parent=None) -> int:
-        return len(self.headers)
+    A model is a filtered view of the dataset: it holds the RMA numbers that
+    pass accepts() and reads every cell from the dataset's columns. Subclasses
+    set `headers`. apply_changes() patches individual rows when the dataset
+    reports changes, so live updates never need a full reload.
 
-    def data(
-        self,
-        index: QModelIndex | QPersistentModelIndex,
-        role: int = Qt.ItemDataRole.DisplayRole,
-    ) -> Any:
-        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
-            return None
-
-        rma: RMA = self.rmas[index.row()]
-        col: int = index.column()
+    sort() orders the rows itself by the dataset's precomputed sort keys, and
+    keeps them in that order as RMAs change. The proxy models hand their sort()
+    calls down to it.
+    """
 
-        try:
-            accessor = self.accessors[col]
+    headers: tuple[str, ...]
 
-            value = accessor(rma)
+    def __init__(self, dataset: RMAColumns, parent=None) -> None:
+        super().__init__(parent)
+        self.dataset = dataset
+        self.rma_numbers: list[int] = [
+            num for num in dataset.rma_numbers if self.accepts(num)
+        ]
+        self.sort_column: int = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
 
-            if isinstance(value, datetime):
-                return value.strftime('%Y-%m-%d')
-            return value
+    def rowCount(self, parent=None) -> int:
+        return len(self.rma_numbers)
 
-        except (IndexError, AttributeError):
-            return None
+    def columnCount(self, parent=None) -> int:
+        return len(self.headers)
 
     def headerData(
         self,
@@ -83,14 +60,171 @@ class AllRMAsTableModel(QAbstractTableModel):
         else:
             return str(section + 1)
 
+    def data(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if not index.isValid():
+            return None
+        rma_number = self.rma_numbers[index.row()]
+        header = self.headers[index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.dataset.value(rma_number, header)
+        if role == SORT_KEY_ROLE:
+            return self.dataset.sort_key(rma_number, header)
+        return None
+
+    def sort(
+        self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder
+    ) -> None:
+        """
+        Reorders the rows by the column's sort keys.
+
+        Sorts by the dataset's precomputed keys, instead of calling data() for
+        each comparison. Persistent indexes (e.g. the selection) follow their
+        RMAs.
+        """
+        self.sort_column = column
+        self.sort_order = order
+        if column < 0:
+            return
+
+        keys = self.dataset.sort_keys[self.headers[column]]
+        rows = self.dataset.row_by_number
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_numbers = [self.rma_numbers[index.row()] for index in persistent]
+        self.rma_numbers.sort(
+            key=lambda num: keys[rows[num]],
+            reverse=order == Qt.SortOrder.DescendingOrder,
+        )
+        row_by_number = {num: row for row, num in enumerate(self.rma_numbers)}
+        self.changePersistentIndexList(
+            persistent,
+            [
+                self.index(row_by_number[num], index.column())
+                for num, index in zip(persistent_numbers, persistent)
+            ],
+        )
+        self.layoutChanged.emit()
+
+    def status(self, row: int) -> RMAStatus:
+        return self.dataset.status(self.rma_numbers[row])
+
+    def distinct_values(self, header: str) -> list[Any]:
+        """Returns the sorted distinct values of a column over this model's rows."""
+        values = {self.dataset.value(num, header) for num in self.rma_numbers}
+        return sorted(values - {None})
+
+    def accepts(self, rma_number: int) -> bool:
+        """Returns True if the dataset's RMA belongs in this model."""
+        return True
+
+    def refresh_rows(self, rows: list[int]) -> None:
+        """Notifies views that the RMAs at the given rows were modified in place."""
+        if not rows:
+            return
+        top_left = self.index(min(rows), 0)
+        bottom_right = self.index(max(rows), self.columnCount() - 1)
+        self.dataChanged.emit(top_left, bottom_right)
+
+    def apply_changes(self, changed: list[int], removed: Iterable[int] = ()) -> None:
+        """
+        Applies RMAs the dataset reloaded and deleted RMA numbers to the model.
+
+        Known RMAs are refreshed in place (dataChanged), new ones that pass
+        accepts() are appended (beginInsertRows) and deleted ones, or ones that
+        no longer pass accepts(), are removed (beginRemoveRows).
+        """
+        row_by_number = {num: row for row, num in enumerate(self.rma_numbers)}
+        removed_rows: set[int] = {
+            row_by_number[num] for num in removed if num in row_by_number
+        }
+        updated_rows: list[int] = []
+        inserted: list[int] = []
+
+        for num in changed:
+            row = row_by_number.get(num)
+            if not self.accepts(num):
+                if row is not None:
+                    removed_rows.add(row)
+            elif row is None:
+                inserted.append(num)
+            else:
+                updated_rows.append(row)
+
+        self.refresh_rows(updated_rows)
+
+        for row in sorted(removed_rows, reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.rma_numbers[row]
+            self.endRemoveRows()
+
+        if inserted:
+            first = len(self.rma_numbers)
+            self.beginInsertRows(QModelIndex(), first, first + len(inserted) - 1)
+            self.rma_numbers.extend(inserted)
+            self.endInsertRows()
+
+        if updated_rows or inserted:
+            self.sort(self.sort_column, self.sort_order)  # new values, new order
+
+
+class SourceSortedProxyModel(QSortFilterProxyModel):
+    """
+    Filters like any QSortFilterProxyModel but leaves sorting to the source.
+
+    sort() is handed to RMAListTableModel.sort(), so the proxy itself never
+    sorts (its sortColumn() stays -1) and shows the accepted rows in source
+    order. Its sortRole() is SORT_KEY_ROLE, for anything that compares rows
+    through it.
+    """
 
-class AllRMAsSortFilterProxyModel(QSortFilterProxyModel):
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setSortRole(SORT_KEY_ROLE)
+
+    def sort(
+        self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder
+    ) -> None:
+        self.sourceModel().sort(column, order)
+
+
+class AllRMAsTableModel(RMAListTableModel):
+    headers: tuple[str, ...] = (
+        'RMA #',
+        'Customer',
+        'Product',
+        'Part #',
+        'Serial #',
+        'Reason for Return',
+        'Warranty',
+        'Status',
+        'Date Issued',
+        'Cust. PO #',
+        'WO #',
+        'Inspection Notes',
+        'Issued By',
+        'Resolution',
+        'Date Returned',
+        'Last Updated',
+    )
+
+    def __init__(self, dataset: RMAColumns, parent=None) -> None:
+        # The open RMAs window needs neither, so the dataset loads them on demand
+        dataset.load_closed()
+        dataset.load_notes()
+        super().__init__(dataset, parent)
+
+
+class AllRMAsSortFilterProxyModel(SourceSortedProxyModel):
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         self.customer_filter = ''
         self.product_filter = ''
         self.warranty_filter = ''
-        self.status_filter = ''
+        self.status_filter: RMAStatus | None = None
 
     def set_customer_filter(self, customer_name: str) -> None:
         if customer_name == 'All Customers':
@@ -113,8 +247,8 @@ class AllRMAsSortFilterProxyModel(QSortFilterProxyModel):
             self.warranty_filter = warranty
         self.invalidateFilter()
 
-    def set_status_filter(self, statuses: list[str]) -> None:
-        self.status_filter = statuses  # list may be empty
+    def set_status_filter(self, status: str) -> None:
+        self.status_filter = None if status == 'All' else RMAStatus.coerce(status)
         self.invalidateFilter()
 
     def filterAcceptsRow(
@@ -140,26 +274,24 @@ class AllRMAsSortFilterProxyModel(QSortFilterProxyModel):
             if warranty_index.data() != self.warranty_filter:
                 return False
 
-        # Status filter (column 7)
-        if self.status_filter:
-            status_index = model.index(source_row, 7, source_parent)
-            if status_index.data() != self.status_filter:
-                return False
-
-        return True
+        # Status filter, compared by code rather than by the displayed label
+        return (
+            self.status_filter is None or model.status(source_row) == self.status_filter
+        )
 
 
-class OpenRMAsTableModel(QAbstractTableModel):
+class OpenRMAsTableModel(RMAListTableModel):
     """
     A Qt table model for displaying open RMAs in a QTableView.
 
-    This model is used to interface a list of RMA SQLAlchemy objects with a Qt view.
-    It defines the structure of the table including the number of rows and columns,
-    how each cell's data should be displayed, and the headers for the table.
+    This model is the open subset of the RMA dataset, interfaced with a Qt
+    view. It defines the structure of the table including the number of rows and
+    columns, how each cell's data should be displayed, and the headers for the
+    table.
 
     Attributes:
-        rmas (list[RMA]): A list of RMA objects representing open RMAs.
-        headers (list[str]): A list of strings used as the column headers in the view.
+        rma_numbers (list[int]): The numbers of the open RMAs, one per row.
+        headers (tuple[str, ...]): The column headers shown in the view.
 
     Methods:
         rowCount(): Returns the number of rows (open RMAs) in the model.
@@ -168,62 +300,22 @@ class OpenRMAsTableModel(QAbstractTableModel):
         headerData(): Returns the header label for a given row or column.
     """
 
-    def __init__(self, rmas: list[RMA], parent=None) -> None:
-        super().__init__(parent)
-        self.rmas = rmas
-        self.headers: list[str] = [
-            'RMA #',
-            'Customer',
-            'Product',
-            'Part #',
-            'Serial #',
-            'Reason for Return',
-            'Warranty',
-            'Status',
-        ]
-
-        self.accessors: list[Callable] = [
-            RMA_ATTR_ACCESSORS[header] for header in self.headers
-        ]
-
-    def rowCount(self, parent=None) -> int:
-        return len(self.rmas)
-
-    def columnCount(self, parent=None) -> int:
-        return len(self.headers)
-
-    def data(
-        self,
-        index: QModelIndex | QPersistentModelIndex,
-        role: int = Qt.ItemDataRole.DisplayRole,
-    ) -> Any:
-        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
-            return None
-
-        rma: RMA = self.rmas[index.row()]
-        col: int = index.column()
-
-        try:
-            accessor = self.accessors[col]
-            return accessor(rma)
-        except (IndexError, AttributeError):
-            return None
+    headers: tuple[str, ...] = (
+        'RMA #',
+        'Customer',
+        'Product',
+        'Part #',
+        'Serial #',
+        'Reason for Return',
+        'Warranty',
+        'Status',
+    )
 
-    def headerData(
-        self,
-        section: int,
-        orientation: Qt.Orientation,
-        role: int = Qt.ItemDataRole.DisplayRole,
-    ) -> None | str:
-        if role != Qt.ItemDataRole.DisplayRole:
-            return None
-        if orientation == Qt.Orientation.Horizontal:
-            return self.headers[section]
-        else:
-            return str(section + 1)
+    def accepts(self, rma_number: int) -> bool:
+        return self.dataset.status(rma_number) != RMAStatus.CLOSED
 
 
-class OpenRMAsSortFilterProxyModel(QSortFilterProxyModel):
+class OpenRMAsSortFilterProxyModel(SourceSortedProxyModel):
     """
     A proxy model for sorting and filtering open RMA entries in a QTableView.
 
@@ -254,7 +346,7 @@ class OpenRMAsSortFilterProxyModel(QSortFilterProxyModel):
         self.customer_filter: str = ''
         self.product_filter: str = ''
         self.warranty_filter: str = ''
-        self.status_filter: list[str] = []
+        self.status_filter: set[RMAStatus] = set()
 
     def set_customer_filter(self, customer_name: str) -> None:
         self.customer_filter = '' if customer_name == 'No Filter' else customer_name
@@ -268,8 +360,8 @@ class OpenRMAsSortFilterProxyModel(QSortFilterProxyModel):
         self.warranty_filter = '' if warranty == 'No Filter' else warranty
         self.invalidateFilter()
 
-    def set_status_filter(self, status: list[str]) -> None:
-        self.status_filter = status
+    def set_status_filter(self, statuses: list[str]) -> None:
+        self.status_filter = {RMAStatus.coerce(status) for status in statuses}
         self.invalidateFilter()
 
     def filterAcceptsRow(
@@ -295,10 +387,5 @@ class OpenRMAsSortFilterProxyModel(QSortFilterProxyModel):
             if warranty_index.data() != self.warranty_filter:
                 return False
 
-        # Status filter (column 7)
-        # if self.status_filter:  # If the list is not empty, filter by status
-        status_index = model.index(source_row, 7, source_parent)
-        if status_index.data() not in self.status_filter:
-            return False
-
-        return True
+        # Status filter, compared by code rather than by the displayed label
+        return model.status(source_row) in self.status_filter
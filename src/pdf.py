@@ -1,12 +1,16 @@
 import subprocess
 import tempfile
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Literal
 
 from fpdf import FPDF
 from fpdf.enums import TableCellFillMode
 from fpdf.fonts import FontFace
+from PIL import Image
 from PySide6.QtCore import QAbstractItemModel, Qt
 from PySide6.QtWidgets import QTableView
 
@@ -22,6 +26,114 @@ COL_WIDTHS = (
     17,  # Status
 )
 DATA_ALIGNMENT = ('C', 'C', 'C', 'C', 'C', 'L', 'C', 'C')
+ROWS_PER_CHUNK = 40  # keep even so the alternating row fill stays continuous
+LOGO_PATH: Path = Path(__file__).resolve().parents[1] / 'assets' / 'op_logo.png'
+
+
+class PDFRenderCancelled(Exception):
+    """Raised inside the PDF constructor when the caller cancels rendering."""
+
+
+class RowDataSource:
+    """
+    The rows and table layout a PDF report is drawn from.
+
+    Rows may be any iterable of pre-formatted string tuples, including a generator.
+    The PDF consumes them once, a chunk at a time, so a source never has to be
+    held in memory as a whole.
+
+    Attributes:
+        headers (Sequence[str]): The column headers.
+        rows (Iterable[Sequence[str]]): The data rows, one string per column.
+        col_widths (Sequence[float]): Column widths in mm.
+        alignment (Sequence[str]): fpdf text alignment ('L', 'C', 'R') per column.
+        row_count (int | None): Number of rows if known, used for progress reports.
+    """
+
+    def __init__(
+        self,
+        headers: Sequence[str],
+        rows: Iterable[Sequence[str]],
+        col_widths: Sequence[float] = COL_WIDTHS,
+        alignment: Sequence[str] = DATA_ALIGNMENT,
+        row_count: int | None = None,
+    ) -> None:
+        if len(col_widths) != len(headers) or len(alignment) != len(headers):
+            raise ValueError('Column widths and alignment must match the headers.')
+        self.headers = headers
+        self.rows = rows
+        self.col_widths = col_widths
+        self.alignment = alignment
+        if row_count is None and isinstance(rows, Sequence):
+            row_count = len(rows)
+        self.row_count = row_count
+
+    def __iter__(self) -> Iterator[Sequence[str]]:
+        return iter(self.rows)
+
+
+def format_cell(datum) -> str:
+    if datum is None:
+        return ''
+    if isinstance(datum, datetime):
+        return datum.strftime('%Y-%m-%d')
+    return str(datum)
+
+
+def table_view_data_source(table: QTableView, snapshot: bool = True) -> RowDataSource:
+    """
+    Adapts the visible (filtered and sorted) rows of a table view to a RowDataSource.
+
+    With snapshot=True the cells are copied into plain strings straight away, so
+    the source holds no Qt objects and can be rendered on a worker thread. With
+    snapshot=False the rows are read from the model lazily while the PDF is drawn,
+    which is only safe on the GUI thread.
+    """
+    model: QAbstractItemModel = table.model()
+    if model is None:
+        raise ValueError('Table model is None')
+
+    column_count = model.columnCount()
+    headers: list[str] = [
+        str(
+            model.headerData(
+                col, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole
+            )
+        )
+        for col in range(column_count)
+    ]
+
+    def read_rows() -> Iterator[tuple[str, ...]]:
+        for row in range(model.rowCount()):
+            yield tuple(
+                format_cell(
+                    model.data(model.index(row, col), Qt.ItemDataRole.DisplayRole)
+                )
+                for col in range(column_count)
+            )
+
+    rows: Iterable[tuple[str, ...]] = list(read_rows()) if snapshot else read_rows()
+    return RowDataSource(headers, rows, row_count=model.rowCount())
+
+
+@lru_cache(maxsize=1)
+def load_logo() -> Image.Image | None:
+    """Decodes the logo once per process so every PDF can reuse it."""
+    if not LOGO_PATH.exists():
+        return None
+    with Image.open(LOGO_PATH) as image:
+        image.load()
+        return image.copy()
+
+
+def open_pdf_file(pdf_path: Path) -> None:
+    # Open the PDF file using the default PDF viewer
+    subprocess.run(
+        ['start', '', str(pdf_path)],
+        shell=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
 
 
 class PDF(FPDF):
@@ -29,7 +141,10 @@ class PDF(FPDF):
 
     def __init__(
         self,
-        table: QTableView,
+        source: RowDataSource,
+        progress_callback: Callable[[int, int], None] | None = None,
+        is_cancelled: Callable[[], bool] | None = None,
+        title: str = 'Open RMAs',
         orientation: Literal['landscape'] = 'landscape',
         unit: Literal['mm'] = 'mm',
         format: Literal['Letter'] = 'Letter',
@@ -37,9 +152,10 @@ class PDF(FPDF):
         super().__init__(orientation, unit, format)
         self.set_margin(MARGIN)  # set all margin to the same value
         self.set_auto_page_break(auto=True, margin=10)
-        self.model: QAbstractItemModel = table.model()
-        if self.model is None:
-            raise ValueError('Table model is None')
+        self.source = source
+        self.progress_callback = progress_callback
+        self.is_cancelled = is_cancelled
+        self.set_title(title)  # also used as the PDF document title
         self.add_page()
         self._draw_title_bar()
         self._draw_table_header()
@@ -47,70 +163,74 @@ class PDF(FPDF):
 
     def _draw_title_bar(self) -> None:
         self.set_y(self.t_margin / 2)  # center the cursor within the header height
-        root_dir: Path = Path(__file__).resolve().parents[1]
-        logo_path: str = str(root_dir / 'assets' / 'op_logo.png')
-        if Path(logo_path).exists():
+        logo = load_logo()
+        if logo is not None:
             self.image(
-                logo_path,
+                logo,
                 x=self.r_margin / 2,
                 y=self.t_margin / 2,
                 h=self.t_margin / 2,
                 keep_aspect_ratio=True,
             )
         self.set_font(family='Helvetica', style='B', size=int(self.t_margin * 1.75))
-        self.cell(text='Open RMAs', align='C', center=True)
+        self.cell(text=self.title, align='C', center=True)
 
     def _draw_table_header(self) -> None:
         # Set fort for header rows
         self.set_font(family='Helvetica', style='B', size=14)
         self.set_x(self.l_margin)
         self.set_y(self.t_margin + 10)
-        headers = (
-            [
-                str(
-                    self.model.headerData(
-                        col, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole
-                    )
-                )
-                for col in range(self.model.columnCount())
-            ],
-        )
         headings_style = FontFace(emphasis='BOLD', color=255, fill_color=(0, 112, 60))
         with self.table(
-            col_widths=COL_WIDTHS, text_align='C', headings_style=headings_style
+            col_widths=self.source.col_widths,
+            text_align='C',
+            headings_style=headings_style,
         ) as table:
-            for data_row in headers:
-                row = table.row()
-                for datum in data_row:
-                    row.cell(datum)
+            row = table.row()
+            for datum in self.source.headers:
+                row.cell(datum)
 
     def _draw_data_table(self) -> None:
+        """
+        Draws the data rows as a series of stacked tables of ROWS_PER_CHUNK rows.
+
+        fpdf only lays a table out when its context manager exits, so rendering in
+        chunks is what lets progress be reported and cancellation be honoured
+        while a long report is being built. Rows are pulled from the source one
+        chunk at a time and never collected into a single list.
+        """
         font_size = 10
         self.set_font(family='Helvetica', size=font_size)
-        x_start = self.l_margin
-        y_start = self.get_y()
-        self.set_xy(x_start, y_start)
-        with self.table(
-            borders_layout='ALL',
-            col_widths=COL_WIDTHS,
-            text_align=DATA_ALIGNMENT,
-            first_row_as_headings=False,
-            cell_fill_color=(194, 194, 194),
-            cell_fill_mode=TableCellFillMode.ROWS,
-            line_height=6,
-        ) as table:
-            for row in range(self.model.rowCount()):
-                pdf_row = table.row()
-                for col in range(self.model.columnCount()):
-                    index = self.model.index(row, col)
-                    datum = self.model.data(index, Qt.ItemDataRole.DisplayRole)
-                    if datum is None:
-                        datum = ''
-                    if isinstance(datum, int):
-                        datum = str(datum)
-                    if isinstance(datum, datetime):
-                        datum = datum.strftime('%Y-%m-%d')
-                    pdf_row.cell(datum)
+        self.set_xy(self.l_margin, self.get_y())
+        total = self.source.row_count or 0
+        done = 0
+        self._report_progress(done, total)
+
+        rows = iter(self.source)
+        while chunk := list(islice(rows, ROWS_PER_CHUNK)):
+            if self.is_cancelled is not None and self.is_cancelled():
+                raise PDFRenderCancelled()
+
+            with self.table(
+                borders_layout='ALL',
+                col_widths=self.source.col_widths,
+                text_align=self.source.alignment,
+                first_row_as_headings=False,
+                cell_fill_color=(194, 194, 194),
+                cell_fill_mode=TableCellFillMode.ROWS,
+                line_height=6,
+            ) as table:
+                for data_row in chunk:
+                    pdf_row = table.row()
+                    for datum in data_row:
+                        pdf_row.cell(datum)
+
+            done += len(chunk)
+            self._report_progress(done, max(total, done))
+
+    def _report_progress(self, done: int, total: int) -> None:
+        if self.progress_callback is not None:
+            self.progress_callback(done, total)
 
     def footer(self) -> None:
         self.set_y(-MARGIN / 2)  # center the cursor within the footer height
@@ -118,20 +238,16 @@ class PDF(FPDF):
         self.set_font(family='Helvetica', style='I', size=8)
         self.cell(text=f'{self.page_no()}', align='C')
 
-    def open(self) -> None:
-        temp_dir = tempfile.gettempdir()
-        pdf_path = Path(temp_dir) / f'open_rmas{self.__class__.instance_number}.pdf'
-
+    def save(self, pdf_path: Path | None = None) -> Path:
+        if pdf_path is None:
+            temp_dir = tempfile.gettempdir()
+            pdf_path = Path(temp_dir) / f'open_rmas{self.__class__.instance_number}.pdf'
+            self.increment_instance_number()
         self.output(str(pdf_path))
+        return pdf_path
 
-        # Open the PDF file using the default PDF viewer
-        subprocess.run(
-            ['start', '', str(pdf_path)],
-            shell=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        self.increment_instance_number()
+    def open(self) -> None:
+        open_pdf_file(self.save())
 
     @classmethod
     def increment_instance_number(cls) -> None:
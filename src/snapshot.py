@@ -0,0 +1,201 @@
+"""
+Compressed, checksummed snapshots of rma.db and rma_archive.db.
+
+Snapshots are taken with SQLite's online backup API, so they are consistent
+page-level copies, and restoring one is a decompress and a backup in the other
+direction rather than a CSV import.
+
+Run it as a module like this `python -m src.snapshot create`,
+`python -m src.snapshot list` or `python -m src.snapshot restore 20250101-120000`.
+The same operations are available through `python -m src.cli`.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import shutil
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from .database import ARCHIVE_PATH, DB_PATH
+
+SNAPSHOT_DIR: Path = DB_PATH.parent / 'snapshots'
+SNAPSHOT_KEEP = 14
+MANIFEST_NAME = 'manifest.json'
+BACKUP_PAGES_PER_STEP = 256  # writers can get the lock in between steps
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing or fails its checksum."""
+
+
+def sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open('rb') as file:
+        while chunk := file.read(READ_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backup_database(db_path: Path, copy_path: Path) -> None:
+    """Copies a database over another with the backup API, a few pages at a time."""
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(copy_path)
+    try:
+        with target:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, sleep=0.01)
+    finally:
+        target.close()
+        source.close()
+
+
+def snapshot_sources() -> list[Path]:
+    return [path for path in (DB_PATH, ARCHIVE_PATH) if path.exists()]
+
+
+def create_snapshot(
+    snapshot_dir: Path = SNAPSHOT_DIR, keep: int = SNAPSHOT_KEEP
+) -> Path:
+    """
+    Writes a gzipped copy of each database file and a manifest of their
+    checksums into a new timestamped folder, then rotates old snapshots.
+
+    Returns the new snapshot folder.
+    """
+    folder = snapshot_dir / datetime.now().strftime('%Y%m%d-%H%M%S')
+    folder.mkdir(parents=True, exist_ok=False)
+
+    files = {}
+    for db_path in snapshot_sources():
+        copy_path = folder / db_path.name
+        backup_database(db_path, copy_path)
+        gz_path = folder / f'{db_path.name}.gz'
+        with copy_path.open('rb') as raw, gzip.open(gz_path, 'wb') as compressed:
+            shutil.copyfileobj(raw, compressed, READ_CHUNK_SIZE)
+        files[db_path.name] = {
+            'file': gz_path.name,
+            'size': copy_path.stat().st_size,
+            'sha256': sha256_of(copy_path),
+            'gz_sha256': sha256_of(gz_path),
+        }
+        copy_path.unlink()
+
+    manifest = {'created': datetime.now().isoformat(timespec='seconds'), 'files': files}
+    (folder / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+    rotate_snapshots(snapshot_dir, keep)
+    return folder
+
+
+def list_snapshots(snapshot_dir: Path = SNAPSHOT_DIR) -> list[Path]:
+    """Returns the complete snapshot folders, oldest first."""
+    if not snapshot_dir.exists():
+        return []
+    return sorted(
+        folder for folder in snapshot_dir.iterdir() if (folder / MANIFEST_NAME).exists()
+    )
+
+
+def rotate_snapshots(
+    snapshot_dir: Path = SNAPSHOT_DIR, keep: int = SNAPSHOT_KEEP
+) -> None:
+    for folder in list_snapshots(snapshot_dir)[:-keep] if keep > 0 else []:
+        shutil.rmtree(folder)
+
+
+def read_manifest(folder: Path) -> dict:
+    manifest_path = folder / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise SnapshotError(f'{folder} is not a snapshot.')
+    return json.loads(manifest_path.read_text())
+
+
+def verify_snapshot(folder: Path) -> dict:
+    """Checks every compressed file against the manifest and returns the manifest."""
+    manifest = read_manifest(folder)
+    for name, entry in manifest['files'].items():
+        gz_path = folder / entry['file']
+        if not gz_path.exists() or sha256_of(gz_path) != entry['gz_sha256']:
+            raise SnapshotError(f'{name} in {folder.name} is missing or corrupt.')
+    return manifest
+
+
+def restore_snapshot(folder: Path, db_dir: Path = DB_PATH.parent) -> list[Path]:
+    """
+    Writes the database files in a snapshot back over the ones in `db_dir`.
+
+    Each file is decompressed next to its target and checksummed, then copied
+    into the live database with the online backup API, so SQLite takes the
+    write lock, deals with its own journal and other clients see either the
+    old or the restored file. The current files are backed up first and put
+    back if any copy fails, so rma.db and rma_archive.db always match.
+    Returns the restored paths.
+    """
+    manifest = verify_snapshot(folder)
+
+    staged: list[tuple[Path, Path]] = []
+    saved: list[tuple[Path, Path]] = []
+    try:
+        for name, entry in manifest['files'].items():
+            target = db_dir / name
+            staging = target.with_name(f'{name}.restore')
+            with (
+                gzip.open(folder / entry['file'], 'rb') as compressed,
+                staging.open('wb') as raw,
+            ):
+                shutil.copyfileobj(compressed, raw, READ_CHUNK_SIZE)
+            staged.append((staging, target))
+            if sha256_of(staging) != entry['sha256']:
+                raise SnapshotError(f'{name} in {folder.name} failed its checksum.')
+
+        for _, target in staged:
+            if target.exists():
+                saved_path = target.with_name(f'{target.name}.before-restore')
+                backup_database(target, saved_path)
+                saved.append((saved_path, target))
+
+        restored: list[Path] = []
+        try:
+            for staging, target in staged:
+                backup_database(staging, target)
+                restored.append(target)
+        except BaseException:
+            for saved_path, target in saved:
+                if target in restored:
+                    backup_database(saved_path, target)
+            raise
+    finally:
+        for path, _ in staged + saved:
+            path.unlink(missing_ok=True)
+
+    return restored
+
+
+def resolve_snapshot(name: str, snapshot_dir: Path = SNAPSHOT_DIR) -> Path:
+    folder = Path(name) if Path(name).is_absolute() else snapshot_dir / name
+    if not (folder / MANIFEST_NAME).exists():
+        raise SnapshotError(f'Snapshot "{name}" not found in {snapshot_dir}.')
+    return folder
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    create = subparsers.add_parser('create')
+    create.add_argument('--keep', type=int, default=SNAPSHOT_KEEP)
+    subparsers.add_parser('list')
+    restore = subparsers.add_parser('restore')
+    restore.add_argument('name')
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        print(f'Wrote snapshot {create_snapshot(keep=args.keep)}')
+    elif args.command == 'list':
+        for folder in list_snapshots():
+            print(folder.name)
+    else:
+        for path in restore_snapshot(resolve_snapshot(args.name)):
+            print(f'Restored {path}')
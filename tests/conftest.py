@@ -0,0 +1,62 @@
+import os
+import tempfile
+from collections.abc import Callable, Iterator
+
+import pytest
+from sqlalchemy import Engine
+
+# The engine resolves the relative DB_PATH when src.database is imported, so
+# move to a scratch folder first to keep the tests off X/rma_database/rma.db
+os.chdir(tempfile.mkdtemp(prefix='rma_tests_'))
+
+from src.database import (
+    ARCHIVE_PATH,
+    DB_PATH,
+    RMA,
+    Customer,
+    PartNumber,
+    Product,
+    RMAStatus,
+    SessionLocal,
+    User,
+    engine,
+    initialize_database,
+)
+
+
+@pytest.fixture
+def database() -> Iterator[Engine]:
+    """A fresh, fully migrated rma.db and rma_archive.db in the scratch folder."""
+    engine.dispose()
+    for path in (DB_PATH, ARCHIVE_PATH):
+        path.unlink(missing_ok=True)
+    initialize_database()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def add_rma(database) -> Callable[..., int]:
+    """Adds an RMA for one test user/customer/part number and returns its number."""
+    with SessionLocal() as session:
+        product = Product(name='Scope')
+        part_number = PartNumber(number='PN-1', product=product)
+        user, customer = User(name='Tester'), Customer(name='Acme')
+        session.add_all([part_number, user, customer])
+        session.commit()
+        ids = {
+            'issued_by_id': user.id,
+            'customer_id': customer.id,
+            'part_number_id': part_number.id,
+        }
+
+    def add(rma_number: int, status: RMAStatus = RMAStatus.ISSUED, **values) -> int:
+        values.setdefault('serial_number', f'SN{rma_number}')
+        values.setdefault('reason_for_return', 'does not power on')
+        values.setdefault('is_warranty', False)
+        with SessionLocal() as session:
+            session.add(RMA(rma_number=rma_number, status=status, **(ids | values)))
+            session.commit()
+        return rma_number
+
+    return add
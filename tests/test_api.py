@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from src import api
+from src.api import (
+    allocate_rma_number,
+    get_counts_by_customer,
+    get_counts_by_product,
+    get_monthly_counts,
+    get_open_backlog_by_status,
+    get_status_counts,
+    get_turnaround_stats,
+    get_warranty_ratio,
+    rma_number_block,
+)
+from src.archive import archive_closed_rmas
+from src.database import (
+    Customer,
+    PartNumber,
+    Product,
+    RMANumberSequence,
+    RMAStatus,
+    SessionLocal,
+    User,
+    engine,
+)
+
+
+@pytest.fixture
+def sample_rmas(add_rma):
+    """Six RMAs for two customers and products, one of them archived."""
+    with SessionLocal() as session:
+        customer = Customer(name='Bolt')
+        part_number = PartNumber(number='PN-2', product=Product(name='Probe'))
+        session.add_all([customer, part_number])
+        session.commit()
+        other = {'customer_id': customer.id, 'part_number_id': part_number.id}
+
+    def issued(month: int, day: int = 1) -> datetime:
+        return datetime(2024, month, day)
+
+    closed, complete = RMAStatus.CLOSED, RMAStatus.COMPLETE
+    add_rma(24001, closed, issued_on=issued(1), shipped_back_on=issued(1, 11))
+    add_rma(24002, closed, issued_on=issued(1), shipped_back_on=issued(1, 3))
+    add_rma(24003, complete, issued_on=issued(2), shipped_back_on=issued(2, 5))
+    add_rma(24004, issued_on=issued(2), is_warranty=True, **other)
+    add_rma(24005, RMAStatus.RECEIVED, issued_on=issued(3), **other)
+    add_rma(19001, closed, issued_on=datetime(2019, 5, 1), is_warranty=True,
+            shipped_back_on=datetime(2019, 5, 21), last_updated=datetime(2019, 6, 1))  # fmt: skip
+    assert archive_closed_rmas(3) == [19001]
+
+
+def test_counts_include_the_archive(sample_rmas):
+    assert get_status_counts() == {
+        'Issued': 1,
+        'Received': 1,
+        'Complete': 1,
+        'Closed': 3,
+    }
+    assert get_open_backlog_by_status() == {'Issued': 1, 'Received': 1, 'Complete': 1}
+    assert get_counts_by_customer() == [('Acme', 4), ('Bolt', 2)]
+    assert get_counts_by_product() == [('Scope', 4), ('Probe', 2)]
+    assert get_monthly_counts() == [
+        ('2019-05', 1),
+        ('2024-01', 2),
+        ('2024-02', 2),
+        ('2024-03', 1),
+    ]
+    assert get_warranty_ratio() == pytest.approx(2 / 6)
+
+
+def test_turnaround_stats_use_the_shipped_rmas(sample_rmas, add_rma):
+    # Shipped back before it was issued: an entry error, not -9 days
+    add_rma(24006, RMAStatus.CLOSED, issued_on=datetime(2024, 3, 10),
+            shipped_back_on=datetime(2024, 3, 1))  # fmt: skip
+
+    stats = get_turnaround_stats(percentiles=(50, 100))
+
+    assert stats == pytest.approx({'count': 4, 'mean': 9.0, 'p50': 4.0, 'p100': 20.0})
+
+
+def test_empty_database_has_no_stats(database):
+    assert get_status_counts() == {}
+    assert get_counts_by_customer() == []
+    assert get_warranty_ratio() is None
+    assert get_turnaround_stats() == {'count': 0}
+
+
+def allocate(commit: bool = True) -> int:
+    with SessionLocal() as session:
+        rma_number = allocate_rma_number(session)
+        if commit:
+            session.commit()
+    return rma_number
+
+
+def last_numbers() -> list[tuple[int, int]]:
+    with SessionLocal() as session:
+        return list(
+            session.execute(
+                select(RMANumberSequence.year, RMANumberSequence.last_number)
+            ).all()
+        )
+
+
+def test_numbers_are_allocated_in_order(database):
+    first, _ = rma_number_block()
+
+    assert [allocate(), allocate()] == [first, first + 1]
+    assert allocate(commit=False) == first + 2  # rolled back, so handed out again
+    assert allocate() == first + 2
+    assert last_numbers() == [(first // 1000, first + 2)]
+
+
+def test_numbers_taken_by_hand_are_skipped(add_rma):
+    first, last = rma_number_block()
+    add_rma(first)  # before the year's sequence row exists
+    assert allocate() == first + 1
+
+    add_rma(first + 2)
+    add_rma(first + 3)
+    assert allocate() == first + 4
+
+    with SessionLocal() as session:
+        session.execute(update(RMANumberSequence).values(last_number=last))
+        session.commit()
+    with pytest.raises(ValueError, match='are taken'):
+        allocate()
+
+
+def add_rmas(ids: dict[str, int], count: int) -> list[int | None]:
+    # Module-level so it can be pickled and run in a worker process
+    return [
+        api.add_rma(
+            None,
+            serial_number=f'SN{n}',
+            reason_for_return='race',
+            is_warranty=False,
+            **ids,
+        )
+        for n in range(count)
+    ]
+
+
+def test_concurrent_writers_get_distinct_numbers(add_rma):
+    with SessionLocal() as session:
+        ids = {
+            'customer_id': session.scalar(select(Customer.id)),
+            'part_number_id': session.scalar(select(PartNumber.id)),
+            'issued_by_id': session.scalar(select(User.id)),
+        }
+    engine.dispose()  # the workers open their own connections
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = executor.map(add_rmas, [ids] * 4, [10] * 4)
+        numbers = [num for result in results for num in result]
+
+    first, _ = rma_number_block()
+    assert sorted(numbers) == list(range(first, first + 40))
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from src.api import find_rmas_by_sn
+from src.archive import archive_closed_rmas, restore_rmas
+from src.database import RMANotes, RMAStatus, SessionLocal
+
+
+def rma_numbers(database, schema: str, table: str = 'rmas') -> list[int]:
+    with database.connect() as connection:
+        return list(
+            connection.scalars(
+                text(f'SELECT rma_number FROM {schema}.{table} ORDER BY 1')
+            )
+        )
+
+
+def add_sample_rmas(database, add_rma) -> None:
+    closed = RMAStatus.CLOSED
+    add_rma(19001, closed, shipped_back_on=datetime(2019, 6, 1))
+    add_rma(19002, closed)  # closed without a ship-back date, see below
+    add_rma(19003, RMAStatus.RECEIVED, reason_for_return='still open')
+    add_rma(25001, closed, shipped_back_on=datetime.now())
+    with database.begin() as connection:
+        connection.execute(
+            text(
+                "UPDATE rmas SET last_updated = '2019-07-01 00:00:00', "
+                "issued_on = '2019-05-01 00:00:00' WHERE rma_number < 20000"
+            )
+        )
+
+
+def test_archive_moves_long_closed_rmas_with_their_notes(database, add_rma):
+    add_sample_rmas(database, add_rma)
+
+    assert archive_closed_rmas(3, dry_run=True) == [19001, 19002]
+    assert rma_numbers(database, 'archive') == []
+
+    assert archive_closed_rmas(3) == [19001, 19002]
+    assert rma_numbers(database, 'main') == [19003, 25001]
+    assert rma_numbers(database, 'archive') == [19001, 19002]
+    assert rma_numbers(database, 'main', 'rma_notes') == [19003, 25001]
+    assert rma_numbers(database, 'archive', 'rma_notes') == [19001, 19002]
+    assert archive_closed_rmas(3) == []
+
+
+def test_archived_rmas_are_found_read_only_and_can_be_restored(database, add_rma):
+    add_sample_rmas(database, add_rma)
+    archive_closed_rmas(3)
+
+    [archived] = find_rmas_by_sn('SN19001')
+    assert archived.customer.name == 'Acme'
+    assert archived.reason_for_return == 'does not power on'
+    assert find_rmas_by_sn('SN19001', include_archive=False) == []
+    assert [rma.rma_number for rma in find_rmas_by_sn('SN1900')] == [
+        19003,
+        19002,
+        19001,
+    ]
+
+    assert restore_rmas([19001, 99999]) == [19001]
+    assert rma_numbers(database, 'archive') == [19002]
+    with SessionLocal() as session:
+        assert session.get(RMANotes, 19001).reason_for_return == 'does not power on'
+    assert restore_rmas([19001]) == []
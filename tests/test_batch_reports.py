@@ -0,0 +1,35 @@
+from src.batch_reports import generate_batch_reports, report_file_names
+from src.database import Customer, SessionLocal
+
+
+def test_distinct_keys_keep_plain_file_names():
+    names = report_file_names('customer', ['Acme', 'Globex Corp.'])
+
+    assert names == {
+        'Acme': 'open_rmas_customer_Acme.pdf',
+        'Globex Corp.': 'open_rmas_customer_Globex_Corp..pdf',
+    }
+
+
+def test_keys_that_sanitize_to_one_name_get_distinct_file_names():
+    keys = ['A/B', 'A B', 'a-b', 'A-B', '', '???']
+    names = report_file_names('product', keys)
+
+    assert len({name.casefold() for name in names.values()}) == len(keys)
+    assert all(name.startswith('open_rmas_product_') for name in names.values())
+    # Stable across runs and independent of the other keys' order
+    assert report_file_names('product', reversed(keys)) == names
+
+
+def test_colliding_customers_each_get_a_report(add_rma, tmp_path):
+    add_rma(25001)
+    with SessionLocal() as session:
+        session.add(Customer(name='ACME'))
+        session.commit()
+        other_id = session.query(Customer.id).filter_by(name='ACME').scalar()
+    add_rma(25002, customer_id=other_id)
+
+    paths = generate_batch_reports(tmp_path / 'reports', 'customer', max_workers=1)
+
+    assert len(paths) == 2
+    assert all(path.exists() for path in paths)
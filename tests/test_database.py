@@ -0,0 +1,90 @@
+from sqlalchemy import event, func, select, text
+
+from src.api import (
+    changes_since,
+    latest_change_seq,
+    overwrite_rma_records_bulk,
+    update_status,
+)
+from src.database import RMA, RMA_IS_OPEN, RMAStatus
+
+
+def query_plan(connection, stmt) -> str:
+    """Runs `stmt` the way the app does, bound parameters included, as EXPLAIN."""
+    statements: list[str] = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+        return f'EXPLAIN QUERY PLAN {statement}', parameters
+
+    event.listen(connection, 'before_cursor_execute', explain, retval=True)
+    try:
+        result = connection.execute(stmt)
+        details = [row[-1] for row in result.cursor.fetchall()]
+    finally:
+        event.remove(connection, 'before_cursor_execute', explain)
+    assert '?' in statements[0]  # the status is bound, not inlined
+    return '\n'.join(details)
+
+
+def test_open_rma_queries_use_the_partial_index(database, add_rma):
+    for rma_number in range(25001, 25041):
+        add_rma(rma_number, RMAStatus.CLOSED if rma_number % 4 else RMAStatus.ISSUED)
+
+    with database.connect() as connection:
+        connection.execute(text('ANALYZE'))
+        listing = query_plan(
+            connection,
+            select(RMA.rma_number, RMA.status, RMA.reason_summary)
+            .where(RMA_IS_OPEN)
+            .order_by(RMA.rma_number),
+        )
+        backlog = query_plan(
+            connection, select(func.count()).select_from(RMA).where(RMA_IS_OPEN)
+        )
+
+    assert 'USING COVERING INDEX ix_rmas_open' in listing
+    assert 'ix_rmas_open' in backlog
+
+
+def journal(since: int = 0) -> list[tuple[int, str, list[str]]]:
+    return [
+        (change.rma_number, change.operation, change.changed_columns)
+        for change in changes_since(since)
+    ]
+
+
+def test_journal_records_inserts_updates_and_deletes(database, add_rma):
+    add_rma(25001)
+    [insert] = changes_since(0)
+    assert (insert.rma_number, insert.operation) == (25001, 'insert')
+    assert insert.new_values['serial_number'] == 'SN25001'
+    assert 'last_updated' not in insert.changed_columns
+
+    update_status(25001, RMAStatus.RECEIVED)
+    [update] = changes_since(insert.seq)
+    assert (update.operation, update.changed_columns) == ('update', ['status'])
+    assert update.old_values == {'status': int(RMAStatus.ISSUED)}
+    assert update.new_values == {'status': int(RMAStatus.RECEIVED)}
+
+    with database.begin() as connection:
+        connection.execute(text('DELETE FROM rma_notes WHERE rma_number = 25001'))
+        connection.execute(text('DELETE FROM rmas WHERE rma_number = 25001'))
+    [delete] = changes_since(update.seq)
+    assert delete.operation == 'delete'
+    assert delete.old_values['status'] == int(RMAStatus.RECEIVED)
+    assert latest_change_seq() == delete.seq > update.seq > insert.seq
+
+
+def test_journal_records_notes_edits_once_and_skips_no_ops(database, add_rma):
+    add_rma(25001)
+    seq = latest_change_seq()
+
+    overwrite_rma_records_bulk({25001: {'resolution_notes': 'replaced board'}})
+    assert journal(seq) == [(25001, 'update', ['resolution_notes'])]
+
+    seq = latest_change_seq()
+    with database.begin() as connection:
+        connection.execute(text('UPDATE rmas SET status = status'))
+        connection.execute(text("UPDATE rmas SET last_updated = '2030-01-01'"))
+    assert journal(seq) == []
@@ -0,0 +1,139 @@
+import csv
+
+from sqlalchemy import func, select
+
+from src.csv_io.import_from_sqlite_csv import DATE_COLUMNS, validate_row
+from src.csv_io.import_pipeline import EXISTING_RMA_REASON, rejects_path, run_import
+from src.database import RMA, RMANotes, SessionLocal
+
+FIELDNAMES = (
+    'rma_number',
+    'issued_by',
+    'customer',
+    'product',
+    'part_number',
+    'serial_number',
+    'reason_for_return',
+    'status',
+    'is_warranty',
+    'issued_on',
+    'last_updated',
+    'shipped_back_on',
+    'customer_po_number',
+    'work_order',
+    'incoming_inspection_notes',
+    'resolution_notes',
+)
+
+
+def csv_row(rma_number: str, **values: str) -> dict[str, str]:
+    row = dict.fromkeys(FIELDNAMES, '')
+    row.update(
+        rma_number=rma_number,
+        issued_by='Importer',
+        customer='Initech',
+        product='Scope',
+        part_number='PN-2',
+        serial_number=f'SN{rma_number}',
+        reason_for_return='cracked screen',
+        status='Issued',
+        is_warranty='yes',
+        issued_on='2025-03-04',
+    )
+    row.update(values)
+    return row
+
+
+def write_csv(path, rows) -> None:
+    with path.open('w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def import_csv(path, **kwargs):
+    return run_import(
+        path,
+        validate_row,
+        max_workers=1,
+        chunk_size=2,
+        encoding='utf-8',
+        date_columns=DATE_COLUMNS,
+        **kwargs,
+    )
+
+
+def rma_count() -> int:
+    with SessionLocal() as session:
+        return session.scalar(select(func.count()).select_from(RMA))
+
+
+def sample_csv(tmp_path, add_rma):
+    add_rma(25001, serial_number='ORIGINAL')
+    csv_path = tmp_path / 'rmas.csv'
+    write_csv(
+        csv_path,
+        [
+            csv_row('25101', incoming_inspection_notes='scratches'),  # line 2
+            csv_row('25001', serial_number='CHANGED'),  # 3: already exists
+            csv_row('25102'),  # 4
+            csv_row('25101'),  # 5: repeated in the file
+            csv_row('25103', status='Lost'),  # 6
+            csv_row('RMA-9'),  # 7
+            csv_row('25104', issued_on='not a date'),  # 8
+        ],
+    )
+    return csv_path
+
+
+def test_import_rejects_bad_rows_and_conflicts(tmp_path, add_rma):
+    csv_path = sample_csv(tmp_path, add_rma)
+
+    summary = import_csv(csv_path)
+
+    assert (summary.inserted, summary.rejected, summary.conflicts) == (2, 5, 1)
+    assert summary.created == {'customers': 1, 'part_numbers': 1, 'users': 1}
+    with rejects_path(csv_path).open(newline='', encoding='utf-8') as file:
+        reasons = {int(row['line']): row['reason'] for row in csv.DictReader(file)}
+    assert set(reasons) == {3, 5, 6, 7, 8}
+    assert reasons[3] == EXISTING_RMA_REASON
+    assert reasons[5] == 'duplicate RMA number in file'
+    assert 'RMA-9' in reasons[7]
+    assert 'issued_on' in reasons[8]
+
+    with SessionLocal() as session:
+        assert session.get(RMA, 25001).serial_number == 'ORIGINAL'  # never updated
+        notes = session.get(RMANotes, 25101)
+        assert notes.reason_for_return == 'cracked screen'
+        assert notes.incoming_inspection_notes == 'scratches'
+        assert session.get(RMA, 25101).reason_summary == 'cracked screen'
+    assert not csv_path.with_name('rmas.checkpoint.json').exists()
+
+
+def test_dry_run_counts_the_same_rows_without_writing(tmp_path, add_rma):
+    csv_path = sample_csv(tmp_path, add_rma)
+
+    summary = import_csv(csv_path, dry_run=True)
+
+    assert (summary.inserted, summary.rejected, summary.conflicts) == (2, 5, 1)
+    assert summary.created == {'customers': 1, 'part_numbers': 1, 'users': 1}
+    assert 'would be imported' in str(summary)
+    assert rma_count() == 1
+    assert not rejects_path(csv_path).exists()
+
+
+def test_rows_of_archived_rmas_are_conflicts(tmp_path, add_rma, database):
+    add_rma(25001)
+    with database.begin() as connection:
+        connection.exec_driver_sql(
+            'INSERT INTO archive.rmas SELECT * FROM main.rmas WHERE rma_number = 25001'
+        )
+        connection.exec_driver_sql('DELETE FROM main.rma_notes')
+        connection.exec_driver_sql('DELETE FROM main.rmas')
+    csv_path = tmp_path / 'rmas.csv'
+    write_csv(csv_path, [csv_row('25001')])
+
+    summary = import_csv(csv_path)
+
+    assert (summary.inserted, summary.conflicts) == (0, 1)
+    assert rma_count() == 0
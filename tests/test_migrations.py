@@ -0,0 +1,134 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from src.database import ARCHIVE_PATH, DB_PATH, engine, initialize_database
+from src.migrations import MIGRATIONS, run_migrations
+
+# The rmas table as the app created it before any migration: text statuses and
+# the notes on the row
+LEGACY_RMAS = """
+CREATE TABLE rmas (
+    rma_number INTEGER NOT NULL, issued_by_id INTEGER NOT NULL,
+    customer_id INTEGER NOT NULL, part_number_id INTEGER NOT NULL,
+    serial_number VARCHAR(50) NOT NULL, is_warranty BOOLEAN NOT NULL,
+    reason_for_return TEXT NOT NULL, status VARCHAR NOT NULL,
+    issued_on DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    last_updated DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    customer_po_number VARCHAR(50), work_order VARCHAR(50),
+    incoming_inspection_notes TEXT, resolution_notes TEXT,
+    shipped_back_on DATETIME, PRIMARY KEY (rma_number)
+)
+"""
+LEGACY_TABLES = (
+    'CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(50) UNIQUE)',
+    'CREATE TABLE customers (id INTEGER PRIMARY KEY, name VARCHAR(50))',
+    'CREATE TABLE products (id INTEGER PRIMARY KEY, name VARCHAR(50))',
+    (
+        'CREATE TABLE part_numbers '
+        '(id INTEGER PRIMARY KEY, number VARCHAR(50), product_id INTEGER)'
+    ),
+    LEGACY_RMAS,
+)
+SHORT_REASON = 'fails after warm-up…'
+LONG_REASON = 'Unit arrived with a cracked display\r\nand the encoder knob ' + 40 * 'x'
+
+
+def legacy_row(rma_number: int, status: str, reason: str = 'no power') -> tuple:
+    return (rma_number, 1, 1, 1, f'SN{rma_number}', 0, reason, status,
+            '2024-01-02 00:00:00', '2024-01-03 00:00:00', None, None,
+            'dented case', None, None)  # fmt: skip
+
+
+@pytest.fixture
+def legacy_files():
+    """An rma.db and rma_archive.db from before the first migration."""
+    engine.dispose()
+    for path in (DB_PATH, ARCHIVE_PATH):
+        path.unlink(missing_ok=True)
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    def create(path, rows):
+        with sqlite3.connect(path) as connection:
+            tables = LEGACY_TABLES if path == DB_PATH else (LEGACY_RMAS,)
+            for ddl in tables:
+                connection.execute(ddl)
+            connection.executemany(f'INSERT INTO rmas VALUES ({"?, " * 14}?)', rows)
+        connection.close()
+
+    create(
+        DB_PATH,
+        [
+            legacy_row(24007, 'Closed'),
+            legacy_row(25002, 'Issued', LONG_REASON),
+            legacy_row(25011, 'Received', SHORT_REASON),
+        ],
+    )
+    create(ARCHIVE_PATH, [legacy_row(19004, 'Closed')])
+    yield
+    engine.dispose()
+
+
+def query(sql: str) -> list[tuple]:
+    with engine.connect() as connection:
+        return [tuple(row) for row in connection.execute(text(sql))]
+
+
+def test_legacy_files_are_migrated_to_the_current_schema(legacy_files):
+    applied = initialize_database()
+
+    assert applied == [migration.name for migration in MIGRATIONS]
+    assert query('SELECT version FROM schema_version ORDER BY version') == [
+        (migration.version,) for migration in MIGRATIONS
+    ]
+    # 3: statuses are codes in both files
+    assert query('SELECT rma_number, status FROM all_rmas ORDER BY 1') == [
+        (19004, 5),
+        (24007, 5),
+        (25002, 1),
+        (25011, 2),
+    ]
+    # 4: the notes moved to rma_notes, and the rows keep a latin-1 summary
+    assert query(
+        'SELECT reason_for_return, incoming_inspection_notes FROM rma_notes '
+        'WHERE rma_number = 25002'
+    ) == [(LONG_REASON, 'dented case')]
+    [(summary,)] = query('SELECT reason_summary FROM rmas WHERE rma_number = 25002')
+    assert summary == LONG_REASON.replace('\r', '').replace('\n', ' ')[:57] + '...'
+    [(summary,)] = query('SELECT reason_summary FROM rmas WHERE rma_number = 25011')
+    assert summary == SHORT_REASON  # short reasons are kept as they are
+    assert query('SELECT reason_for_return FROM all_rma_notes WHERE rma_number = 19004')
+    # 1 and 2: the open-RMA index and each year's last number
+    assert query("SELECT name FROM sqlite_master WHERE name = 'ix_rmas_open'")
+    assert query('SELECT year, last_number FROM rma_number_sequences ORDER BY 1') == [
+        (24, 24007),
+        (25, 25011),
+    ]
+    # Objects the migrations dropped are back
+    triggers = query("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    assert len(triggers) == 4
+
+    assert initialize_database() == []
+
+
+def test_unknown_statuses_stop_the_migration_and_change_nothing(legacy_files):
+    with sqlite3.connect(DB_PATH) as connection:
+        connection.execute("UPDATE rmas SET status = 'Lost' WHERE rma_number = 25011")
+    connection.close()
+
+    with pytest.raises(ValueError, match='Lost'):
+        initialize_database()
+
+    assert query('SELECT count(*) FROM schema_version') == [(0,)]
+    assert query('SELECT DISTINCT typeof(status) FROM rmas') == [('text',)]
+
+
+def test_dry_run_prints_the_pending_ddl_without_applying_it(legacy_files, capsys):
+    pending = run_migrations(dry_run=True)
+
+    assert [m.version for m in pending] == [m.version for m in MIGRATIONS]
+    printed = capsys.readouterr().out
+    assert 'CREATE TABLE main.rmas_new' in printed
+    assert 'ALTER TABLE main.rmas DROP COLUMN reason_for_return' in printed
+    assert query('SELECT DISTINCT typeof(status) FROM rmas') == [('text',)]
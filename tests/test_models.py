@@ -0,0 +1,31 @@
+from PySide6.QtCore import Qt
+
+from src.database import RMAStatus
+from src.dataset import RMAColumns
+from src.models import OpenRMAsTableModel
+
+
+def column_values(model, header: str) -> list:
+    column = model.headers.index(header)
+    return [model.index(row, column).data() for row in range(model.rowCount())]
+
+
+def test_sort_is_by_typed_keys_and_stable_both_ways(add_rma):
+    add_rma(25003, RMAStatus.RECEIVED, serial_number='b')
+    add_rma(25010, RMAStatus.ISSUED, serial_number='A')
+    add_rma(25002, RMAStatus.RECEIVED, serial_number='a')
+    add_rma(25001, RMAStatus.ISSUED, serial_number='B')
+    dataset = RMAColumns()
+    dataset.load_open()
+    model = OpenRMAsTableModel(dataset)
+    serial, status = model.headers.index('Serial #'), model.headers.index('Status')
+
+    model.sort(model.headers.index('RMA #'), Qt.SortOrder.DescendingOrder)
+    assert model.rma_numbers == [25010, 25003, 25002, 25001]  # 10 after 3
+
+    # Equal keys keep the order of the previous sort, ascending or descending
+    model.sort(serial)  # case-folded, so 'a' and 'A' tie
+    assert model.rma_numbers == [25010, 25002, 25003, 25001]
+    model.sort(status, Qt.SortOrder.DescendingOrder)
+    assert model.rma_numbers == [25002, 25003, 25010, 25001]
+    assert column_values(model, 'Serial #') == ['a', 'b', 'A', 'B']
@@ -0,0 +1,77 @@
+import pytest
+from PySide6.QtCore import QCoreApplication
+from sqlalchemy import text
+
+from src.gui.record_cursor import RMARecordCursor
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+NUMBERS = [25001, 25002, 25003, 25004, 25006, 25007, 25008, 25009, 25010, 25011]
+
+
+@pytest.fixture
+def cursor(add_rma):
+    for rma_number in NUMBERS:
+        add_rma(rma_number)
+    cursor = RMARecordCursor(window=2)
+    yield cursor
+    cursor.shutdown()
+    app.processEvents()
+
+
+def walk(cursor, move) -> list[int]:
+    numbers = []
+    while (rma := move()) is not None:
+        numbers.append(rma.rma_number)
+    return numbers
+
+
+def test_steps_through_every_rma_in_order(cursor):
+    assert cursor.first().rma_number == 25001
+    assert walk(cursor, cursor.next) == NUMBERS[1:]
+    assert cursor.next() is None
+    assert walk(cursor, cursor.prev) == NUMBERS[-2::-1]
+    assert cursor.last().rma_number == 25011
+    assert cursor.move_to(25099) is None
+
+
+def test_prefetched_windows_extend_the_run(cursor):
+    cursor.move_to(25004)
+    assert cursor.order == [25002, 25003, 25004, 25006, 25007]
+    cursor.next()  # within half a window of the end, so the next one is fetched
+    cursor.worker.wait()
+    QCoreApplication.processEvents()
+
+    assert cursor.order == [25002, 25003, 25004, 25006, 25007, 25008, 25009]
+    assert set(cursor.order) <= set(cursor.cache)
+
+
+def test_invalidated_rmas_are_read_again(cursor, database):
+    cursor.move_to(25003)
+    with database.begin() as connection:
+        connection.execute(
+            text("UPDATE rmas SET serial_number = 'NEW' WHERE rma_number = 25004")
+        )
+        connection.execute(
+            text(
+                'INSERT INTO rmas SELECT 25005, issued_by_id, customer_id, '
+                'part_number_id, serial_number, is_warranty, reason_summary, '
+                'status, issued_on, last_updated, customer_po_number, work_order, '
+                'shipped_back_on FROM rmas WHERE rma_number = 25004'
+            )
+        )
+
+    cursor.invalidate([25004, 25005])
+
+    assert cursor.next().serial_number == 'NEW'
+    assert cursor.next().rma_number == 25005  # added inside the cached run
+    assert cursor.next().rma_number == 25006
+
+
+def test_shutdown_leaves_no_prefetch_running(cursor):
+    cursor.move_to(25004)
+    cursor.next()
+    cursor.shutdown()
+    QCoreApplication.processEvents()  # the finished signal queued meanwhile
+
+    assert cursor.worker is None
@@ -0,0 +1,112 @@
+import gzip
+import json
+
+import pytest
+from sqlalchemy import text
+
+import src.snapshot
+from src.archive import archive_closed_rmas
+from src.database import ARCHIVE_PATH, DB_PATH, RMAStatus
+from src.snapshot import (
+    MANIFEST_NAME,
+    SnapshotError,
+    create_snapshot,
+    list_snapshots,
+    restore_snapshot,
+    rotate_snapshots,
+    verify_snapshot,
+)
+
+
+def rma_numbers(database, schema: str) -> list[int]:
+    with database.connect() as connection:
+        return list(
+            connection.scalars(text(f'SELECT rma_number FROM {schema}.rmas ORDER BY 1'))
+        )
+
+
+@pytest.fixture
+def snapshot(database, add_rma, tmp_path):
+    """A snapshot of one open RMA in rma.db and one archived RMA."""
+    add_rma(19001, RMAStatus.CLOSED)
+    add_rma(25001)
+    with database.begin() as connection:
+        connection.execute(
+            text("UPDATE rmas SET last_updated = '2019-07-01' WHERE rma_number = 19001")
+        )
+    archive_closed_rmas(3)
+    return create_snapshot(tmp_path / 'snapshots')
+
+
+def test_snapshot_round_trip(database, add_rma, snapshot):
+    manifest = verify_snapshot(snapshot)
+    assert sorted(manifest['files']) == sorted([DB_PATH.name, ARCHIVE_PATH.name])
+
+    add_rma(25002)
+    with database.begin() as connection:
+        connection.execute(text('DELETE FROM archive.rma_notes'))
+        connection.execute(text('DELETE FROM archive.rmas'))
+
+    # The engine's pooled connections stay open across the restore
+    assert restore_snapshot(snapshot) == [DB_PATH, ARCHIVE_PATH]
+    assert rma_numbers(database, 'main') == [25001]
+    assert rma_numbers(database, 'archive') == [19001]
+    assert not list(DB_PATH.parent.glob('*.restore'))
+    assert not list(DB_PATH.parent.glob('*.before-restore'))
+
+
+def test_corrupt_snapshots_are_not_restored(database, add_rma, snapshot):
+    gz_path = snapshot / f'{ARCHIVE_PATH.name}.gz'
+    with gzip.open(gz_path, 'wb') as compressed:
+        compressed.write(b'not a database')
+    add_rma(25002)
+
+    with pytest.raises(SnapshotError, match='corrupt'):
+        verify_snapshot(snapshot)
+    with pytest.raises(SnapshotError):
+        restore_snapshot(snapshot)
+    assert rma_numbers(database, 'main') == [25001, 25002]
+
+
+def test_failed_restore_puts_back_the_files_already_restored(
+    database, add_rma, snapshot, monkeypatch
+):
+    add_rma(25002)
+    backup_database = src.snapshot.backup_database
+
+    def fail_on_the_archive(source, target):
+        if target == ARCHIVE_PATH and source.name.endswith('.restore'):
+            raise OSError('disk full')
+        backup_database(source, target)
+
+    monkeypatch.setattr(src.snapshot, 'backup_database', fail_on_the_archive)
+
+    with pytest.raises(OSError, match='disk full'):
+        restore_snapshot(snapshot)
+    assert rma_numbers(database, 'main') == [25001, 25002]
+    assert rma_numbers(database, 'archive') == [19001]
+
+
+def test_rotation_keeps_the_newest_snapshots(tmp_path):
+    snapshot_dir = tmp_path / 'snapshots'
+    names = ['20250101-000000', '20250102-000000', '20250103-000000']
+    for name in names:
+        (snapshot_dir / name).mkdir(parents=True)
+        (snapshot_dir / name / MANIFEST_NAME).write_text(json.dumps({'files': {}}))
+    (snapshot_dir / '20250104-000000').mkdir()  # no manifest, an interrupted run
+
+    rotate_snapshots(snapshot_dir, keep=2)
+
+    assert [folder.name for folder in list_snapshots(snapshot_dir)] == names[1:]
+    rotate_snapshots(snapshot_dir, keep=0)  # 0 keeps everything
+    assert len(list_snapshots(snapshot_dir)) == 2
+
+
+def test_create_rotates_old_snapshots(database, tmp_path):
+    old = tmp_path / 'snapshots' / '20000101-000000'
+    old.mkdir(parents=True)
+    (old / MANIFEST_NAME).write_text(json.dumps({'files': {}}))
+
+    folder = create_snapshot(tmp_path / 'snapshots', keep=1)
+
+    assert list_snapshots(tmp_path / 'snapshots') == [folder]